@@ -0,0 +1,79 @@
+## API 결과 캐시
+import threading
+import unicodedata
+from collections import OrderedDict
+
+MISSING = object()  # 캐시에 없는 경우 반환되는 값 (None도 캐시할 수 있도록 별도 객체 사용)
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 입력 정규화: 유니코드 NFC 변환 + 앞뒤/중복 공백 제거"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class LRUCache:
+    """
+    크기 제한이 있는 LRU 캐시.
+    - maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 제거 (maxsize <= 0이면 캐시 비활성화)
+    - sync_version()에 전달된 카탈로그 버전이 바뀌면 전체 항목을 비움
+    - 저장된 값은 그대로 공유되므로 호출하는 쪽에서 수정하면 안 됨
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.version = None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def sync_version(self, version) -> None:
+        """카탈로그 버전이 바뀌었으면 캐시를 비움 (버전을 알 수 없으면(None) 유지)"""
+        if version is None:
+            return
+        with self._lock:
+            if self.version != version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self._data.clear()
+                self.version = version
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """적중률 등 캐시 통계 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,231 @@
+## 식당 카탈로그 읽기 전용 스냅샷 (여러 워커 프로세스가 메모리 매핑으로 공유)
+"""
+restaurant_updated 테이블의 식당 정보와 메뉴/카테고리/id 조회용 색인을 파일 하나에 저장하고,
+API 워커는 이 파일을 mmap(읽기 전용)으로 열어 DB 대신 사용합니다.
+워커가 여러 개여도 같은 파일의 페이지(OS 페이지 캐시)를 공유하므로 메모리가 워커 수만큼 늘지 않습니다.
+
+파일 구조 (정수 배열은 만든 서버의 바이트 순서, 스냅샷은 같은 서버에서 만들고 읽는다고 가정):
+  - 8바이트 MAGIC, 8바이트 헤더 길이(little-endian), JSON 헤더 {"version", "n_restaurants", "sections": {이름: [오프셋, 바이트 수]}}
+  - records / record_offsets: 식당별 API 응답 형식 JSON(UTF-8)과 시작 위치(uint64, 식당 수 + 1개)
+  - <색인>_keys / <색인>_key_offsets / <색인>_postings / <색인>_posting_offsets:
+    UTF-8 바이트 순으로 정렬된 키(메뉴명, 카테고리, restaurant_id)와 키별 식당 행 번호(uint32) 목록
+
+적재 시 새 스냅샷을 임시 파일에 쓴 뒤 os.replace로 교체하므로, 워커는 항상 완전한 파일만 보며
+이미 열어 둔 이전 스냅샷은 교체 후에도 안전하게 읽을 수 있습니다 (CATALOG_SNAPSHOT_TTL초마다 교체 여부 확인).
+
+    # DB의 현재 카탈로그로 스냅샷 생성 (loader.py --snapshot으로 적재 직후 생성도 가능)
+    python catalog_snapshot.py ../../database/catalog.snapshot
+    CATALOG_SNAPSHOT=../../database/catalog.snapshot python main.py --workers 4
+"""
+import json
+import mmap
+import os
+import threading
+import time
+from argparse import ArgumentParser
+from array import array
+
+MAGIC = b"JMCSNAP1"
+INDEXES = ("menu", "category", "id")
+RESULT_LIMIT = 3  # menu_filter의 DB 조회와 같은 LIMIT
+
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT")  # 스냅샷 파일 경로 (없으면 DB 조회)
+CATALOG_SNAPSHOT_TTL = float(os.getenv("CATALOG_SNAPSHOT_TTL", "5"))  # 스냅샷 교체 재확인 주기(초)
+
+_snapshot = {"value": None, "stat": None, "checked_at": float("-inf")}
+_lock = threading.Lock()
+
+
+def cumulative_offsets(lengths) -> array:
+    """길이 목록 -> 시작 위치 배열 (uint64, 길이 + 1개)"""
+    offsets = array("Q", [0])
+    for length in lengths:
+        offsets.append(offsets[-1] + length)
+    return offsets
+
+
+def keyed_sections(name: str, mapping) -> dict:
+    """{키: [행 번호, ...]} -> 정렬된 키/행 번호 섹션"""
+    keys = sorted(key.encode("utf-8") for key in mapping)
+    postings = [mapping[key.decode("utf-8")] for key in keys]
+    return {
+        f"{name}_keys": b"".join(keys),
+        f"{name}_key_offsets": cumulative_offsets(len(key) for key in keys).tobytes(),
+        f"{name}_postings": array("I", (row for rows in postings for row in rows)).tobytes(),
+        f"{name}_posting_offsets": cumulative_offsets(len(rows) for rows in postings).tobytes(),
+    }
+
+
+def write_catalog_snapshot(path: str, entries, version) -> int:
+    """
+    식당 목록으로 스냅샷 파일을 만들고 os.replace로 교체. 식당 수 반환.
+    - entries: [(API 응답 형식 식당 딕셔너리, DB의 menu 배열), ...]
+      (응답의 menu는 비어 있으면 "메뉴 정보 없음"으로 바뀌므로 메뉴 색인은 DB 값으로 만듦)
+    - version: catalog_meta 버전 (API 서버 결과 캐시 무효화에 사용)
+    """
+    entries = sorted(entries, key=lambda entry: entry[0]["id"])
+    records = [json.dumps(res, ensure_ascii=False).encode("utf-8") for res, _ in entries]
+    indexes = {name: {} for name in INDEXES}
+    for row, (res, menu) in enumerate(entries):
+        indexes["id"][res["id"]] = [row]
+        if res.get("category"):
+            indexes["category"].setdefault(res["category"], []).append(row)
+        for item in dict.fromkeys(menu or []):
+            indexes["menu"].setdefault(item, []).append(row)
+
+    sections = {"records": b"".join(records),
+                "record_offsets": cumulative_offsets(len(record) for record in records).tobytes()}
+    for name, mapping in indexes.items():
+        sections.update(keyed_sections(name, mapping))
+
+    # 섹션은 헤더 뒤에 8바이트 경계로 정렬하여 배치 (헤더 길이가 섹션 위치에 따라 달라지므로 길이가 고정될 때까지 반복)
+    header_len = 0
+    while True:
+        layout, offset = {}, 16 + header_len
+        for name, data in sections.items():
+            layout[name] = [offset, len(data)]
+            offset += len(data) + (-len(data) % 8)
+        header = {"version": version, "n_restaurants": len(entries), "sections": layout}
+        header_bytes = json.dumps(header).encode("utf-8")
+        if len(header_bytes) <= header_len:
+            break
+        header_len = len(header_bytes) + (-len(header_bytes) % 8)
+    header_bytes = header_bytes.ljust(header_len)
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + header_len.to_bytes(8, "little") + header_bytes)
+        for data in sections.values():
+            f.write(data + b"\0" * (-len(data) % 8))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+class CatalogSnapshot:
+    """스냅샷 파일을 읽기 전용 mmap으로 열어 menu_filter와 같은 방식으로 식당을 조회"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # 파일을 닫아도 매핑은 유지됨
+        if self._mm[:8] != MAGIC:
+            raise ValueError(f"카탈로그 스냅샷 형식이 아닙니다: {path}")
+        header_len = int.from_bytes(self._mm[8:16], "little")
+        header = json.loads(self._mm[16:16 + header_len])
+        self.version = header["version"]
+        self.n_restaurants = header["n_restaurants"]
+        self._sections = {}
+        view = memoryview(self._mm)
+        for name, (offset, length) in header["sections"].items():
+            section = view[offset:offset + length]
+            if name.endswith("_offsets"):
+                section = section.cast("Q")
+            elif name.endswith("_postings"):
+                section = section.cast("I")
+            self._sections[name] = section
+
+    def __len__(self) -> int:
+        return self.n_restaurants
+
+    def record(self, row: int) -> dict:
+        offsets = self._sections["record_offsets"]
+        return json.loads(bytes(self._sections["records"][offsets[row]:offsets[row + 1]]))
+
+    def rows(self, index: str, key: str):
+        """색인에서 키에 해당하는 식당 행 번호 목록 (이진 탐색)"""
+        keys = self._sections[f"{index}_keys"]
+        key_offsets = self._sections[f"{index}_key_offsets"]
+        target = key.encode("utf-8")
+        lo, hi = 0, len(key_offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys[key_offsets[mid]:key_offsets[mid + 1]].tobytes() < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(key_offsets) - 1 and keys[key_offsets[lo]:key_offsets[lo + 1]].tobytes() == target:
+            posting_offsets = self._sections[f"{index}_posting_offsets"]
+            return self._sections[f"{index}_postings"][posting_offsets[lo]:posting_offsets[lo + 1]]
+        return []
+
+    def filter_by_category(self, category: str, limit: int = RESULT_LIMIT):
+        """menu_filter.filter_by_category_from_db와 같은 결과 ("아무거나"면 앞에서부터 limit개)"""
+        if category == "아무거나":
+            rows = range(min(limit, len(self)))
+        else:
+            rows = self.rows("category", category)[:limit]
+        return [self.record(row) for row in rows]
+
+    def filter_by_menu(self, menu_item: str, limit: int = RESULT_LIMIT):
+        """menu_filter.filter_by_menu_from_db와 같은 결과 (메뉴가 포함된 식당 최대 limit개)"""
+        return [self.record(row) for row in self.rows("menu", menu_item)[:limit]]
+
+    def get_many(self, restaurant_ids):
+        """{restaurant_id: 식당 딕셔너리} (스냅샷에 없는 id는 제외)"""
+        results = {}
+        for restaurant_id in restaurant_ids:
+            rows = self.rows("id", restaurant_id)
+            if len(rows):
+                results[restaurant_id] = self.record(rows[0])
+        return results
+
+
+def get_catalog_snapshot():
+    """CATALOG_SNAPSHOT 스냅샷을 반환 (설정되지 않았거나 열 수 없으면 None → DB 조회)"""
+    if not CATALOG_SNAPSHOT:
+        return None
+    now = time.monotonic()
+    if now - _snapshot["checked_at"] < CATALOG_SNAPSHOT_TTL:
+        return _snapshot["value"]
+
+    with _lock:
+        if now - _snapshot["checked_at"] < CATALOG_SNAPSHOT_TTL:
+            return _snapshot["value"]
+        _snapshot["checked_at"] = now
+        try:
+            stat = os.stat(CATALOG_SNAPSHOT)
+        except OSError:
+            return _snapshot["value"]
+        key = (stat.st_ino, stat.st_mtime_ns)  # os.replace로 교체되면 inode가 바뀜
+        if key != _snapshot["stat"]:
+            try:
+                _snapshot["value"] = CatalogSnapshot(CATALOG_SNAPSHOT)
+                _snapshot["stat"] = key
+            except Exception as e:
+                print("카탈로그 스냅샷 로딩 실패:", e)
+        return _snapshot["value"]
+
+
+def export_catalog_snapshot(path: str) -> int:
+    """DB의 restaurant_updated와 카탈로그 버전을 같은 시점 기준으로 읽어 스냅샷 생성 (DB 오류 시 0)"""
+    from database import get_db_connection
+    from menu_filter import RESTAURANT_COLUMNS, to_restaurant
+
+    conn = get_db_connection()
+    if conn is None:
+        return 0
+
+    try:
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with conn, conn.cursor() as cursor:
+            cursor.execute("SELECT version FROM catalog_meta")
+            row = cursor.fetchone()
+            version = row[0] if row else None
+            cursor.execute(f"SELECT {RESTAURANT_COLUMNS} FROM restaurant_updated")
+            entries = [(to_restaurant(res), res["menu"]) for res in cursor.fetchall()]
+        count = write_catalog_snapshot(path, entries, version)
+        print(f"카탈로그 스냅샷 생성 완료: {count}개 (카탈로그 버전 {version}) -> {path}")
+        return count
+    except Exception as e:
+        print("카탈로그 스냅샷 생성 실패:", e)
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Write a read-only catalog snapshot for multi-worker serving.")
+    parser.add_argument("path", nargs="?", default="../../database/catalog.snapshot", help="Snapshot file path.")
+    args = parser.parse_args()
+    export_catalog_snapshot(args.path)
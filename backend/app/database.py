@@ -3,25 +3,63 @@ import psycopg2 # pip install psycopg2-binary
 from psycopg2.extras import DictCursor
 import json
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from metrics import stage_timer
 
-load_dotenv() # .env 파일 로딩
+@lru_cache(maxsize=None)
+def load_env():
+    """
+    .env 파일 로딩 (import 시점이 아닌 처음 필요할 때 한 번만 실행)
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
 
-# 환경 변수에서 DATABASE_URL 가져오기
-DB_URL = os.getenv("DATABASE_URL")
-print(DB_URL[:5]) # debugging(지우기)
+def get_db_url():
+    """
+    환경 변수에서 DATABASE_URL 가져오기
+    """
+    load_env()
+    return os.getenv("DATABASE_URL")
 
 def get_db_connection():
     """
     PostgreSQL DB 연결을 생성하는 함수
     """
     try:
-        conn = psycopg2.connect(DB_URL, cursor_factory=DictCursor)  # DictCursor 사용하여 결과를 딕셔너리처럼 다룸
+        with stage_timer("db_connect"):
+            conn = psycopg2.connect(get_db_url(), cursor_factory=DictCursor)  # DictCursor 사용하여 결과를 딕셔너리처럼 다룸
         return conn
     except Exception as e:
         print("!!DB 연결 실패:", e)
         return None
 
+def fetch_catalog_version():
+    """
+    catalog_meta 테이블에서 현재 카탈로그 버전을 조회하는 함수 (실패 시 None)
+    """
+    conn = get_db_connection()
+    if conn is None:
+        return None
+
+    try:
+        with conn.cursor() as cursor, stage_timer("catalog_version"):
+            cursor.execute("SELECT version FROM catalog_meta")
+            row = cursor.fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        print("카탈로그 버전 조회 실패:", e)
+        return None
+    finally:
+        conn.close()
+
+def bump_catalog_version(cursor):
+    """
+    restaurant_updated 재적재 시 호출하여 카탈로그 버전을 올리는 함수
+    (적재와 같은 트랜잭션의 cursor를 받아 커밋 시점에 함께 반영됨)
+    """
+    cursor.execute("UPDATE catalog_meta SET version = version + 1, updated_at = now() RETURNING version")
+    return cursor.fetchone()[0]
+
 # debugging(아래 함수 지우기)
 if __name__ == "__main__":
     conn = get_db_connection()
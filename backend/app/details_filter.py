@@ -1,19 +1,29 @@
-from database import get_db_connection
-import openai
 import json
 import os
-from dotenv import load_dotenv
+import metrics
+from database import load_env
+from llm_guard import LLM_TIMEOUT_S, GuardedLLM
+from metrics import stage_timer
+from menu_filter import fetch_restaurant_stats
 
-# .env 파일 로딩하여 OpenAI API Key 가져오기
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY_QUERY") ## 이건 query 재생성용 api key라서 본인 것과 다를 수 있음
+_openai = None
 
-def regenerate_query(details_input):
+def get_openai():
     """
-    사용자의 검색어를 기반으로 관련 개념을 확장하여 JSON 형식으로 변환.
-    예: "조용하고 주차 가능한 곳" -> {'시설': ['조용한 분위기', '방음'], '주차': ['주차 가능']}
+    openai 모듈을 처음 query 재생성할 때 import하고 API key 설정 (서버 시작 시간 단축)
     """
-    system_prompt = """
+    global _openai
+    if _openai is None:
+        import openai
+        # .env 파일 로딩하여 OpenAI API Key 가져오기
+        load_env()
+        openai.api_key = os.getenv("OPENAI_API_KEY_QUERY") ## 이건 query 재생성용 api key라서 본인 것과 다를 수 있음
+        # 로컬 가짜 LLM 서버 등으로 바꿀 때 사용 (예: http://127.0.0.1:8900/v1, benchmarks/fake_llm_server.py)
+        openai.api_base = os.getenv("OPENAI_API_BASE") or openai.api_base
+        _openai = openai
+    return _openai
+
+SYSTEM_PROMPT = """
     사용자의 검색어를 기반으로 관련 개념을 확장하여 JSON 형식으로 반환하세요.
     예시:
     - 입력: "조용하고 주차 가능한 곳"
@@ -28,19 +38,31 @@ def regenerate_query(details_input):
     JSON 형식으로만 출력하세요.
     """
 
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[{"role": "system", "content": system_prompt},
-                      {"role": "user", "content": details_input}]
-        )
+def call_llm(details_input):
+    """OpenAI 호출 한 번 (LLM_TIMEOUT_S 안에 응답이 없으면 예외, JSON이 아니면 ValueError)"""
+    response = get_openai().ChatCompletion.create(
+        model="gpt-4-turbo",
+        messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                  {"role": "user", "content": details_input}],
+        request_timeout=LLM_TIMEOUT_S,
+    )
+    return json.loads(response["choices"][0]["message"]["content"])
+
+# 타임아웃/동시 호출 제한/서킷 브레이커 (실패 시 캐시 또는 규칙 기반 확장으로 대체, llm_guard.py)
+llm = GuardedLLM(call_llm)
 
-        expanded_query = json.loads(response["choices"][0]["message"]["content"])
-        return expanded_query
+metrics.register(metrics.GaugeFunc("jemechu_llm_breaker_open", "1 if the LLM circuit breaker is open.",
+                                   lambda: int(llm.breaker.state == "open")))
+metrics.register(metrics.GaugeFunc("jemechu_llm_in_flight", "LLM calls in flight.", lambda: llm.in_flight))
 
-    except Exception as e:
-        print("OpenAI API 요청 실패:", e)
-        return {}  # 실패 시 빈 딕셔너리 반환
+def regenerate_query(details_input):
+    """
+    사용자의 검색어를 기반으로 관련 개념을 확장하여 JSON 형식으로 변환.
+    예: "조용하고 주차 가능한 곳" -> {'시설': ['조용한 분위기', '방음'], '주차': ['주차 가능']}
+    LLM이 느리거나 실패하면 이전 확장 결과 또는 키워드 규칙 기반 확장을 반환 (비어 있을 수 있음)
+    """
+    with stage_timer("llm_expansion"):
+        return llm.expand(details_input)
 
 
 def filter_by_expanded_query(filtered_data, expanded_query):
@@ -48,33 +70,50 @@ def filter_by_expanded_query(filtered_data, expanded_query):
     1차 필터링된 데이터(filtered_data)에서 Query 재생성을 기반으로 세부 필터링 수행.
     - filtered_data: `menu_filter.py`에서 필터링된 식당 리스트
     - expanded_query: JSON 형식의 필터 기준
+    - 조건에 맞는 식당이 여러 개면 restaurant_stats의 리뷰 집계로 정렬 (rank_by_review_stats)
     """
     if not filtered_data:
         print("1차 필터링 결과가 비어 있음 → 추가 필터링 없이 반환")
         return []  # 빈 리스트 반환하여 오류 방지
-    conn = get_db_connection()
-    if conn is None:
-        return []
 
     matched_restaurants = []
 
-    for res in filtered_data:
-        name = res["name"]
-        facilities = res["facilities"]
-        parking = res["parking"]
-        highlights = res["very_good"]
+    with stage_timer("keyword_match"):
+        for res in filtered_data:
+            name = res["name"]
+            facilities = res["facilities"]
+            parking = res["parking"]
+            highlights = res["very_good"]
+
+            matched_details = {
+                "id": res["id"],
+                "식당명": name,
+                "편의시설": [f for f in expanded_query.get("시설", []) if f in facilities],
+                "주차": [p for p in expanded_query.get("주차", []) if p in parking],
+                "이런 점이 좋았어요": [h for h in expanded_query.get("이런 점이 좋았어요", []) if h in highlights],
+            }
+
+            if any(v for k, v in matched_details.items() if k not in ("id", "식당명")):
+                matched_restaurants.append(matched_details)
+
+    if len(matched_restaurants) > 1:
+        matched_restaurants = rank_by_review_stats(matched_restaurants)
+    return matched_restaurants
 
-        matched_details = {
-            "식당명": name,
-            "편의시설": [f for f in expanded_query.get("시설", []) if f in facilities],
-            "주차": [p for p in expanded_query.get("주차", []) if p in parking],
-            "이런 점이 좋았어요": [h for h in expanded_query.get("이런 점이 좋았어요", []) if h in highlights],
-        }
 
-        if any(matched_details.values()):
-            matched_restaurants.append(matched_details)
+def rank_by_review_stats(matched_restaurants):
+    """
+    매칭된 "이런 점이 좋았어요" 라벨의 실제 투표 수 합, 그다음 리뷰 수가 많은 순으로 정렬.
+    집계가 없는 식당은 0으로 보고 원래 순서를 유지함 (안정 정렬)
+    """
+    stats = fetch_restaurant_stats([res["id"] for res in matched_restaurants])
 
-    return matched_restaurants
+    def score(res):
+        stat = stats.get(res["id"], {})
+        votes = stat.get("very_good_counts") or {}
+        return (sum(votes.get(label, 0) for label in res["이런 점이 좋았어요"]), stat.get("review_total") or 0)
+
+    return sorted(matched_restaurants, key=score, reverse=True)
 
 
 # 직접 실행할 경우 테스트 코드 추가
@@ -0,0 +1,143 @@
+## 하이브리드 검색 (메뉴/카테고리 + BM25 리뷰 검색 + 임베딩 유사도)
+"""
+세 가지 검색 결과를 동시에 구한 뒤 하나의 순위로 합칩니다.
+  - menu:   메뉴/카테고리 필터 (menu_filter.filter_restaurants, 결과 캐시 사용)
+  - bm25:   리뷰 텍스트 BM25 검색 (review_search.py)
+  - vector: 리뷰 임베딩 유사도 검색 (vector_search.py)
+
+검색원마다 시간 예산(HYBRID_BUDGET_<SOURCE>_MS)이 있어, 예산 안에 끝나지 않은 검색원은 결과에서 빠지고
+나머지 검색원 결과만으로 순위를 만듭니다 (느린 검색원 하나 때문에 전체 응답이 늦어지지 않도록).
+예산을 넘긴 검색은 스레드에서 끝까지 실행되지만 결과는 사용하지 않습니다.
+검색원마다 스레드 풀(HYBRID_SOURCE_THREADS개)이 따로 있어, 느린 DB나 멈춘 검색이 스레드를 잡고 있어도
+다른 검색원과 API의 기본 스레드 풀(asyncio.to_thread)은 영향을 받지 않습니다.
+메뉴/카테고리 검색원은 API 응답용 LIMIT(3개) 대신 CANDIDATES_PER_SOURCE개까지 후보를 가져옵니다.
+검색원이 None을 반환하면 아직 준비되지 않은 것(서버 시작 직후 질의 임베딩 모델 로딩 중 등)으로 보고
+결과가 없는 것("empty")과 구분해 건너뛴 검색원("skipped", 사유 not_ready)으로 기록합니다.
+
+순위 결합은 기본적으로 RRF(reciprocal rank fusion, 점수 = Σ 가중치 / (RRF_K + 순위))를 사용하고,
+fusion="weighted"면 검색원별 점수를 0~1로 정규화한 가중합을 사용합니다.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import metrics
+from menu_filter import filter_restaurants, fetch_restaurants_by_ids
+from review_search import search_review_ids
+from vector_search import search_vector_ids
+
+RRF_K = 60
+SOURCE_WEIGHTS = {"menu": 1.0, "bm25": 1.0, "vector": 1.0}
+SOURCE_BUDGETS_MS = {
+    "menu": float(os.getenv("HYBRID_BUDGET_MENU_MS", "200")),
+    "bm25": float(os.getenv("HYBRID_BUDGET_BM25_MS", "100")),
+    "vector": float(os.getenv("HYBRID_BUDGET_VECTOR_MS", "150")),
+}
+CANDIDATES_PER_SOURCE = 50
+SOURCE_THREADS = int(os.getenv("HYBRID_SOURCE_THREADS", "4"))
+
+# 검색원별 스레드 풀 ("fetch"는 결합 후 식당 정보 조회용)
+EXECUTORS = {
+    source: ThreadPoolExecutor(max_workers=SOURCE_THREADS, thread_name_prefix=f"hybrid-{source}")
+    for source in ("menu", "bm25", "vector", "fetch")
+}
+
+SOURCE_SKIPPED = metrics.register(metrics.Counter(
+    "jemechu_hybrid_source_skipped_total", "Hybrid search sources dropped from a response.", ["source", "reason"]))
+
+
+def reciprocal_rank_fusion(rankings, weights=None, k: int = RRF_K):
+    """{검색원: [id, ...]} 순위 목록들을 RRF 점수로 합쳐 [(id, 점수), ...] (점수 내림차순) 반환"""
+    weights = weights or SOURCE_WEIGHTS
+    scores = {}
+    for source, ids in rankings.items():
+        for rank, restaurant_id in enumerate(ids, start=1):
+            scores[restaurant_id] = scores.get(restaurant_id, 0.0) + weights.get(source, 1.0) / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def weighted_score_fusion(scored, weights=None):
+    """{검색원: [(id, 점수), ...]}의 점수를 검색원별 min-max 정규화 후 가중합하여 [(id, 점수), ...] 반환"""
+    weights = weights or SOURCE_WEIGHTS
+    scores = {}
+    for source, hits in scored.items():
+        if not hits:
+            continue
+        values = [score for _, score in hits]
+        low, high = min(values), max(values)
+        for restaurant_id, score in hits:
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            scores[restaurant_id] = scores.get(restaurant_id, 0.0) + weights.get(source, 1.0) * normalized
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def menu_hits(user_input: str):
+    """메뉴/카테고리 필터 결과를 (식당 목록, [(id, 점수)]) 형태로 반환 (필터 결과 순서대로 점수 부여)"""
+    restaurants = filter_restaurants(user_input, limit=CANDIDATES_PER_SOURCE)
+    return restaurants, [(res["id"], 1.0 / rank) for rank, res in enumerate(restaurants, start=1)]
+
+
+async def run_source(source: str, func, *args):
+    """검색원 하나를 검색원 전용 스레드 풀에서 실행 (시간 예산 초과/오류/준비 안 됨이면 None)"""
+    future = asyncio.get_running_loop().run_in_executor(EXECUTORS[source], partial(func, *args))
+    try:
+        result = await asyncio.wait_for(future, SOURCE_BUDGETS_MS[source] / 1000)
+        if result is None:
+            SOURCE_SKIPPED.inc(source, "not_ready")
+        return result
+    except asyncio.TimeoutError:
+        SOURCE_SKIPPED.inc(source, "timeout")
+    except Exception as e:
+        print(f"하이브리드 검색 {source} 오류:", e)
+        SOURCE_SKIPPED.inc(source, "error")
+    return None
+
+
+async def hybrid_search(user_input: str, details: str = None, top_k: int = 10, fusion: str = "rrf"):
+    """
+    메뉴/카테고리, BM25, 임베딩 검색을 동시에 실행하고 순위를 합쳐 상위 top_k개 식당을 반환.
+    - 반환값: {"restaurants": [식당 + "score", "matched_by"], "sources": {검색원: "ok"/"empty"/"skipped"}}
+    """
+    text = " ".join(t for t in (user_input, details) if t and t != "아무거나")
+    tasks = {"menu": run_source("menu", menu_hits, user_input)}
+    if text:
+        tasks["bm25"] = run_source("bm25", search_review_ids, text, CANDIDATES_PER_SOURCE)
+        tasks["vector"] = run_source("vector", search_vector_ids, text, CANDIDATES_PER_SOURCE)
+    outputs = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+
+    known = {}  # 이미 식당 정보가 있는 결과 (메뉴/카테고리 필터)
+    scored = {}
+    for source, output in outputs.items():
+        if output is None:
+            continue
+        if source == "menu":
+            restaurants, output = output
+            known.update((res["id"], res) for res in restaurants)
+        scored[source] = output
+
+    if fusion == "weighted":
+        fused = weighted_score_fusion(scored)
+    else:
+        fused = reciprocal_rank_fusion({source: [rid for rid, _ in hits] for source, hits in scored.items()})
+    fused = fused[:top_k]
+
+    missing = [rid for rid, _ in fused if rid not in known]
+    if missing:
+        known.update(await asyncio.get_running_loop().run_in_executor(
+            EXECUTORS["fetch"], fetch_restaurants_by_ids, missing))
+
+    matched_by = {}
+    for source, hits in scored.items():
+        for rid, _ in hits:
+            matched_by.setdefault(rid, []).append(source)
+
+    restaurants = [
+        {**known[rid], "score": round(score, 6), "matched_by": matched_by[rid]}
+        for rid, score in fused if rid in known
+    ]
+    sources = {
+        source: "skipped" if outputs.get(source) is None else ("ok" if scored.get(source) else "empty")
+        for source in tasks
+    }
+    return {"restaurants": restaurants, "sources": sources}
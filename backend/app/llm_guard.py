@@ -0,0 +1,170 @@
+## OpenAI 호출 보호 (타임아웃, 동시 호출 제한, 서킷 브레이커, 대체 확장)
+"""
+regenerate_query의 OpenAI 호출이 느려지거나 실패해도 API 응답 지연이 묶여 있도록 합니다.
+  - 타임아웃: 호출마다 LLM_TIMEOUT_S (openai의 request_timeout으로 전달)
+  - 동시 호출 제한: 진행 중인 LLM 호출은 최대 LLM_MAX_CONCURRENCY개, 자리가 나지 않으면
+    LLM_QUEUE_TIMEOUT_S만 기다린 뒤 대체 확장으로 응답
+  - 서킷 브레이커: 연속 LLM_BREAKER_FAILURES번 실패하면 LLM_BREAKER_RESET_S 동안 호출하지 않고(open)
+    바로 대체 확장을 반환, 이후 한 번만 시험 호출(half-open)하여 성공하면 다시 닫힘
+  - 대체 확장: 같은 세부사항의 이전 LLM 확장 결과(캐시) → 없으면 키워드 규칙(RULE_EXPANSIONS) 기반 확장
+
+로컬 가짜 LLM 서버(benchmarks/fake_llm_server.py)에 OPENAI_API_BASE를 맞추면 지연/오류를 주입해 시험할 수 있고,
+benchmarks/check_llm_guard.py가 타임아웃/서킷 브레이커/동시 호출 제한 동작을 가짜 서버로 점검합니다.
+API 엔드포인트는 호출이 이벤트 루프를 막지 않도록 asyncio.to_thread로 regenerate_query를 실행합니다.
+"""
+import os
+import threading
+import time
+
+import metrics
+from cache import LRUCache, MISSING, normalize_query
+
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "5"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_QUEUE_TIMEOUT_S = float(os.getenv("LLM_QUEUE_TIMEOUT_S", "0.2"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_S = float(os.getenv("LLM_BREAKER_RESET_S", "30"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "4096"))
+
+# 세부사항 문장에 키워드가 있으면 추가할 확장 (filter_by_expanded_query가 비교하는 라벨 기준)
+RULE_EXPANSIONS = [
+    (("주차", "차 대기", "발렛"), "주차", ["주차 가능", "무료 주차 가능", "유료 주차 가능"]),
+    (("조용", "한적"), "시설", ["조용한 분위기", "방음"]),
+    (("아이", "아기", "키즈", "가족"), "시설", ["유아의자", "키즈존"]),
+    (("단체", "회식", "모임"), "시설", ["단체석", "단체 이용 가능"]),
+    (("예약",), "시설", ["예약"]),
+    (("포장", "테이크아웃"), "시설", ["포장"]),
+    (("배달",), "시설", ["배달"]),
+    (("와이파이", "인터넷", "노트북"), "시설", ["무선 인터넷"]),
+    (("반려", "강아지", "애견"), "시설", ["반려동물 동반"]),
+    (("와인",), "시설", ["와인 추천"]),
+    (("데이트", "분위기"), "이런 점이 좋았어요", ["분위기가 좋아요"]),
+    (("가성비", "저렴", "싼"), "이런 점이 좋았어요", ["가성비가 좋아요"]),
+    (("친절",), "이런 점이 좋았어요", ["친절해요"]),
+    (("맛있", "맛집"), "이런 점이 좋았어요", ["음식이 맛있어요"]),
+    (("양 많", "푸짐"), "이런 점이 좋았어요", ["양이 많아요"]),
+    (("깨끗", "청결", "깔끔"), "이런 점이 좋았어요", ["매장이 청결해요"]),
+]
+
+LLM_CALLS = metrics.register(metrics.Counter(
+    "jemechu_llm_calls_total", "Query expansion LLM calls by outcome.", ["outcome"]))
+LLM_FALLBACKS = metrics.register(metrics.Counter(
+    "jemechu_llm_fallbacks_total", "Query expansions served without the LLM.", ["source", "reason"]))
+
+
+def rule_expansion(details_input: str) -> dict:
+    """키워드 규칙으로 확장 쿼리 생성 (LLM을 쓸 수 없을 때 사용)"""
+    expanded = {}
+    for keywords, field, labels in RULE_EXPANSIONS:
+        if any(keyword in details_input for keyword in keywords):
+            expanded.setdefault(field, []).extend(label for label in labels if label not in expanded.get(field, []))
+    return expanded
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커 (closed → open → half-open → closed)"""
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET_S):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False  # half-open 상태에서 시험 호출 진행 중
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        """호출해도 되는지 (half-open에서는 한 번에 하나의 시험 호출만 허용)"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """호출하지 못한 half-open 시험 호출 권한 반납"""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()  # half-open 시험 실패면 다시 open
+            self._trial = False
+
+
+class GuardedLLM:
+    """
+    확장 함수(call: 세부사항 -> 확장 dict, 실패 시 예외)를 타임아웃/동시 호출 제한/서킷 브레이커로 감싸고,
+    호출할 수 없거나 실패하면 캐시 또는 규칙 기반 확장을 반환
+    """
+
+    def __init__(self, call, max_concurrency: int = LLM_MAX_CONCURRENCY, queue_timeout: float = LLM_QUEUE_TIMEOUT_S,
+                 breaker: CircuitBreaker = None, cache_size: int = LLM_CACHE_SIZE):
+        self.call = call
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = LRUCache(maxsize=cache_size)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self.in_flight += delta
+
+    def fallback(self, key: str, reason: str) -> dict:
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            LLM_FALLBACKS.inc("cache", reason)
+            return cached
+        LLM_FALLBACKS.inc("rules", reason)
+        return rule_expansion(key)
+
+    def expand(self, details_input: str) -> dict:
+        key = normalize_query(details_input)
+        if not self.breaker.allow():
+            LLM_CALLS.inc("short_circuit")
+            return self.fallback(key, "breaker_open")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            LLM_CALLS.inc("rejected")
+            self.breaker.release()
+            return self.fallback(key, "saturated")
+
+        self._track(1)
+        try:
+            expanded = self.call(details_input)
+        except ValueError as e:  # 응답은 왔지만 JSON이 아님 (LLM 서버 장애로 보지 않음)
+            LLM_CALLS.inc("bad_response")
+            print("OpenAI 응답 파싱 실패:", e)
+            self.breaker.record_success()
+            return self.fallback(key, "bad_response")
+        except Exception as e:
+            outcome = "timeout" if "timeout" in type(e).__name__.lower() else "error"
+            LLM_CALLS.inc(outcome)
+            print(f"OpenAI API 요청 실패 ({outcome}):", e)
+            self.breaker.record_failure()
+            return self.fallback(key, outcome)
+        finally:
+            self._track(-1)
+            self._slots.release()
+
+        LLM_CALLS.inc("ok")
+        self.breaker.record_success()
+        self.cache.set(key, expanded)
+        return expanded
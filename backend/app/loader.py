@@ -0,0 +1,277 @@
+## 전처리된 식당 데이터를 db에 적재하는 파일
+"""
+전처리가 끝난 식당 CSV(preprocessed_naver_updated.csv)를 restaurant_updated 테이블에 적재합니다.
+
+menu, facilities, very_good, seat_info는 CSV에 파이썬 리스트 문자열로 저장되어 있으므로
+적재 시점에 한 번만 파싱하여 text[] 컬럼으로 넣습니다.
+(스키마: database/migrations/001_restaurant_typed_columns.sql, 003_restaurant_id.sql)
+
+restaurant_id는 개체 매칭 단계(entity_resolution.py)에서 부여된 값을 그대로 사용합니다.
+
+--stats를 지정하면 전처리 단계에서 계산한 식당별 리뷰 집계(restaurant_stats.csv)를
+restaurant_stats 테이블에 함께 적재합니다. (스키마: database/migrations/004_restaurant_stats.sql)
+
+upsert_catalog는 테이블을 비우지 않고 바뀐 식당만 갱신(INSERT ... ON CONFLICT)하고 사라진 식당만 삭제합니다.
+(review_analysis/refresh.py의 증분 갱신에서 사용)
+
+--snapshot을 지정하면 적재 후 API 워커들이 공유하는 읽기 전용 카탈로그 스냅샷을 다시 만듭니다. (catalog_snapshot.py)
+"""
+import ast
+import json
+import math
+from argparse import ArgumentParser
+
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from catalog_snapshot import export_catalog_snapshot
+from database import get_db_connection, bump_catalog_version
+
+RESTAURANT_COLUMNS = [
+    "name", "category", "jibun_address", "road_address", "phone", "business_hours",
+    "review_count", "description", "size", "latitude", "longitude",
+    "menu", "facilities", "parking", "very_good", "seat_info", "restaurant_id",
+]
+STATS_COLUMNS = [
+    "restaurant_id", "review_total", "latest_review_date",
+    "reviews_by_month", "very_good_counts", "top_terms",
+]
+
+
+def is_missing(value) -> bool:
+    """None, NaN, 빈 문자열, 'null'/'none' 문자열을 결측으로 판단"""
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, str) and value.strip().lower() in ["", "null", "none", "nan"]
+
+
+def parse_list_literal(value) -> list:
+    """JSON 또는 파이썬 리스트 형태의 문자열을 리스트로 변환 (실패 시 빈 리스트)"""
+    if is_missing(value):
+        return []
+    if isinstance(value, list):
+        return value
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            parsed = parse(value)
+            return parsed if isinstance(parsed, list) else []
+        except (ValueError, SyntaxError):
+            continue
+    return []
+
+
+def first_items(values: list) -> list:
+    """[[이름, 값], ...] 형태면 이름만, [이름, ...] 형태면 그대로 문자열 리스트로 반환"""
+    items = []
+    for value in values:
+        item = value[0] if isinstance(value, (list, tuple)) and value else value
+        if not is_missing(item):
+            items.append(str(item).replace('"', "").strip())
+    return items
+
+
+def optional(value, cast=None):
+    """결측이면 None, 아니면 (필요 시 cast 적용한) 값 반환"""
+    if is_missing(value):
+        return None
+    return cast(value) if cast else value
+
+
+def build_row(record: dict) -> tuple:
+    """CSV 한 행을 restaurant_updated 컬럼 순서의 튜플로 변환"""
+    return (
+        record["name"],
+        optional(record.get("category")),
+        optional(record.get("jibun_address")),
+        optional(record.get("road_address")),
+        optional(record.get("phone")),
+        optional(record.get("business_hours")),
+        optional(record.get("review_count"), int),
+        optional(record.get("description")),
+        optional(record.get("size"), float),
+        optional(record.get("latitude"), float),
+        optional(record.get("longitude"), float),
+        first_items(parse_list_literal(record.get("menu"))),  # [[메뉴명, 가격], ...] -> 메뉴명
+        first_items(parse_list_literal(record.get("facilities"))),
+        optional(record.get("parking")),
+        first_items(parse_list_literal(record.get("very_good"))),  # [[라벨, 개수], ...] -> 라벨
+        first_items(parse_list_literal(record.get("seat_info"))),
+        record["restaurant_id"],
+    )
+
+
+def read_id_csv(csv_path: str, required=("restaurant_id",)) -> pd.DataFrame:
+    """
+    restaurant_id를 문자열로 읽는 CSV 로딩 (숫자처럼 보이는 id가 int/float로 바뀌지 않도록).
+    필요한 컬럼이 없으면 어떤 컬럼이 없는지 알려주는 ValueError
+    """
+    df = pd.read_csv(csv_path, dtype={"restaurant_id": str})
+    missing = [column for column in required if column not in df.columns]
+    if missing:
+        raise ValueError(
+            f"{csv_path}에 {', '.join(missing)} 컬럼이 없습니다. "
+            "restaurant_id는 전처리(NaverProcessor, entity_resolution.py)에서 부여되므로 전처리를 다시 실행하세요."
+        )
+    return df
+
+
+def load_restaurants(csv_path: str) -> int:
+    """
+    CSV를 읽어 restaurant_updated 테이블을 새 데이터로 교체합니다.
+    하나의 트랜잭션에서 처리하므로 적재 중 오류가 나면 기존 데이터가 유지되며,
+    성공하면 catalog_meta의 버전이 올라가 API 서버의 결과 캐시가 무효화됩니다.
+    """
+    df = read_id_csv(csv_path, required=("restaurant_id", "name"))
+    df = df[df["name"].notna()]
+    if df["restaurant_id"].isna().any():
+        print(f"restaurant_id가 없는 {df['restaurant_id'].isna().sum()}개 행은 제외합니다.")
+    df = df[df["restaurant_id"].notna()].drop_duplicates("restaurant_id")
+    rows = [build_row(record) for record in df.to_dict("records")]
+
+    conn = get_db_connection()
+    if conn is None:
+        return 0
+
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute("TRUNCATE restaurant_updated")
+                execute_values(
+                    cursor,
+                    f"INSERT INTO restaurant_updated ({', '.join(RESTAURANT_COLUMNS)}) VALUES %s",
+                    rows,
+                    page_size=500,
+                )
+                version = bump_catalog_version(cursor)  # API 서버의 결과 캐시 무효화
+        print(f"restaurant_updated 적재 완료: {len(rows)}개 (카탈로그 버전 {version})")
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def build_stats_row(record: dict) -> tuple:
+    """restaurant_stats.csv 한 행을 restaurant_stats 컬럼 순서의 튜플로 변환 (JSON 컬럼은 문자열 그대로 jsonb로 적재)"""
+    return (
+        record["restaurant_id"],
+        optional(record.get("review_total"), int) or 0,
+        optional(record.get("latest_review_date")),
+        optional(record.get("reviews_by_month")) or "{}",
+        optional(record.get("very_good_counts")) or "{}",
+        optional(record.get("top_terms")) or "[]",
+    )
+
+
+def load_restaurant_stats(csv_path: str) -> int:
+    """
+    식당별 리뷰 집계 CSV를 읽어 restaurant_stats 테이블을 새 데이터로 교체합니다. (하나의 트랜잭션)
+    """
+    df = read_id_csv(csv_path)
+    df = df[df["restaurant_id"].notna()].drop_duplicates("restaurant_id")
+    rows = [build_stats_row(record) for record in df.to_dict("records")]
+
+    conn = get_db_connection()
+    if conn is None:
+        return 0
+
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute("TRUNCATE restaurant_stats")
+                execute_values(
+                    cursor,
+                    f"INSERT INTO restaurant_stats ({', '.join(STATS_COLUMNS)}) VALUES %s",
+                    rows,
+                    template="(%s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb)",
+                    page_size=500,
+                )
+        print(f"restaurant_stats 적재 완료: {len(rows)}개")
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def upsert_catalog(csv_path: str, stats_path: str = None, restaurant_ids=None, removed_ids=()) -> int:
+    """
+    restaurant_ids 식당의 행만 restaurant_updated(및 stats_path가 있으면 restaurant_stats)에 갱신하고
+    removed_ids 식당은 두 테이블에서 삭제합니다. (하나의 트랜잭션, 바뀐 것이 있으면 카탈로그 버전 증가)
+    restaurant_ids가 None이면 CSV의 모든 식당을 갱신합니다.
+
+    Returns:
+        갱신한 식당 수.
+    """
+    df = read_id_csv(csv_path, required=("restaurant_id", "name"))
+    df = df[df["name"].notna() & df["restaurant_id"].notna()].drop_duplicates("restaurant_id")
+    if restaurant_ids is not None:
+        df = df[df["restaurant_id"].isin(set(restaurant_ids))]
+    rows = [build_row(record) for record in df.to_dict("records")]
+    stats_rows = []
+    if stats_path:
+        stats = read_id_csv(stats_path)
+        stats = stats[stats["restaurant_id"].isin(set(df["restaurant_id"]))].drop_duplicates("restaurant_id")
+        stats_rows = [build_stats_row(record) for record in stats.to_dict("records")]
+    removed_ids = list(removed_ids)
+    if not rows and not removed_ids:
+        print("restaurant_updated: 바뀐 식당이 없습니다.")
+        return 0
+
+    conn = get_db_connection()
+    if conn is None:
+        return 0
+
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in RESTAURANT_COLUMNS if column != "restaurant_id")
+    stats_updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in STATS_COLUMNS if column != "restaurant_id")
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                if removed_ids:
+                    cursor.execute("DELETE FROM restaurant_updated WHERE restaurant_id = ANY(%s)", (removed_ids,))
+                    cursor.execute("DELETE FROM restaurant_stats WHERE restaurant_id = ANY(%s)", (removed_ids,))
+                execute_values(
+                    cursor,
+                    f"INSERT INTO restaurant_updated ({', '.join(RESTAURANT_COLUMNS)}) VALUES %s "
+                    f"ON CONFLICT (restaurant_id) DO UPDATE SET {updates}",
+                    rows,
+                    page_size=500,
+                )
+                if stats_rows:
+                    execute_values(
+                        cursor,
+                        f"INSERT INTO restaurant_stats ({', '.join(STATS_COLUMNS)}) VALUES %s "
+                        f"ON CONFLICT (restaurant_id) DO UPDATE SET {stats_updates}, updated_at = now()",
+                        stats_rows,
+                        template="(%s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb)",
+                        page_size=500,
+                    )
+                version = bump_catalog_version(cursor)  # API 서버의 결과 캐시 무효화
+        print(f"restaurant_updated 증분 적재 완료: 갱신 {len(rows)}개, 삭제 {len(removed_ids)}개 "
+              f"(리뷰 집계 {len(stats_rows)}개, 카탈로그 버전 {version})")
+        return len(rows)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Load preprocessed restaurants into restaurant_updated.")
+    parser.add_argument(
+        "csv_path", nargs="?", default="../../database/preprocessed_naver_updated.csv",
+        help="Preprocessed restaurant CSV. Example: ../../database/preprocessed_naver_updated.csv"
+    )
+    parser.add_argument(
+        "--stats", default=None,
+        help="Per-restaurant review stats CSV from preprocessing. Example: ../../database/restaurant_stats.csv"
+    )
+    parser.add_argument(
+        "--snapshot", default=None,
+        help="Rewrite the catalog snapshot served to API workers. Example: ../../database/catalog.snapshot"
+    )
+    args = parser.parse_args()
+    try:
+        loaded = load_restaurants(args.csv_path)
+        if args.stats:
+            load_restaurant_stats(args.stats)
+    except ValueError as e:
+        parser.exit(1, f"적재 실패: {e}\n")
+    if args.snapshot and loaded:
+        export_catalog_snapshot(args.snapshot)
@@ -1,15 +1,65 @@
 ## fastapi 실행
-from fastapi import FastAPI
-from pydantic import BaseModel
-from menu_filter import filter_restaurants
+import asyncio
+import time
+from typing import List, Literal, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+import metrics
+from cache import MISSING, normalize_query
+from menu_filter import filter_restaurants, filter_restaurants_many, result_cache
 from details_filter import regenerate_query, filter_by_expanded_query
+from review_search import search_restaurants_by_reviews
+from hybrid_search import hybrid_search
+from vector_search import start_warm_up
+from precompute import get_precomputed
+from request_log import log_request
 
 app = FastAPI()
 
+# 결과 캐시 통계도 /metrics에 함께 노출
+metrics.register(metrics.GaugeFunc("jemechu_cache_hit_rate", "filter_restaurants cache hit rate.",
+                                   lambda: result_cache.stats()["hit_rate"]))
+metrics.register(metrics.GaugeFunc("jemechu_cache_size", "filter_restaurants cache entries.",
+                                   lambda: result_cache.stats()["size"]))
+
+@app.on_event("startup")
+async def warm_up_vector_search():
+    """
+    질의 임베딩 모델을 백그라운드에서 미리 로딩 (첫 하이브리드 검색이 모델 로딩을 기다리지 않도록)
+    """
+    start_warm_up()
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    요청 수, 상태 코드, 지연 시간을 기록하는 미들웨어
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # 라벨 개수가 늘어나지 않도록 라우트 경로 사용 (매칭되는 라우트가 없는 404는 하나로 묶음)
+        route = request.scope.get("route")
+        if route is not None:
+            path = route.path
+        else:
+            path = "unmatched" if status == 404 else request.url.path
+        metrics.REQUESTS.inc(request.method, path, str(status))
+        metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, request.method, path)
+        if status >= 500:
+            metrics.ERRORS.inc("request")
+
 # 아예 filter를 하나로 통합..
 class FilterRequest(BaseModel):
     user_input: str  # 메뉴명 or 카테고리 or "아무거나"
     details: str  # 세부사항
+    mode: Literal["strict", "hybrid"] = "strict"  # strict: 메뉴 필터 후 키워드 매칭, hybrid: 하이브리드 검색
+    top_k: int = Field(10, ge=1, le=100)  # hybrid 모드 결과 개수
+    fusion: Literal["rrf", "weighted"] = "rrf"  # hybrid 모드 순위 결합 방식
 
 class MenuRequest(BaseModel):
     user_input: str  # 메뉴명 또는 카테고리명 또는 "아무거나"
@@ -17,18 +67,42 @@ class MenuRequest(BaseModel):
 class DetailsRequest(BaseModel):
     details: str
 
+class ReviewSearchRequest(BaseModel):
+    query: str  # 리뷰 내용 검색어 (예: "분위기 좋은 데이트")
+    top_k: int = Field(10, ge=1, le=100)
+
+class BatchQuery(BaseModel):
+    user_input: str  # 메뉴명 또는 카테고리명 또는 "아무거나"
+    details: Optional[str] = None  # 세부사항 (없으면 1차 필터링 결과만 반환)
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery]
+
 @app.post("/filter_restaurants_with_details/")
 async def filter_restaurants_with_details(request: FilterRequest):
     """
     사용자가 입력한 메뉴 또는 카테고리 + 세부사항 기반으로 식당 필터링 API
+    - mode="hybrid"면 메뉴/카테고리, 리뷰 BM25, 리뷰 임베딩 검색 결과를 합친 순위를 반환 (hybrid_search.py)
     """
-    # 1차 필터링 (메뉴 또는 카테고리)
-    filtered_data = filter_restaurants(request.user_input)
+    start = time.perf_counter()
+    if request.mode == "hybrid":
+        response = await hybrid_search(request.user_input, request.details, request.top_k, request.fusion)
+        log_request("/filter_restaurants_with_details/", request.user_input, request.details,
+                    len(response["restaurants"]), time.perf_counter() - start)
+        return response
+
+    # 인기 조합은 미리 계산된 결과로 바로 응답 (precompute.py)
+    result = get_precomputed(request.user_input, request.details)
+    if result is MISSING:
+        # 1차 필터링 (메뉴 또는 카테고리)
+        filtered_data = filter_restaurants(request.user_input)
 
-    # 2차 필터링 (세부사항)
-    expanded_query = regenerate_query(request.details)
-    result = filter_by_expanded_query(filtered_data, expanded_query)
+        # 2차 필터링 (세부사항) - OpenAI 호출은 blocking이므로 스레드에서 실행 (이벤트 루프를 막지 않도록)
+        expanded_query = await asyncio.to_thread(regenerate_query, request.details)
+        result = filter_by_expanded_query(filtered_data, expanded_query)
 
+    log_request("/filter_restaurants_with_details/", request.user_input, request.details,
+                len(result), time.perf_counter() - start)
     return {"restaurants": result}
 
 @app.post("/filter_restaurants/")
@@ -36,7 +110,11 @@ async def filter_restaurants_api(request: MenuRequest):
     """
     사용자가 입력한 메뉴 또는 카테고리 기반으로 식당 필터링 API
     """
-    result = filter_restaurants(request.user_input)
+    start = time.perf_counter()
+    result = get_precomputed(request.user_input)
+    if result is MISSING:
+        result = filter_restaurants(request.user_input)
+    log_request("/filter_restaurants/", request.user_input, None, len(result), time.perf_counter() - start)
     return {"restaurants": result}
 
 @app.post("/filter_details/")
@@ -44,13 +122,98 @@ async def filter_details(request: DetailsRequest):
     """
     세부사항 기반 식당 필터링 API
     """
-    expanded_query = regenerate_query(request.details)
+    expanded_query = await asyncio.to_thread(regenerate_query, request.details)
     result = filter_by_expanded_query(expanded_query)
     return {"restaurants": result}
 
+@app.post("/search_reviews/")
+async def search_reviews(request: ReviewSearchRequest):
+    """
+    리뷰 내용 기반 식당 검색 API (BM25, 점수 내림차순)
+    """
+    start = time.perf_counter()
+    result = search_restaurants_by_reviews(request.query, request.top_k)
+    log_request("/search_reviews/", None, request.query, len(result), time.perf_counter() - start)
+    return {"restaurants": result}
+
+@app.post("/filter_restaurants_batch/")
+async def filter_restaurants_batch(request: BatchRequest):
+    """
+    여러 개의 (메뉴/카테고리, 세부사항) 요청을 한 번에 처리하는 배치 API
+    - 중복된 입력은 한 번만 처리하고, 미리 계산된 조합은 바로 응답
+    - 1차 필터링은 DB 1회 조회로 처리하고, 세부사항 query 재생성은 동시에 실행
+    - 결과는 요청 순서대로 {"results": [{"restaurants": [...]}, ...]} 형태로 반환
+    """
+    start = time.perf_counter()
+    answers = {}
+    pending = []
+    for q in request.queries:
+        key = (normalize_query(q.user_input), None if q.details is None else normalize_query(q.details))
+        if key not in answers:
+            precomputed = get_precomputed(*key)
+            if precomputed is not MISSING:
+                answers[key] = precomputed
+            else:
+                pending.append(key)
+
+    # 1차 필터링 (메뉴 또는 카테고리)
+    filtered = filter_restaurants_many([user_input for user_input, _ in pending])
+
+    # 세부사항별 query 재생성 (OpenAI 호출은 blocking이므로 스레드에서 동시에 실행)
+    details_list = list(dict.fromkeys(details for _, details in pending if details is not None))
+    expanded_queries = await asyncio.gather(*(asyncio.to_thread(regenerate_query, d) for d in details_list))
+    expanded = dict(zip(details_list, expanded_queries))
+
+    # 2차 필터링 (세부사항) - 동일한 (입력, 세부사항) 조합은 한 번만 계산
+    results = []
+    for q in request.queries:
+        key = (normalize_query(q.user_input), None if q.details is None else normalize_query(q.details))
+        if key not in answers:
+            if key[1] is None:
+                answers[key] = filtered[key[0]]
+            else:
+                answers[key] = filter_by_expanded_query(filtered[key[0]], expanded[key[1]])
+        results.append({"restaurants": answers[key]})
+
+    latency = time.perf_counter() - start
+    for q, result in zip(request.queries, results):
+        log_request("/filter_restaurants_batch/", q.user_input, q.details, len(result["restaurants"]), latency)
+    return {"results": results}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Prometheus 형식의 요청/단계별 지표
+    """
+    return metrics.render_metrics()
+
+@app.get("/cache_stats/")
+async def cache_stats():
+    """
+    filter_restaurants 결과 캐시의 적중률 등 통계 반환
+    """
+    return result_cache.stats()
+
 # FastAPI 실행
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Run the JeMeChu API server.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Worker processes. Set CATALOG_SNAPSHOT so workers share one catalog mapping.")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # 워커 프로세스마다 main.py를 다시 import해야 하므로 "모듈:변수" 문자열로 실행
+        # 카탈로그 스냅샷과 리뷰/벡터 색인은 mmap으로 열리므로 워커끼리 같은 페이지를 공유함
+        if not os.getenv("CATALOG_SNAPSHOT"):
+            print("CATALOG_SNAPSHOT이 설정되지 않아 워커마다 DB에서 식당을 조회합니다.")
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
 
 # 실행 원하면 : python backend/app/main.py 실행해보삼..
\ No newline at end of file
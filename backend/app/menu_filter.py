@@ -1,214 +1,300 @@
-from database import get_db_connection
+from database import get_db_connection, fetch_catalog_version
+from catalog_snapshot import RESULT_LIMIT, get_catalog_snapshot
+from cache import LRUCache, MISSING, normalize_query
+from metrics import stage_timer
 import json
+import os
+import time
 from datetime import datetime
 
-## db 열 구조 수정 후 함수 수정 예정
-def filter_restaurants(user_input: str):
+# menu, facilities, very_good, seat_info는 text[] 컬럼이므로 psycopg2가 바로 리스트로 변환해줌
+# (스키마: database/migrations/001_restaurant_typed_columns.sql, 적재: loader.py)
+RESTAURANT_COLUMNS = "restaurant_id, name, category, menu, business_hours, facilities, parking, very_good"
+CATEGORIES = {"한식", "중식", "일식", "양식", "주점"}
+
+# 카탈로그 스냅샷(식당 id 순)과 같은 식당이 나오도록 모든 DB 조회를 같은 순서로 정렬
+RESULT_ORDER = "restaurant_id"
+
+# 결과 캐시: 정규화된 입력 -> 필터링 결과 (restaurant_updated 재적재 시 카탈로그 버전이 바뀌면 비워짐)
+result_cache = LRUCache(maxsize=int(os.getenv("MENU_CACHE_SIZE", "1024")))
+CATALOG_VERSION_TTL = float(os.getenv("CATALOG_VERSION_TTL", "5"))  # 카탈로그 버전 재확인 주기(초)
+_catalog_version = {"value": None, "checked_at": float("-inf")}
+
+def current_catalog_version():
+    """카탈로그 버전을 CATALOG_VERSION_TTL초에 한 번만 DB에서 확인 (카탈로그 스냅샷을 사용 중이면 스냅샷의 버전)"""
+    snapshot = get_catalog_snapshot()
+    if snapshot is not None:
+        return snapshot.version
+    now = time.monotonic()
+    if now - _catalog_version["checked_at"] >= CATALOG_VERSION_TTL:
+        _catalog_version["checked_at"] = now
+        version = fetch_catalog_version()
+        if version is not None:  # 조회 실패 시 마지막으로 확인한 버전 유지
+            _catalog_version["value"] = version
+    return _catalog_version["value"]
+
+def filter_restaurants(user_input: str, limit: int = RESULT_LIMIT):
     """
     - 사용자의 입력(user_input)에 따라 식당을 필터링.
     - 입력이 특정 "메뉴"라면 해당 메뉴가 포함된 식당만 반환.
     - 입력이 특정 "카테고리(한식, 중식, 일식 등)"라면 해당 카테고리의 식당을 반환.
     - 입력이 "아무거나"라면 모든 식당 반환.
+    - 결과는 최대 limit개 (API 응답은 RESULT_LIMIT개, 하이브리드 검색 후보는 더 많이)
+    - 같은 카탈로그 버전에서 동일한 입력은 캐시된 결과를 반환 (DB 조회 오류 결과는 캐시하지 않음)
     """
-    categories = {"한식", "중식", "일식", "양식", "주점"}
+    user_input = normalize_query(user_input)
+    key = user_input if limit == RESULT_LIMIT else (user_input, limit)
+    result_cache.sync_version(current_catalog_version())
+    cached = result_cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    result = query_restaurants(user_input, limit)
+    if result is None:
+        return []
+    result_cache.set(key, result)
+    return result
 
-    if user_input in categories:
-        return filter_by_category_from_db(user_input)
+def filter_restaurants_many(user_inputs):
+    """
+    여러 입력을 한 번에 필터링 (배치 API용).
+    - 중복 입력은 한 번만 처리하고, 캐시에 없는 입력은 DB 1회 조회로 모두 처리
+    - 반환값: {정규화된 입력: 필터링 결과}
+    """
+    result_cache.sync_version(current_catalog_version())
+
+    results = {}
+    misses = []
+    for user_input in dict.fromkeys(normalize_query(u) for u in user_inputs):
+        cached = result_cache.get(user_input)
+        if cached is not MISSING:
+            results[user_input] = cached
+        else:
+            misses.append(user_input)
+
+    if misses:
+        if get_catalog_snapshot() is not None:
+            fetched = {user_input: query_restaurants(user_input) for user_input in misses}
+        else:
+            fetched = filter_many_from_db(misses)
+        for user_input in misses:
+            if fetched is None:  # DB 오류 결과는 캐시하지 않음
+                results[user_input] = []
+            else:
+                results[user_input] = fetched.get(user_input, [])
+                result_cache.set(user_input, results[user_input])
+
+    return results
+
+def query_restaurants(user_input: str, limit: int = RESULT_LIMIT):
+    """캐시 없이 카탈로그 스냅샷(CATALOG_SNAPSHOT) 또는 DB에서 바로 필터링 (오류 시 None)"""
+    snapshot = get_catalog_snapshot()
+    by_category = snapshot.filter_by_category if snapshot is not None else filter_by_category_from_db
+    by_menu = snapshot.filter_by_menu if snapshot is not None else filter_by_menu_from_db
+    if user_input in CATEGORIES:
+        return by_category(user_input, limit)
     elif user_input == "아무거나":
-        return filter_by_category_from_db("아무거나")  # 모든 식당 반환
+        return by_category("아무거나", limit)  # 모든 식당 반환
     else:
-        return filter_by_menu_from_db(user_input)  # 메뉴 필터링
+        return by_menu(user_input, limit)  # 메뉴 필터링
+
+def to_restaurant(res):
+    """DB 조회 결과 한 행을 API 응답 형식의 딕셔너리로 변환"""
+    return {
+        "id": res["restaurant_id"],
+        "name": res["name"],
+        "category": res["category"],
+        "menu": res["menu"] or ["메뉴 정보 없음"],
+        "business_hours": res["business_hours"] if res["business_hours"] else "영업시간 정보 없음",
+        "facilities": res["facilities"] or [],
+        "parking": res["parking"] if res["parking"] else "주차 정보 없음",
+        "very_good": res["very_good"] or [],
+    }
+
+
+def filter_by_category_from_db(category: str, limit: int = RESULT_LIMIT):
+    """
+    PostgreSQL에서 카테고리에 해당하는 식당을 필터링. (DB 오류 시 None)
+    """
+    conn = get_db_connection()
+    if conn is None:
+        return None
 
-def safe_json_loads(value, default=[]):
-    """JSON 문자열을 변환하고, 오류 시 기본값 반환"""
-    if not value or value.lower() in ["null", "none"]:
-        return default
+    cursor = conn.cursor()
     try:
-        return json.loads(value) if isinstance(value, str) else value
-    except json.JSONDecodeError:
-        return default
+        with stage_timer("db_query"):
+            if category == "아무거나":
+                cursor.execute(f"SELECT {RESTAURANT_COLUMNS} FROM restaurant_updated ORDER BY {RESULT_ORDER} LIMIT %s",
+                               (limit,))
+            else:
+                cursor.execute(f"SELECT {RESTAURANT_COLUMNS} FROM restaurant_updated WHERE category = %s "
+                               f"ORDER BY {RESULT_ORDER} LIMIT %s", (category, limit))
+            rows = cursor.fetchall()
+
+        with stage_timer("parse"):
+            return [to_restaurant(res) for res in rows]
 
-def parse_menu(menu_data):
-    """메뉴 데이터가 이중 리스트 형태일 경우 변환"""
-    menu_list = safe_json_loads(menu_data, default=[])
-    return [item[0] for item in menu_list] if menu_list else ["메뉴 정보 없음"]
+    except Exception as e:
+        print("DB 조회 오류:", e)
+        return None
+    finally:
+        cursor.close()
+        conn.close()
 
 
-def parse_keywords(keyword_data):
-    """keyword 열에서 facilities, parking, very_good을 분리"""
-    keyword_list = safe_json_loads(keyword_data, default=[])
-    
-    facilities = keyword_list[:-4] if len(keyword_list) > 4 else keyword_list  # 앞부분 = 시설 정보
-    very_good = keyword_list[-4:] if len(keyword_list) > 4 else []  # 마지막 4개 = "이런 점이 좋았어요"
-    parking = "주차 가능" if any("주차 가능" in kw for kw in keyword_list) else "주차 불가"
+def filter_by_menu_from_db(menu_item: str, limit: int = RESULT_LIMIT):
+    """
+    PostgreSQL에서 특정 메뉴가 포함된 식당을 필터링. (DB 오류 시 None)
+    """
+    conn = get_db_connection()
+    if conn is None:
+        return None
 
-    return facilities, parking, very_good
+    cursor = conn.cursor()
+    try:
+        # menu @> ARRAY[...] 는 menu 컬럼의 GIN 인덱스를 사용함
+        with stage_timer("db_query"):
+            cursor.execute(
+                f"SELECT {RESTAURANT_COLUMNS} FROM restaurant_updated WHERE menu @> ARRAY[%s]::text[] "
+                f"ORDER BY {RESULT_ORDER} LIMIT %s",
+                (menu_item, limit)
+            )
+            rows = cursor.fetchall()
+
+        with stage_timer("parse"):
+            return [to_restaurant(res) for res in rows]  # 최대 limit개 반환
 
+    except Exception as e:
+        print("메뉴 필터링 오류:", e)
+        return None
+    finally:
+        cursor.close()
+        conn.close()
 
-def filter_by_category_from_db(category: str):
+def filter_many_from_db(user_inputs, limit: int = RESULT_LIMIT):
     """
-    PostgreSQL에서 카테고리에 해당하는 식당을 필터링.
+    메뉴/카테고리/"아무거나" 입력 여러 개를 한 번의 쿼리로 필터링. (DB 오류 시 None)
+    - 입력마다 최대 limit개씩, {입력: 식당 리스트} 형태로 반환 (filter_restaurants와 같은 식당, 같은 순서)
     """
+    categories = [u for u in user_inputs if u in CATEGORIES]
+    menus = [u for u in user_inputs if u not in CATEGORIES and u != "아무거나"]
+
+    # 입력 종류별로 (matched = 해당 입력, rn = 입력 내 순번) 을 붙여 UNION ALL로 합침
+    parts = []
+    params = {"categories": categories, "menus": menus, "limit": limit}
+    if menus:
+        # menu && 조건으로 GIN 인덱스를 사용해 후보를 줄인 뒤, 메뉴별로 = ANY(menu) 매칭
+        parts.append(f"""
+            SELECT {RESTAURANT_COLUMNS}, m.item AS matched,
+                   ROW_NUMBER() OVER (PARTITION BY m.item ORDER BY r.{RESULT_ORDER}) AS rn
+            FROM restaurant_updated r
+            JOIN unnest(%(menus)s::text[]) AS m(item) ON m.item = ANY(r.menu)
+            WHERE r.menu && %(menus)s::text[]
+        """)
+    if categories:
+        parts.append(f"""
+            SELECT {RESTAURANT_COLUMNS}, category AS matched,
+                   ROW_NUMBER() OVER (PARTITION BY category ORDER BY {RESULT_ORDER}) AS rn
+            FROM restaurant_updated
+            WHERE category = ANY(%(categories)s)
+        """)
+    if "아무거나" in user_inputs:
+        parts.append(f"""
+            SELECT {RESTAURANT_COLUMNS}, '아무거나' AS matched,
+                   ROW_NUMBER() OVER (ORDER BY {RESULT_ORDER}) AS rn
+            FROM (SELECT * FROM restaurant_updated ORDER BY {RESULT_ORDER} LIMIT %(limit)s) AS a
+        """)
+
     conn = get_db_connection()
     if conn is None:
-        return []
+        return None
 
     cursor = conn.cursor()
     try:
-        if category == "아무거나":
-            cursor.execute("SELECT name, category, menu, business_hours, keyword FROM restaurant_updated LIMIT 3") # SELECT id, name, category, menu, business_hours, , facilities, parking, very_good FROM restaurant_updated 
-        else:
-            cursor.execute("SELECT name, category, menu, business_hours, keyword FROM restaurant_updated WHERE category = %s LIMIT 3", (category,))
-        
-        results = cursor.fetchall()
-        conn.close()
-
-        return [
-            {
-                "name": res["name"],
-                "category": res["category"],
-                "menu": parse_menu(res["menu"]),
-                "business_hours": res["business_hours"] if res["business_hours"] else "영업시간 정보 없음",
-                **dict(zip(["facilities", "parking", "very_good"], parse_keywords(res["keyword"])))
-            }
-            for res in results
-        ]
-
-        # filtered_results = []
-        # for res in results:
-        #     menu_list = []
-        #     if isinstance(res["menu"], str):  # JSON 변환 처리
-        #         try:
-        #             menu_list = json.loads(res["menu"]) if res["menu"] else []
-        #         except json.JSONDecodeError:
-        #             menu_list = []
-        #     elif isinstance(res["menu"], list):
-        #         menu_list = res["menu"]
-
-        #     filtered_results.append({
-        #         # "id": res["id"],
-        #         "name": res["name"],
-        #         "category": res["category"],
-        #         "menu": parse_menu(res["menu"]),
-        #         "business_hours": res["business_hours"],
-        #         "facilities": parse_keywords(res["keyword"])[0],  # 시설 정보
-        #         "parking": parse_keywords(res["keyword"])[1],  # 주차 정보
-        #         "very_good": parse_keywords(res["keyword"])[2]  # "이런 점이 좋았어요"
-        #         # "facilities": json.loads(res["facilities"]) if isinstance(res["facilities"], str) else res["facilities"],
-        #         # "facilities": safe_json_loads(res["facilities"]),
-        #         # "parking": res["parking"],
-        #         # "very_good": res["very_good"]
-        #     })
-
-        # return filtered_results
+        query = " UNION ALL ".join(f"SELECT * FROM ({part}) AS t WHERE rn <= %(limit)s" for part in parts)
+        query += " ORDER BY matched, rn"  # 입력별 결과를 단일 조회와 같은 순서로
+        with stage_timer("db_query"):
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        with stage_timer("parse"):
+            results = {}
+            for res in rows:
+                results.setdefault(res["matched"], []).append(to_restaurant(res))
+            return results
 
     except Exception as e:
-        print("DB 조회 오류:", e)
-        return []
+        print("배치 필터링 오류:", e)
+        return None
     finally:
         cursor.close()
         conn.close()
 
-
-def filter_by_menu_from_db(menu_item: str):
+def fetch_restaurants_by_ids(restaurant_ids):
     """
-    PostgreSQL에서 특정 메뉴가 포함된 식당을 필터링.
+    restaurant_id 목록으로 식당을 한 번에 조회 (리뷰 검색 등 다른 검색 결과에 식당 정보를 붙일 때 사용)
+    - 반환값: {restaurant_id: API 응답 형식의 식당 딕셔너리} (DB 오류 시 빈 딕셔너리)
     """
+    if not restaurant_ids:
+        return {}
+
+    snapshot = get_catalog_snapshot()
+    if snapshot is not None:
+        return snapshot.get_many(restaurant_ids)
+
     conn = get_db_connection()
     if conn is None:
-        return []
+        return {}
 
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT name, category, menu, business_hours, keyword FROM restaurant_updated") # 나중에 id 추가!!!!!
-        results = cursor.fetchall()
-        conn.close()
+        with stage_timer("db_query"):
+            cursor.execute(
+                f"SELECT {RESTAURANT_COLUMNS} FROM restaurant_updated WHERE restaurant_id = ANY(%s)",
+                (list(restaurant_ids),)
+            )
+            rows = cursor.fetchall()
 
-        filtered_data = []
-        for res in results:
-            menu_list = parse_menu(res["menu"])
-            
-            if menu_item in menu_list:  # 특정 메뉴가 포함된 경우만 추가
-                filtered_data.append({
-                    "name": res["name"],
-                    "category": res["category"],
-                    "menu": menu_list,
-                    "business_hours": res["business_hours"] if res["business_hours"] else "영업시간 정보 없음",
-                    **dict(zip(["facilities", "parking", "very_good"], parse_keywords(res["keyword"])))
-                })
-
-        return filtered_data[:3]  # 최대 3개 반환
-
-
-        # def parse_menu(menu_data):
-        #     """메뉴 데이터가 이중 리스트 형태일 경우 변환"""
-        #     try:
-        #         menu_list = json.loads(menu_data) if isinstance(menu_data, str) else menu_data
-        #         return [item[0] for item in menu_list]  # 메뉴 이름만 추출
-        #     except json.JSONDecodeError:
-        #         return []
-
-        # def parse_keywords(keyword_data):
-        #     """keyword 열에서 facilities, parking, very_good을 분리"""
-        #     try:
-        #         keyword_list = json.loads(keyword_data) if isinstance(keyword_data, str) else keyword_data
-        #         facilities = keyword_list[:-4] if len(keyword_list) > 4 else keyword_list  # 앞부분 = 시설 정보
-        #         very_good = keyword_list[-4:] if len(keyword_list) > 4 else []  # 마지막 4개 = "이런 점이 좋았어요"
-        #         parking = "주차 가능" if "주차 가능" in keyword_list else "주차 불가"
-        #         return facilities, parking, very_good
-        #     except json.JSONDecodeError:
-        #         return [], "주차 정보 없음", []
-
-        
-        # filtered_data = []
-        # for res in results:
-        #     menu_list = []
-        #     if isinstance(res["menu"], str):  # 메뉴가 문자열이면 JSON 변환
-        #         try:
-        #             menu_list = json.loads(res["menu"])
-        #         except json.JSONDecodeError:
-        #             menu_list = []
-
-        #     elif isinstance(res["menu"], list):  # 이미 리스트라면 그대로 사용
-        #         menu_list = res["menu"]
-            
-            
-
-        #     if menu_item in menu_list:  # 특정 메뉴가 포함된 경우만 추가
-        #         filtered_data.append({
-        #             # "id": res["id"],
-        #             "name": res["name"],
-        #             "category": res["category"],
-        #             "menu": parse_menu(res["menu"]),
-        #             "business_hours": res["business_hours"],
-        #             "facilities": parse_keywords(res["keyword"])[0],  # 시설 정보
-        #             "parking": parse_keywords(res["keyword"])[1],  # 주차 정보
-        #             "very_good": parse_keywords(res["keyword"])[2]  # "이런 점이 좋았어요"
-        #             # "facilities": safe_json_loads(res["facilities"]),
-        #             # # "facilities": json.loads(res["facilities"]) if isinstance(res["facilities"], str) else res["facilities"],
-        #             # "parking": res["parking"],
-        #             # "very_good": res["very_good"]
-        #         })
-
-        # return filtered_data[:3] #  나중에 바꾸기
+        with stage_timer("parse"):
+            return {res["restaurant_id"]: to_restaurant(res) for res in rows}
 
     except Exception as e:
-        print("메뉴 필터링 오류:", e)
-        return []
+        print("식당 id 조회 오류:", e)
+        return {}
     finally:
         cursor.close()
         conn.close()
 
-def safe_json_loads(value, default=[]):
-            """JSON 문자열을 변환하고, 오류 시 기본값 반환"""
-            if not value or value in ["null", "NULL"]:
-                return default
-            try:
-                return json.loads(value) if isinstance(value, str) else value
-            except json.JSONDecodeError:
-                return default
+def fetch_restaurant_stats(restaurant_ids):
+    """
+    restaurant_stats에서 식당별 리뷰 집계를 한 번에 조회. (DB 오류 시 빈 딕셔너리)
+    - 반환값: {restaurant_id: {"review_total", "latest_review_date", "reviews_by_month", "very_good_counts", "top_terms"}}
+    - jsonb 컬럼은 psycopg2가 바로 dict/list로 변환해줌 (스키마: database/migrations/004_restaurant_stats.sql)
+    """
+    if not restaurant_ids:
+        return {}
 
+    conn = get_db_connection()
+    if conn is None:
+        return {}
 
+    cursor = conn.cursor()
+    try:
+        with stage_timer("db_query"):
+            cursor.execute(
+                "SELECT restaurant_id, review_total, latest_review_date, reviews_by_month, very_good_counts, top_terms "
+                "FROM restaurant_stats WHERE restaurant_id = ANY(%s)",
+                (list(restaurant_ids),)
+            )
+            rows = cursor.fetchall()
+        return {row["restaurant_id"]: dict(row) for row in rows}
+
+    except Exception as e:
+        print("리뷰 집계 조회 오류:", e)
+        return {}
+    finally:
+        cursor.close()
+        conn.close()
 
 # 직접 실행할 경우 테스트 코드 추가
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+## 요청/단계별 지연 시간 측정 및 Prometheus 형식 출력
+import threading
+import time
+from contextlib import contextmanager
+
+# 단계별 지연 시간(초) 히스토그램 버킷
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(labelnames, labelvalues, extra=None) -> str:
+    """라벨을 Prometheus 형식 문자열로 변환 ({a="1",b="2"})"""
+    pairs = list(zip(labelnames, labelvalues)) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """단조 증가 카운터 (라벨별)"""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        """현재 값 (벤치마크/점검 스크립트에서 사용)"""
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            yield f"{self.name}{format_labels(self.labelnames, labelvalues)} {value}"
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (라벨별) - p95/p99는 Prometheus의 histogram_quantile로 계산"""
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labelvalues -> [버킷별 개수..., 합계, 전체 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labelvalues, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = format_labels(self.labelnames, labelvalues, [("le", bound)])
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = format_labels(self.labelnames, labelvalues, [("le", "+Inf")])
+            yield f"{self.name}_bucket{labels} {series[-1]}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labelvalues)} {series[-2]}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labelvalues)} {series[-1]}"
+
+
+class GaugeFunc:
+    """출력 시점에 함수를 호출해 값을 읽는 게이지 (예: 캐시 크기, 적중률)"""
+
+    def __init__(self, name: str, documentation: str, func):
+        self.name = name
+        self.documentation = documentation
+        self.func = func
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.func()}"
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """등록된 모든 지표를 Prometheus text exposition 형식으로 반환"""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# API 요청 단위 지표 (main.py 미들웨어에서 기록)
+REQUESTS = register(Counter(
+    "jemechu_requests_total", "Total HTTP requests.", ["method", "path", "status"]))
+REQUEST_LATENCY = register(Histogram(
+    "jemechu_request_duration_seconds", "HTTP request latency in seconds.", ["method", "path"]))
+
+# 단계별 지표: db_connect, db_query, catalog_version, parse, llm_expansion, keyword_match
+STAGE_LATENCY = register(Histogram(
+    "jemechu_stage_duration_seconds", "Latency of each backend stage in seconds.", ["stage"]))
+ERRORS = register(Counter(
+    "jemechu_errors_total", "Errors by backend stage.", ["stage"]))
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """with 블록의 실행 시간을 단계별 히스토그램에 기록 (예외 발생 시 오류 카운터도 증가)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.inc(stage)
+        raise
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage)
@@ -0,0 +1,172 @@
+## 인기 조합 추천 결과 미리 계산 및 조회
+"""
+요청 로그에서 자주 들어온 (메뉴/카테고리, 세부사항) 조합을 오프라인으로 전체 파이프라인
+(filter_restaurants → 세부사항 LLM 확장 → filter_by_expanded_query)에 통과시켜 precomputed_results 테이블에
+저장하고 (스키마: database/migrations/005_precomputed_results.sql), API 서버는 현재 카탈로그 버전으로 계산된
+결과를 메모리 딕셔너리에 올려 바로 응답합니다. 없는 조합(콜드 쿼리)만 실시간으로 계산합니다.
+
+입력은 {"user_input": "김치찌개", "details": "조용한 곳", "count": 120} 형식의 JSONL입니다
+(details가 null이면 1차 필터링 결과만 계산). 기본 카테고리와 "아무거나"는 항상 함께 계산합니다.
+
+    python precompute.py --queries ../../database/hot_queries.jsonl --top 500
+"""
+import json
+import os
+import threading
+import time
+from argparse import ArgumentParser
+
+import metrics
+from cache import MISSING, normalize_query
+from database import get_db_connection
+from details_filter import call_llm, filter_by_expanded_query
+from menu_filter import CATEGORIES, current_catalog_version, filter_restaurants
+
+PRECOMPUTED_TTL = float(os.getenv("PRECOMPUTED_TTL", "60"))  # 새로 계산된 결과 재조회 주기(초)
+BASE_INPUTS = sorted(CATEGORIES) + ["아무거나"]
+
+PRECOMPUTED_LOOKUPS = metrics.register(metrics.Counter(
+    "jemechu_precomputed_lookups_total", "Precomputed result lookups.", ["result"]))
+
+_precomputed = {"results": {}, "version": None, "checked_at": float("-inf")}
+_lock = threading.Lock()
+
+
+def precompute_key(user_input: str, details=None) -> str:
+    """정규화한 "메뉴/카테고리\t세부사항" 키 (세부사항이 없으면 빈 문자열)"""
+    return normalize_query(user_input) + "\t" + ("" if details is None else normalize_query(details))
+
+
+def fetch_precomputed(version):
+    """해당 카탈로그 버전으로 계산된 결과 {query_key: 식당 목록} (DB 오류 시 None)"""
+    conn = get_db_connection()
+    if conn is None:
+        return None
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT query_key, result FROM precomputed_results WHERE catalog_version = %s", (version,))
+        return {row["query_key"]: row["result"] for row in cursor.fetchall()}
+    except Exception as e:
+        print("미리 계산된 결과 조회 오류:", e)
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_precomputed(user_input: str, details=None):
+    """
+    미리 계산된 결과를 반환 (없으면 MISSING → 실시간 계산).
+    카탈로그 버전이 바뀌면 이전 결과는 쓰지 않고 새 버전 결과를 다시 읽음 (PRECOMPUTED_TTL초마다 확인)
+    """
+    version = current_catalog_version()
+    now = time.monotonic()
+    if version is not None and (version != _precomputed["version"] or now - _precomputed["checked_at"] >= PRECOMPUTED_TTL):
+        with _lock:
+            if version != _precomputed["version"] or now - _precomputed["checked_at"] >= PRECOMPUTED_TTL:
+                _precomputed["checked_at"] = now
+                results = fetch_precomputed(version)
+                if results is not None:
+                    _precomputed["results"], _precomputed["version"] = results, version
+                elif version != _precomputed["version"]:
+                    _precomputed["results"] = {}  # 이전 버전 결과는 사용하지 않음
+
+    result = _precomputed["results"].get(precompute_key(user_input, details), MISSING)
+    PRECOMPUTED_LOOKUPS.inc("miss" if result is MISSING else "hit")
+    return result
+
+
+def load_hot_queries(path: str, top_n: int):
+    """JSONL 요청 빈도 목록에서 정규화 기준으로 합친 상위 top_n개 [(user_input, details, count)]"""
+    counts, originals = {}, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            query = json.loads(line)
+            key = precompute_key(query["user_input"], query.get("details"))
+            counts[key] = counts.get(key, 0) + int(query.get("count", 1))
+            originals.setdefault(key, (normalize_query(query["user_input"]),
+                                       None if query.get("details") is None else normalize_query(query["details"])))
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top_n]
+    return [(*originals[key], count) for key, count in ranked]
+
+
+def compute_result(user_input: str, details=None):
+    """
+    API와 같은 파이프라인으로 결과 계산 (세부사항 확장에 실패하면 None → 저장하지 않음).
+    regenerate_query의 대체 확장(캐시/규칙 기반) 결과가 저장되지 않도록 LLM을 직접 호출
+    """
+    filtered = filter_restaurants(user_input)
+    if details is None:
+        return filtered
+    try:
+        expanded_query = call_llm(details)
+    except Exception as e:
+        print(f"세부사항 확장 실패 ({details}):", e)
+        return None
+    if not expanded_query:  # 빈 결과가 저장되지 않도록 건너뜀
+        return None
+    return filter_by_expanded_query(filtered, expanded_query)
+
+
+def store_results(rows, version) -> int:
+    """(query_key, user_input, details, result, count) 목록을 upsert하고 이전 카탈로그 버전 행은 삭제"""
+    conn = get_db_connection()
+    if conn is None:
+        return 0
+
+    try:
+        with conn, conn.cursor() as cursor:
+            for query_key, user_input, details, result, count in rows:
+                cursor.execute(
+                    """
+                    INSERT INTO precomputed_results
+                        (query_key, user_input, details, result, request_count, catalog_version, computed_at)
+                    VALUES (%s, %s, %s, %s::jsonb, %s, %s, now())
+                    ON CONFLICT (query_key) DO UPDATE SET
+                        result = EXCLUDED.result, request_count = EXCLUDED.request_count,
+                        catalog_version = EXCLUDED.catalog_version, computed_at = EXCLUDED.computed_at
+                    """,
+                    (query_key, user_input, details, json.dumps(result, ensure_ascii=False), count, version),
+                )
+            cursor.execute("DELETE FROM precomputed_results WHERE catalog_version <> %s", (version,))
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def run_precompute(queries_path: str = None, top_n: int = 500) -> int:
+    """인기 조합 상위 top_n개 + 기본 카테고리/"아무거나"의 결과를 계산하여 저장하고 저장한 개수 반환"""
+    version = current_catalog_version()
+    if version is None:
+        print("카탈로그 버전을 확인할 수 없어 미리 계산을 건너뜁니다.")
+        return 0
+
+    queries = load_hot_queries(queries_path, top_n) if queries_path else []
+    known = {precompute_key(user_input, details) for user_input, details, _ in queries}
+    queries += [(user_input, None, 0) for user_input in BASE_INPUTS if precompute_key(user_input) not in known]
+
+    rows, skipped = [], 0
+    start = time.perf_counter()
+    for user_input, details, count in queries:
+        result = compute_result(user_input, details)
+        if result is None:
+            skipped += 1
+            continue
+        rows.append((precompute_key(user_input, details), user_input, details, result, count))
+
+    stored = store_results(rows, version)
+    print(f"미리 계산 완료: {stored}개 저장, {skipped}개 건너뜀 (카탈로그 버전 {version}, "
+          f"{time.perf_counter() - start:.1f}초)")
+    return stored
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Precompute answers for the most frequent queries.")
+    parser.add_argument("--queries", default=None,
+                        help="JSONL of {user_input, details, count}. Example: ../../database/hot_queries.jsonl")
+    parser.add_argument("--top", type=int, default=500, help="Number of most frequent combinations to precompute.")
+    args = parser.parse_args()
+    run_precompute(args.queries, args.top)
@@ -0,0 +1,118 @@
+## 질의 임베딩 온라인 인코딩 (마이크로 배치 + 결과 캐시)
+"""
+요청마다 질의 문장 하나씩 모델을 호출하면 CPU에서 배치 처리 이점을 살리지 못하므로,
+동시에 들어온 질의를 모아 한 번에 인코딩합니다.
+  - MicroBatcher: 첫 질의가 들어온 뒤 최대 QUERY_BATCH_MAX_WAIT_MS 동안(또는 QUERY_BATCH_SIZE개가 찰 때까지)
+    들어온 질의를 모아 작업 스레드에서 한 번에 인코딩하고, 각 요청에는 Future로 자기 벡터를 돌려줌
+  - QueryEncoder: normalize_query로 정규화한 문장을 키로 질의 벡터를 LRU 캐시에 저장
+    (자주 들어오는 세부사항 문장은 모델을 거치지 않음)
+요청은 QUERY_ENCODE_TIMEOUT_S까지만 기다리고(TimeoutError), 작업 스레드가 예기치 않게 종료되면
+다음 submit에서 다시 시작하므로 인코딩 장애가 요청 스레드를 무기한 붙잡지 않습니다.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+import metrics
+from cache import LRUCache, MISSING, normalize_query
+
+QUERY_BATCH_SIZE = int(os.getenv("QUERY_BATCH_SIZE", "32"))
+QUERY_BATCH_MAX_WAIT_MS = float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", "5"))
+QUERY_VECTOR_CACHE_SIZE = int(os.getenv("QUERY_VECTOR_CACHE_SIZE", "4096"))
+QUERY_ENCODE_TIMEOUT_S = float(os.getenv("QUERY_ENCODE_TIMEOUT_S", "2"))
+
+BATCH_SIZE = metrics.register(metrics.Histogram(
+    "jemechu_query_encode_batch_size", "Queries encoded together in one model call.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)))
+
+
+class MicroBatcher:
+    """
+    여러 스레드에서 들어온 문장을 모아 encode_batch(문장 목록) -> (문장 수, 차원) 행렬로 한 번에 처리.
+    작업 스레드는 처음 submit할 때(종료되었으면 다시) 시작되는 데몬 스레드이며,
+    인코딩 중 예외는 해당 배치의 모든 요청에 전달됨
+    """
+
+    def __init__(self, encode_batch, max_batch: int = QUERY_BATCH_SIZE, max_wait_ms: float = QUERY_BATCH_MAX_WAIT_MS):
+        self.encode_batch = encode_batch
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        """문장 하나를 인코딩 대기열에 넣고 벡터를 받을 Future 반환"""
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+                    self._worker.start()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str, timeout: float = QUERY_ENCODE_TIMEOUT_S):
+        """문장 하나의 벡터 (timeout초 안에 인코딩되지 않으면 TimeoutError, 대기 중이던 요청은 취소)"""
+        future = self.submit(text)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()  # 아직 작업 스레드가 꺼내지 않았으면 인코딩하지 않음
+            raise
+
+    def _collect(self):
+        """첫 요청을 기다린 뒤 max_wait 동안 또는 max_batch개까지 요청을 모음"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # 시간 초과로 취소된 요청은 제외 (set_running_or_notify_cancel 이후에는 취소되지 않음)
+            batch = [(text, future) for text, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            texts = list(dict.fromkeys(text for text, _ in batch))  # 같은 배치의 중복 문장은 한 번만 인코딩
+            BATCH_SIZE.observe(len(texts))
+            try:
+                vectors = self.encode_batch(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"인코더가 문장 {len(texts)}개에 벡터 {len(vectors)}개를 반환함")
+                rows = dict(zip(texts, vectors))
+                for text, future in batch:
+                    future.set_result(rows[text])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class QueryEncoder:
+    """
+    질의 벡터 캐시 + 마이크로 배치 인코더.
+    encode_batch: 문장 목록 -> L2 정규화된 (문장 수, 차원) 행렬 (vector_index.load_encoder(kind="query") 결과)
+    """
+
+    def __init__(self, encode_batch, cache_size: int = QUERY_VECTOR_CACHE_SIZE, **batch_options):
+        self.cache = LRUCache(maxsize=cache_size)
+        self.batcher = MicroBatcher(encode_batch, **batch_options)
+
+    def encode(self, text: str):
+        """질의 문장 하나의 벡터 (캐시에 없으면 다른 요청과 함께 배치 인코딩)"""
+        key = normalize_query(text)
+        vector = self.cache.get(key)
+        if vector is MISSING:
+            vector = self.batcher.encode(key)
+            self.cache.set(key, vector)
+        return vector
@@ -0,0 +1,122 @@
+## 요청 로그 (질의 분석 및 캐시 워밍용)
+"""
+사용자가 보낸 user_input / details를 샘플링하여 gzip 압축 JSONL 파일에 기록합니다.
+요청 처리 스레드는 큐에 넣기만 하고(가득 차면 버림) 파일 쓰기는 백그라운드 스레드가 모아서 처리하므로
+응답 지연에 거의 영향을 주지 않습니다.
+
+  - REQUEST_LOG_DIR: 로그 디렉터리 (설정하지 않으면 기록하지 않음)
+  - REQUEST_LOG_SAMPLE: 기록 비율 0~1 (기본 1.0, 각 줄에 sample_rate를 남겨 분석 시 가중치로 보정)
+  - 파일은 시간 단위 + 프로세스별로 나뉘고(requests-YYYYMMDD-HH-<pid>.jsonl.gz),
+    REQUEST_LOG_MAX_MB를 넘으면 같은 시간대에서도 다음 번호 파일로 넘어감 (여러 워커가 같은 디렉터리에 기록 가능)
+
+분석: python request_log_analyzer.py ../../database/request_logs --warmup ../../database/hot_queries.jsonl
+"""
+import atexit
+import gzip
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+import metrics
+
+REQUEST_LOG_DIR = os.getenv("REQUEST_LOG_DIR")
+REQUEST_LOG_SAMPLE = float(os.getenv("REQUEST_LOG_SAMPLE", "1.0"))
+REQUEST_LOG_MAX_MB = float(os.getenv("REQUEST_LOG_MAX_MB", "64"))
+QUEUE_SIZE = 10000
+FLUSH_INTERVAL_S = 1.0
+FLUSH_BATCH = 500
+
+LOGGED = metrics.register(metrics.Counter(
+    "jemechu_request_log_records_total", "Request log records by outcome.", ["outcome"]))
+
+
+class RequestLog:
+    """샘플링된 요청 기록을 큐에 모아 백그라운드 스레드에서 gzip JSONL로 기록"""
+
+    def __init__(self, log_dir: str, sample_rate: float = 1.0, max_mb: float = REQUEST_LOG_MAX_MB):
+        self.log_dir = log_dir
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.max_bytes = max_mb * 1024 * 1024
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._path = None
+        self._part = 0
+        os.makedirs(log_dir, exist_ok=True)
+        self._worker = threading.Thread(target=self._run, name="request-log", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def log(self, endpoint: str, user_input=None, details=None, results: int = None, latency_s: float = None) -> None:
+        """요청 하나 기록 (샘플링에서 빠지거나 큐가 가득 차면 버림, 블로킹 없음)"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            LOGGED.inc("sampled_out")
+            return
+        record = {"ts": round(time.time(), 3), "endpoint": endpoint, "user_input": user_input, "details": details,
+                  "results": results, "latency_ms": None if latency_s is None else round(latency_s * 1000, 2),
+                  "sample_rate": self.sample_rate}
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            LOGGED.inc("dropped")
+
+    def current_path(self) -> str:
+        """시간대/프로세스별 파일 경로 (크기 제한을 넘으면 다음 번호)"""
+        prefix = os.path.join(self.log_dir, time.strftime("requests-%Y%m%d-%H") + f"-{os.getpid()}")
+        if self._path is None or not self._path.startswith(prefix):
+            self._part = 0
+        path = f"{prefix}.jsonl.gz" if self._part == 0 else f"{prefix}.{self._part}.jsonl.gz"
+        while os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+            self._part += 1
+            path = f"{prefix}.{self._part}.jsonl.gz"
+        self._path = path
+        return path
+
+    def _drain(self):
+        batch = []
+        while len(batch) < FLUSH_BATCH:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch) -> None:
+        # gzip 파일에 이어 쓰면 새 gzip 멤버가 추가되며, gzip.open으로 읽으면 하나의 파일처럼 이어서 읽힘
+        try:
+            with gzip.open(self.current_path(), "at", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch))
+            LOGGED.inc("written", amount=len(batch))
+        except OSError as e:
+            print("요청 로그 기록 실패:", e)
+            LOGGED.inc("dropped", amount=len(batch))
+
+    def _flush(self) -> None:
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(FLUSH_INTERVAL_S)
+            self._flush()
+        self._flush()  # 종료 직전에 들어온 기록
+
+    def close(self) -> None:
+        """남은 기록을 모두 쓰고 종료 (프로세스 종료 시 atexit로 호출)"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._worker.join(timeout=5)
+
+
+_request_log = RequestLog(REQUEST_LOG_DIR, REQUEST_LOG_SAMPLE) if REQUEST_LOG_DIR else None
+
+
+def log_request(endpoint: str, user_input=None, details=None, results: int = None, latency_s: float = None) -> None:
+    """요청 로그가 설정되어 있으면 기록 (REQUEST_LOG_DIR이 없으면 아무것도 하지 않음)"""
+    if _request_log is not None:
+        _request_log.log(endpoint, user_input, details, results, latency_s)
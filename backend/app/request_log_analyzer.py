@@ -0,0 +1,130 @@
+## 요청 로그 분석 (질의 빈도 분포 및 캐시 워밍 목록 생성)
+"""
+request_log.py가 남긴 gzip JSONL 로그를 읽어 아래 항목을 출력합니다.
+  - 전체 요청 수(샘플링 비율로 보정), 고유 user_input / (user_input, details) 조합 수, 엔드포인트별 비율
+  - 상위 user_input과 (user_input, details) 조합, 카테고리/"아무거나"/메뉴 비율
+  - 상위 N개 조합이 전체 요청의 몇 %를 차지하는지 (결과 캐시 크기, 미리 계산 개수 결정용)
+
+--warmup을 지정하면 precompute.py 입력 형식({"user_input", "details", "count"} JSONL)으로 상위 조합을 저장합니다.
+
+    python request_log_analyzer.py ../../database/request_logs --top 20 --warmup ../../database/hot_queries.jsonl
+"""
+import glob
+import gzip
+import json
+import os
+from argparse import ArgumentParser
+from collections import Counter
+
+from cache import normalize_query
+
+CATEGORIES = {"한식", "중식", "일식", "양식", "주점"}  # menu_filter.CATEGORIES (DB 연결 없이 실행하도록 복사)
+QUERY_ENDPOINTS = {"/filter_restaurants_with_details/", "/filter_restaurants/", "/filter_restaurants_batch/"}
+COVERAGE_TARGETS = (0.5, 0.8, 0.9, 0.95, 0.99)
+
+
+def iter_records(paths):
+    """로그 파일(.jsonl.gz 또는 .jsonl) 또는 디렉터리 목록에서 기록을 하나씩 반환 (깨진 줄은 건너뜀)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, "requests-*.jsonl*")))
+        else:
+            files.append(path)
+    for file in files:
+        opener = gzip.open if file.endswith(".gz") else open
+        try:
+            with opener(file, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except (OSError, EOFError) as e:  # 기록 중인 마지막 gzip 멤버가 잘린 경우 등
+            print(f"[WARN] {file} 읽기 중단: {e}")
+
+
+def count_queries(records):
+    """샘플링 비율로 보정한 (user_input 빈도, (user_input, details) 빈도, 엔드포인트 빈도)"""
+    inputs, combos, endpoints = Counter(), Counter(), Counter()
+    for record in records:
+        weight = 1 / (record.get("sample_rate") or 1.0)
+        endpoints[record.get("endpoint")] += weight
+        if record.get("endpoint") not in QUERY_ENDPOINTS or not record.get("user_input"):
+            continue
+        user_input = normalize_query(record["user_input"])
+        details = record.get("details")
+        details = None if details is None else normalize_query(details)
+        inputs[user_input] += weight
+        combos[(user_input, details)] += weight
+    return inputs, combos, endpoints
+
+
+def coverage(counts: Counter):
+    """{목표 비율: 그 비율의 요청을 차지하는 상위 조합 수}"""
+    total = sum(counts.values())
+    result, covered, targets = {}, 0.0, list(COVERAGE_TARGETS)
+    for n, (_, count) in enumerate(counts.most_common(), start=1):
+        covered += count
+        while targets and covered >= targets[0] * total:
+            result[targets.pop(0)] = n
+    return result
+
+
+def input_kind(user_input: str) -> str:
+    if user_input in CATEGORIES:
+        return "category"
+    return "any" if user_input == "아무거나" else "menu"
+
+
+def print_report(inputs: Counter, combos: Counter, endpoints: Counter, top: int) -> None:
+    total = sum(combos.values())
+    print(f"전체 요청(보정): {sum(endpoints.values()):.0f}, 추천 질의: {total:.0f}")
+    print(f"고유 user_input: {len(inputs)}, 고유 (user_input, details): {len(combos)}")
+    if not total:
+        return
+
+    print("\n[엔드포인트]")
+    for endpoint, count in endpoints.most_common():
+        print(f"  {endpoint:<40}{count:>10.0f}")
+
+    kinds = Counter()
+    for user_input, count in inputs.items():
+        kinds[input_kind(user_input)] += count
+    print("\n[입력 종류] " + ", ".join(f"{kind} {count / total:.1%}" for kind, count in kinds.most_common()))
+
+    print(f"\n[상위 user_input {top}개]")
+    for user_input, count in inputs.most_common(top):
+        print(f"  {user_input:<30}{count:>10.0f}{count / total:>8.1%}")
+
+    print(f"\n[상위 (user_input, details) {top}개]")
+    for (user_input, details), count in combos.most_common(top):
+        print(f"  {user_input + ' / ' + (details or '-'):<50}{count:>10.0f}{count / total:>8.1%}")
+
+    print("\n[누적 비율] 상위 N개 조합이 차지하는 요청 비율 (결과 캐시/미리 계산 개수 참고)")
+    for target, n in coverage(combos).items():
+        print(f"  {target:.0%}: 조합 {n}개")
+
+
+def write_warmup(path: str, combos: Counter, top: int) -> int:
+    """상위 조합을 precompute.py 입력 형식 JSONL로 저장"""
+    with open(path, "w", encoding="utf-8") as f:
+        for (user_input, details), count in combos.most_common(top):
+            f.write(json.dumps({"user_input": user_input, "details": details, "count": round(count)},
+                               ensure_ascii=False) + "\n")
+    return min(top, len(combos))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Analyze request logs and build cache warm-up lists.")
+    parser.add_argument("paths", nargs="+", help="Log directories or files (requests-*.jsonl.gz).")
+    parser.add_argument("--top", type=int, default=20, help="Rows shown in the frequency tables.")
+    parser.add_argument("--warmup", default=None, help="Write the top combinations as precompute.py input JSONL.")
+    parser.add_argument("--warmup-size", type=int, default=500, help="Combinations written to --warmup.")
+    args = parser.parse_args()
+
+    inputs, combos, endpoints = count_queries(iter_records(args.paths))
+    print_report(inputs, combos, endpoints, args.top)
+    if args.warmup:
+        written = write_warmup(args.warmup, combos, args.warmup_size)
+        print(f"\n[INFO] 워밍 목록 저장: {written}개 -> {args.warmup}")
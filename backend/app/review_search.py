@@ -0,0 +1,83 @@
+## 리뷰 텍스트 검색 (BM25)
+"""
+전처리 단계에서 만든 BM25 리뷰 색인(review_analysis/search/bm25.py)으로
+리뷰에 적힌 내용("분위기 좋은 데이트" 등)과 잘 맞는 식당을 점수순으로 찾습니다.
+
+색인은 처음 검색할 때 메모리 매핑으로 열고, REVIEW_INDEX_TTL초마다 meta.json 수정 시각을 확인해
+색인이 다시 만들어졌으면 새로 엽니다. 색인이 없으면 빈 결과를 반환합니다.
+"""
+import os
+import sys
+import threading
+import time
+
+from metrics import stage_timer
+from menu_filter import fetch_restaurants_by_ids
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+REVIEW_INDEX_DIR = os.getenv("REVIEW_INDEX_DIR", os.path.join(ROOT_DIR, "database", "review_index"))
+REVIEW_INDEX_TTL = float(os.getenv("REVIEW_INDEX_TTL", "30"))  # 색인 변경 재확인 주기(초)
+REVIEW_OVERFETCH = int(os.getenv("REVIEW_OVERFETCH", "2"))  # DB에 없는 식당을 빼도 top_k개가 남도록 더 가져올 배수
+
+_index = {"value": None, "mtime": None, "checked_at": float("-inf")}
+_index_lock = threading.Lock()
+
+
+def get_review_index():
+    """BM25 색인을 반환 (없거나 열 수 없으면 None)"""
+    now = time.monotonic()
+    if now - _index["checked_at"] < REVIEW_INDEX_TTL:
+        return _index["value"]
+
+    with _index_lock:
+        if now - _index["checked_at"] < REVIEW_INDEX_TTL:
+            return _index["value"]
+        _index["checked_at"] = now
+        try:
+            mtime = os.stat(os.path.join(REVIEW_INDEX_DIR, "meta.json")).st_mtime
+        except OSError:
+            return _index["value"]  # 색인 교체 중이거나 없음 → 기존 색인 유지
+        if mtime != _index["mtime"]:
+            try:
+                from review_analysis.search.bm25 import BM25Index
+                _index["value"] = BM25Index(REVIEW_INDEX_DIR)
+                _index["mtime"] = mtime
+            except Exception as e:
+                print("리뷰 색인 로딩 실패:", e)
+        return _index["value"]
+
+
+def search_review_ids(query: str, top_k: int = 10):
+    """질의와 리뷰가 잘 맞는 식당 [(restaurant_id, 점수), ...] (점수 내림차순)"""
+    index = get_review_index()
+    if index is None:
+        return []
+    with stage_timer("review_search"):
+        return index.search(query, top_k)
+
+
+def search_restaurants_by_reviews(query: str, top_k: int = 10):
+    """
+    리뷰 검색 결과를 식당 정보와 함께 반환 (API 응답 형식 + "score")
+    - DB에 없는 식당(색인 이후 삭제된 식당 등)은 제외하고, 그만큼 다음 순위로 채우도록 더 많이 검색
+    """
+    hits = search_review_ids(query, top_k * max(REVIEW_OVERFETCH, 1))
+    if not hits:
+        return []
+
+    restaurants = fetch_restaurants_by_ids([restaurant_id for restaurant_id, _ in hits])
+    results = []
+    for restaurant_id, score in hits:
+        if restaurant_id in restaurants:
+            results.append({**restaurants[restaurant_id], "score": round(score, 4)})
+    return results[:top_k]
+
+
+# 직접 실행할 경우 테스트 코드 추가
+if __name__ == "__main__":
+    import json
+
+    for restaurant in search_restaurants_by_reviews("분위기 좋은 데이트"):
+        print(json.dumps(restaurant, ensure_ascii=False))
@@ -0,0 +1,126 @@
+## 리뷰 임베딩 유사도 검색
+"""
+전처리 단계에서 만든 식당 벡터 색인(review_analysis/search/vector_index.py)으로
+질의 문장과 리뷰 임베딩이 비슷한 식당을 찾습니다.
+
+색인과 임베딩 모델은 서버 시작 시 백그라운드 스레드에서 불러옵니다 (start_warm_up, main.py).
+모델 로딩은 수 초가 걸리므로 로딩이 끝나기 전의 검색은 기다리지 않고 빈 결과를 반환합니다
+(검색 스레드가 로딩에 묶여 하이브리드 검색의 다른 검색원까지 늦어지지 않도록).
+색인 meta.json의 모델 이름으로 질의를 인코딩하므로 색인과 질의 임베딩 공간이 항상 같습니다.
+질의 인코딩은 모델별 QueryEncoder(query_encoder.py)를 거치므로 동시 요청은 묶어서 인코딩하고
+같은 문장은 캐시된 벡터를 사용합니다.
+"""
+import os
+import sys
+import threading
+import time
+
+import metrics
+from metrics import stage_timer
+from query_encoder import QueryEncoder
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(ROOT_DIR)
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(ROOT_DIR, "database", "vector_index"))
+VECTOR_INDEX_TTL = float(os.getenv("VECTOR_INDEX_TTL", "30"))  # 색인 변경 재확인 주기(초)
+
+_index = {"value": None, "mtime": None, "checked_at": float("-inf")}
+_encoders = {}
+_lock = threading.Lock()  # 색인 교체용
+_encoder_lock = threading.Lock()  # 모델 로딩용 (로딩 중에도 색인 조회는 막지 않도록 별도 잠금)
+_warm_up = {"thread": None}
+
+
+def query_cache_stat(key: str):
+    """모델별 질의 벡터 캐시 통계 합계 (적중률은 전체 조회 기준)"""
+    stats = [encoder.cache.stats() for encoder in list(_encoders.values())]
+    if key == "hit_rate":
+        hits, lookups = sum(s["hits"] for s in stats), sum(s["hits"] + s["misses"] for s in stats)
+        return hits / lookups if lookups else 0.0
+    return sum(s[key] for s in stats)
+
+
+metrics.register(metrics.GaugeFunc("jemechu_query_vector_cache_hit_rate", "Query embedding cache hit rate.",
+                                   lambda: query_cache_stat("hit_rate")))
+metrics.register(metrics.GaugeFunc("jemechu_query_vector_cache_size", "Query embedding cache entries.",
+                                   lambda: query_cache_stat("size")))
+
+
+def get_vector_index():
+    """벡터 색인을 반환 (없거나 열 수 없으면 None)"""
+    now = time.monotonic()
+    if now - _index["checked_at"] < VECTOR_INDEX_TTL:
+        return _index["value"]
+
+    with _lock:
+        if now - _index["checked_at"] < VECTOR_INDEX_TTL:
+            return _index["value"]
+        _index["checked_at"] = now
+        try:
+            mtime = os.stat(os.path.join(VECTOR_INDEX_DIR, "meta.json")).st_mtime
+        except OSError:
+            return _index["value"]
+        if mtime != _index["mtime"]:
+            try:
+                from review_analysis.search.vector_index import VectorIndex
+                _index["value"] = VectorIndex(VECTOR_INDEX_DIR)
+                _index["mtime"] = mtime
+            except Exception as e:
+                print("벡터 색인 로딩 실패:", e)
+        return _index["value"]
+
+
+def get_encoder(model_name: str) -> QueryEncoder:
+    """모델 이름별 질의 인코더 (한 번만 로딩)"""
+    encoder = _encoders.get(model_name)
+    if encoder is None:
+        with _encoder_lock:
+            encoder = _encoders.get(model_name)
+            if encoder is None:
+                from review_analysis.search.vector_index import load_encoder
+                encoder = _encoders[model_name] = QueryEncoder(load_encoder(model_name, kind="query"))
+    return encoder
+
+
+def warm_up() -> None:
+    """색인과 색인 모델의 질의 인코더를 불러오고 질의 하나를 인코딩해 둠 (첫 요청의 지연 제거)"""
+    start = time.perf_counter()
+    try:
+        index = get_vector_index()
+        if index is None:
+            return
+        get_encoder(index.model_name).encode("워밍업")
+        print(f"[INFO] 질의 임베딩 모델 로딩 완료: {index.model_name} ({time.perf_counter() - start:.1f}초)")
+    except Exception as e:
+        print("질의 임베딩 모델 로딩 실패:", e)
+
+
+def start_warm_up() -> None:
+    """warm_up을 백그라운드 스레드에서 한 번 실행 (서버 시작 시 호출, 이미 실행했으면 무시)"""
+    with _encoder_lock:
+        if _warm_up["thread"] is None:
+            _warm_up["thread"] = threading.Thread(target=warm_up, name="vector-warm-up", daemon=True)
+            _warm_up["thread"].start()
+
+
+def encode_query(text: str, model_name: str):
+    """질의 문장 하나를 L2 정규화된 벡터로 변환"""
+    with stage_timer("query_embedding"):
+        return get_encoder(model_name).encode(text)
+
+
+def search_vector_ids(query: str, top_k: int = 10):
+    """
+    질의와 리뷰 임베딩이 비슷한 식당 [(restaurant_id, 유사도), ...] (유사도 내림차순)
+    - 색인이 없으면 빈 리스트, 질의 인코더를 아직 불러오는 중이면 None (검색 결과가 없는 것과 구분)
+    """
+    index = get_vector_index()
+    if index is None:
+        return []
+    if index.model_name not in _encoders:  # 모델 로딩 중 (검색 스레드에서 기다리지 않음)
+        start_warm_up()
+        return None
+    vector = encode_query(query, index.model_name)
+    with stage_timer("vector_search"):
+        return index.search_vector(vector, top_k)
@@ -0,0 +1,234 @@
+"""
+전처리 및 크롤링 결과 파싱 단계 벤치마크.
+
+합성 크롤링 결과(식당 수 × 식당당 리뷰 수)를 여러 규모로 만들어
+아래 단계별 실행 시간, 초당 처리 행 수, 최대 메모리(tracemalloc)를 측정합니다.
+리뷰 텍스트는 모두 다르게 생성하고, 각 측정 전에 리뷰 저장소(토큰 캐시 포함)를 지우므로
+naver_preprocess는 항상 전체 리뷰를 처음부터 토큰화하는 시간을 잽니다.
+토큰화 프로세스 풀의 메모리는 tracemalloc에 잡히지 않으므로 자식 프로세스 최대 RSS(child_peak)를 따로 표시합니다.
+  - naver_load:            NaverProcessor 생성 (CSV 로딩)
+  - naver_preprocess:      NaverProcessor.preprocess
+  - clean_review_texts:    리뷰 300개 문자열 정리
+  - parse_operating_hours: 운영시간 문자열 파싱
+  - classify_parking:      주차 정보 분류
+  - filter_restaurant_data: eda_restaurant의 공공데이터 필터링
+
+    python benchmarks/bench_preprocessing.py --scales 1000 10000 --reviews 300
+    # 기준 결과 저장 후, 이후 실행에서 기준 대비 threshold 이상 느려지면 exit code 1
+    python benchmarks/bench_preprocessing.py --save-baseline benchmarks/baselines/preprocessing.json
+    python benchmarks/bench_preprocessing.py --baseline benchmarks/baselines/preprocessing.json --threshold 0.2
+"""
+
+import csv
+import gc
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+REVIEW_PHRASES: List[str] = [
+    "음식이 정말 맛있어요", "분위기가 좋아서 데이트하기 좋아요", "직원분들이 친절하십니다",
+    "양이 많고 가성비가 좋아요", "웨이팅이 조금 있었지만 만족합니다", "재방문 의사 있어요!!",
+    "주차가 불편해요 ㅠㅠ", "매장이 깔끔하고 청결해요", "김치찌개 존맛탱 ㅋㅋㅋㅋ", "Good!! 최고에요 👍",
+]
+PARKING_TEXTS: List[str] = ["주차 불가", "유료 주차 가능", "무료 주차 가능, 2시간", "주차가능", "정보 없음"]
+DAYS: List[str] = ["월", "화", "수", "목", "금", "토", "일"]
+
+
+def review_blob(rng: random.Random, reviews: int, restaurant: int) -> str:
+    """
+    scraper_naver.py가 저장하던 str(collected_reviews[:300]) 형태의 리뷰 문자열.
+    리뷰마다 텍스트가 달라야 토큰 캐시 적중 없이 전체 리뷰가 토큰화되므로 식당·리뷰 번호를 넣음
+    """
+    items = [
+        {"date": f"{rng.randint(1, 12)}.{rng.randint(1, 28)}.{rng.choice(DAYS)}",
+         "text": f"{' '.join(rng.sample(REVIEW_PHRASES, 3))} {restaurant}번식당 {j}번째리뷰"}
+        for j in range(reviews)
+    ]
+    return str(items)
+
+
+def write_crawl_dump(path: str, restaurants: int, reviews: int, rng: random.Random) -> None:
+    """scraper_naver.py 출력(naver_data.csv)과 같은 컬럼의 합성 크롤링 결과 저장"""
+    header = [
+        "소재지면적", "지번주소", "도로명주소", "사업장명", "업태구분명", "좌표정보(X)", "좌표정보(Y)",
+        "Processed", "전화번호", "운영시간", "총 리뷰 개수", "소개", "편의시설 및 서비스",
+        "주차 정보", "이런점이 좋았어요", "최신 300개 리뷰", "좌석 정보",
+    ]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(restaurants):
+            writer.writerow([
+                round(rng.uniform(20, 300), 2), f"서울특별시 마포구 서교동 {i}", f"서울특별시 마포구 양화로 {i}",
+                f"식당{i}", "한식", rng.uniform(192000, 194000), rng.uniform(449000, 451000),
+                "Yes", "02-000-0000", str({d: "11:00 - 22:00" for d in DAYS}), rng.randint(0, 6000), "소개글",
+                str(["단체 이용 가능", "포장"]), rng.choice(PARKING_TEXTS),
+                str([["음식이 맛있어요", rng.randint(1, 500)], ["친절해요", rng.randint(1, 300)]]),
+                review_blob(rng, reviews, i), str(["단체석"]),
+            ])
+
+
+def write_registry(path: str, restaurants: int, rng: random.Random) -> None:
+    """공공데이터 식당 인허가 정보(restaurant.csv)와 같은 컬럼, 같은 인코딩(CP949)의 합성 데이터 저장"""
+    header = [
+        "상세영업상태명", "전화번호", "소재지면적", "소재지우편번호", "지번주소", "도로명주소",
+        "도로명우편번호", "사업장명", "업태구분명", "좌표정보(X)", "좌표정보(Y)", "기타컬럼",
+    ]
+    dongs = ["서교동", "합정동", "연남동", "망원동", "상수동"]
+    with open(path, "w", encoding="cp949", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(restaurants):
+            writer.writerow([
+                rng.choice(["영업", "폐업"]), "02-000-0000", 50.0, "04000",
+                f"서울특별시 마포구 {rng.choice(dongs)} {i}", f"서울특별시 마포구 양화로 {i}", "04000",
+                f"식당{i}(본점)", rng.choice(["한식", "까페", "기타", "일식"]), 193000.0, 450000.0, "",
+            ])
+
+
+def child_peak_mb() -> float:
+    """지금까지 종료된 자식 프로세스 중 최대 RSS (MB, Linux의 ru_maxrss는 KB 단위)"""
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+
+def measure(func: Callable[[], object], memory: bool, reset: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """
+    func 실행 시간(초)과, memory=True면 tracemalloc 최대 메모리(MB)를 별도 실행으로 측정.
+    reset은 각 실행 전에 호출되어(시간 측정 제외) 두 실행이 같은 초기 상태(빈 저장소/캐시)에서 시작하도록 함.
+    child_peak_mb는 이 단계에서 자식 프로세스 최대 RSS가 늘어난 경우에만 기록 (누적 최대값이라 이전 단계보다 클 때만 의미 있음)
+    """
+    children_before = child_peak_mb()
+    if reset:
+        reset()
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    wall = time.perf_counter() - start
+
+    peak_mb = None
+    if memory:
+        if reset:
+            reset()
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    children_after = child_peak_mb()
+    return {"wall_s": wall, "peak_mb": peak_mb,
+            "child_peak_mb": children_after if children_after > children_before else None}
+
+
+def run_scale(restaurants: int, reviews: int, workdir: str, memory: bool, seed: int,
+              workers: Optional[int] = None) -> Dict[str, dict]:
+    """한 규모에 대해 모든 단계를 측정"""
+    from review_analysis.preprocessing.NaverProcessor import NaverProcessor
+    from review_analysis.crawling.eda_restaurant import filter_restaurant_data
+
+    rng = random.Random(seed)
+    dump_csv = os.path.join(workdir, f"naver_{restaurants}.csv")
+    registry_csv = os.path.join(workdir, f"registry_{restaurants}.csv")
+    write_crawl_dump(dump_csv, restaurants, reviews, rng)
+    write_registry(registry_csv, restaurants, rng)
+
+    processor = NaverProcessor(dump_csv, workdir, workers=workers)
+    raw = processor.df.copy()
+    review_values = raw["최신 300개 리뷰"].tolist()
+    hours_values = raw["운영시간"].tolist()
+    parking_values = raw["주차 정보"].astype(str).tolist()
+
+    store_dir = os.path.join(workdir, f"store_{restaurants}")
+
+    def reset_preprocess():
+        """빈 리뷰 저장소(토큰 캐시 포함)와 원본 DataFrame으로 되돌림"""
+        shutil.rmtree(store_dir, ignore_errors=True)
+        os.makedirs(store_dir)
+        processor.review_store_path = os.path.join(store_dir, "reviews.db")
+        processor.df = raw.copy()
+
+    stages = {
+        "naver_load": (lambda: NaverProcessor(dump_csv, workdir), restaurants, None),
+        "naver_preprocess": (processor.preprocess, restaurants, reset_preprocess),
+        "clean_review_texts": (lambda: [processor.clean_review_texts(v) for v in review_values],
+                               restaurants * reviews, None),
+        "parse_operating_hours": (lambda: [processor.parse_operating_hours(v) for v in hours_values], restaurants, None),
+        "classify_parking": (lambda: [processor.classify_parking(v) for v in parking_values], restaurants, None),
+        "filter_restaurant_data": (lambda: filter_restaurant_data(registry_csv, os.path.join(workdir, "out.csv")),
+                                   restaurants, None),
+    }
+
+    results = {}
+    for name, (func, rows, reset) in stages.items():
+        result = measure(func, memory, reset)
+        result["rows"] = rows
+        result["rows_per_s"] = rows / result["wall_s"] if result["wall_s"] else 0.0
+        results[name] = result
+        peak = f"{result['peak_mb']:.1f}MB" if result["peak_mb"] is not None else "-"
+        child = f"{result['child_peak_mb']:.1f}MB" if result["child_peak_mb"] is not None else "-"
+        print(f"{name:<24}{restaurants:>9}{result['wall_s']:>11.3f}s{result['rows_per_s']:>14.0f}/s{peak:>12}{child:>13}")
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """기준 대비 실행 시간이 threshold(비율) 이상 늘어난 단계 목록"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base and base["wall_s"] > 0:
+            change = (result["wall_s"] - base["wall_s"]) / base["wall_s"]
+            if change > threshold:
+                regressions.append(f"{key}: {base['wall_s']:.3f}s -> {result['wall_s']:.3f}s ({change:+.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Benchmark preprocessing and crawl-parse stages.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000], help="Restaurant counts, e.g. 1000 10000 100000.")
+    parser.add_argument("--reviews", type=int, default=300, help="Reviews per restaurant.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass (faster).")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--workers", type=int, default=None, help="Review tokenization processes (default: CPU count).")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio vs baseline.")
+    parser.add_argument("--save-baseline", help="Write results to this JSON path.")
+    args = parser.parse_args()
+
+    print(f"{'stage':<24}{'rows':>9}{'wall':>12}{'rows/s':>16}{'peak':>12}{'child_peak':>13}")
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            scale_results = run_scale(scale, args.reviews, workdir, not args.no_memory, args.seed, args.workers)
+            for stage, result in scale_results.items():
+                results[f"{stage}@{scale}x{args.reviews}"] = result
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] 기준 결과 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("[FAIL] 성능 저하 단계:")
+            for line in regressions:
+                print("  -", line)
+            return 1
+        print("[OK] 기준 대비 성능 저하 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
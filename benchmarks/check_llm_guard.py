@@ -0,0 +1,239 @@
+"""
+LLM 호출 보호(backend/app/llm_guard.py)를 가짜 LLM 서버(fake_llm_server.py)에 실제 HTTP로 연결해 점검합니다.
+
+같은 프로세스에서 가짜 LLM 서버를 임의 포트로 띄우고, 지연/오류/멈춤을 주입하면서 다음을 확인합니다.
+  - healthy:    정상 응답은 모두 LLM 확장으로 처리
+  - timeout:    멈춘 응답은 타임아웃 안에 대체 확장으로 응답하고, 연속 실패 후 서킷 브레이커가 열려 호출하지 않음
+  - recovery:   장애가 끝나면 reset 시간 뒤 half-open 시험 호출 한 번으로 브레이커가 닫힘
+  - saturation: API처럼 asyncio.to_thread로 동시에 호출할 때 LLM 동시 호출은 max_concurrency 이하,
+                자리가 없으면 queue_timeout 뒤 대체 확장, 이벤트 루프 지연은 작게 유지
+                (비교용으로 이벤트 루프에서 바로 호출했을 때의 지연도 출력)
+
+    python benchmarks/check_llm_guard.py
+    python benchmarks/check_llm_guard.py --scenario saturation --concurrency 64
+
+하나라도 실패하면 종료 코드 1로 끝납니다.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+import fake_llm_server
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT_DIR, "backend", "app"))
+from llm_guard import LLM_CALLS, CircuitBreaker, GuardedLLM  # noqa: E402
+
+DETAILS: List[str] = [f"조용하고 주차 가능한 곳 {i}" for i in range(1000)]
+
+
+def http_call(base_url: str, timeout: float) -> Callable[[str], dict]:
+    """details_filter.call_llm과 같은 Chat Completions 요청을 urllib로 보내는 확장 함수"""
+    def call(details_input: str) -> dict:
+        body = json.dumps({"model": "fake", "messages": [{"role": "user", "content": details_input}]}).encode("utf-8")
+        request = urllib.request.Request(f"{base_url}/chat/completions", data=body,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                payload = json.loads(response.read())
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, TimeoutError):
+                raise TimeoutError(str(e)) from e
+            raise
+        return json.loads(payload["choices"][0]["message"]["content"])
+    return call
+
+
+def start_server() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fake_llm_server.Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def configure(**config) -> None:
+    """가짜 LLM 서버 설정을 바꾸고 통계를 초기화"""
+    fake_llm_server.config.update({"latency_ms": 0.0, "jitter_ms": 0.0, "error_rate": 0.0, "hang_rate": 0.0,
+                                   "hang_s": 30.0, **config})
+    with fake_llm_server._lock:
+        fake_llm_server.stats.update({key: 0 for key in fake_llm_server.stats})
+
+
+def outcomes() -> Dict[str, float]:
+    return {outcome: LLM_CALLS.value(outcome)
+            for outcome in ("ok", "timeout", "error", "short_circuit", "rejected", "bad_response")}
+
+
+def delta(before: Dict[str, float]) -> Dict[str, float]:
+    return {key: value - before[key] for key, value in outcomes().items() if value - before[key]}
+
+
+def timed(llm: GuardedLLM, details_input: str) -> float:
+    start = time.perf_counter()
+    llm.expand(details_input)
+    return time.perf_counter() - start
+
+
+def scenario_healthy(base_url: str, args) -> List[str]:
+    configure(latency_ms=20)
+    llm = GuardedLLM(http_call(base_url, args.timeout), breaker=CircuitBreaker(3, 0.5))
+    before = outcomes()
+    for details_input in DETAILS[:20]:
+        llm.expand(details_input)
+    calls = delta(before)
+    print(f"  outcomes={calls} server={fake_llm_server.stats}")
+    failures = []
+    if calls != {"ok": 20}:
+        failures.append(f"정상 응답 20개가 모두 ok여야 함: {calls}")
+    return failures
+
+
+def scenario_timeout(base_url: str, args) -> List[str]:
+    configure(hang_rate=1.0, hang_s=args.timeout * 5)
+    llm = GuardedLLM(http_call(base_url, args.timeout), breaker=CircuitBreaker(3, 60))
+    before = outcomes()
+    slow = [timed(llm, d) for d in DETAILS[:3]]  # 브레이커가 열릴 때까지
+    requests_when_open = fake_llm_server.stats["requests"]
+    fast = [timed(llm, d) for d in DETAILS[3:13]]
+    calls = delta(before)
+    print(f"  outcomes={calls} slow_max={max(slow):.3f}s open_max={max(fast) * 1000:.2f}ms "
+          f"server_requests={fake_llm_server.stats['requests']}")
+    failures = []
+    if calls.get("timeout") != 3:
+        failures.append(f"멈춘 응답 3개는 timeout이어야 함: {calls}")
+    if max(slow) > args.timeout + 0.5:
+        failures.append(f"타임아웃({args.timeout}s)보다 오래 기다림: {max(slow):.3f}s")
+    if calls.get("short_circuit") != 10 or fake_llm_server.stats["requests"] != requests_when_open:
+        failures.append("브레이커가 열린 뒤에도 LLM 서버를 호출함")
+    if max(fast) > 0.05:
+        failures.append(f"브레이커가 열린 상태의 응답이 느림: {max(fast):.3f}s")
+    return failures
+
+
+def scenario_recovery(base_url: str, args) -> List[str]:
+    configure(error_rate=1.0)
+    breaker = CircuitBreaker(3, 0.3)
+    llm = GuardedLLM(http_call(base_url, args.timeout), breaker=breaker)
+    for details_input in DETAILS[:5]:
+        llm.expand(details_input)
+    opened = breaker.state
+    configure()
+    time.sleep(0.35)
+    half_open = breaker.state
+    before = outcomes()
+    llm.expand(DETAILS[5])
+    calls = delta(before)
+    print(f"  states={opened}->{half_open}->{breaker.state} trial={calls}")
+    failures = []
+    if (opened, half_open, breaker.state) != ("open", "half_open", "closed") or calls != {"ok": 1}:
+        failures.append("장애 후 half-open 시험 호출 한 번으로 브레이커가 닫혀야 함")
+    return failures
+
+
+async def gather_with_lag(make_calls: Callable[[], List], tick_s: float = 0.01) -> tuple:
+    """호출들을 동시에 실행하는 동안 이벤트 루프가 tick_s 간격 타이머를 얼마나 늦게 실행했는지 측정"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(tick_s)
+            lags.append(time.perf_counter() - start - tick_s)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*make_calls())
+    wall = time.perf_counter() - start
+    done.set()
+    await ticking
+    return latencies, max(lags, default=0.0), wall
+
+
+def scenario_saturation(base_url: str, args) -> List[str]:
+    configure(latency_ms=args.latency_ms)
+    # 이 시나리오는 동시 호출 제한만 보므로 지연보다 넉넉한 타임아웃 사용
+    llm = GuardedLLM(http_call(base_url, 2 * args.latency_ms / 1000), max_concurrency=args.max_concurrency,
+                     queue_timeout=args.queue_timeout, breaker=CircuitBreaker(10 ** 6, 60))
+
+    async def call(details_input: str) -> float:
+        start = time.perf_counter()
+        await asyncio.to_thread(llm.expand, details_input)
+        return time.perf_counter() - start
+
+    async def blocking(details_input: str) -> float:  # 이벤트 루프에서 바로 호출 (비교용)
+        return timed(llm, details_input)
+
+    before = outcomes()
+    loop = asyncio.new_event_loop()
+    loop.set_default_executor(ThreadPoolExecutor(args.concurrency))  # 스레드 수가 동시 호출 수를 제한하지 않도록
+    try:
+        latencies, lag, wall = loop.run_until_complete(
+            gather_with_lag(lambda: [call(d) for d in DETAILS[:args.concurrency]]))
+        calls = delta(before)
+        max_in_flight = fake_llm_server.stats["max_in_flight"]
+        _, blocking_lag, blocking_wall = loop.run_until_complete(
+            gather_with_lag(lambda: [blocking(d) for d in DETAILS[100:104]]))
+    finally:
+        loop.close()
+
+    print(f"  to_thread: outcomes={calls} llm_max_in_flight={max_in_flight} "
+          f"max_latency={max(latencies):.3f}s loop_lag_max={lag * 1000:.1f}ms wall={wall:.3f}s")
+    print(f"  (비교) 이벤트 루프에서 직접 호출 4개: loop_lag_max={blocking_lag * 1000:.1f}ms wall={blocking_wall:.3f}s")
+    failures = []
+    if max_in_flight > args.max_concurrency:
+        failures.append(f"동시 LLM 호출 {max_in_flight}개 > max_concurrency {args.max_concurrency}")
+    if not calls.get("rejected"):
+        failures.append("동시 호출 제한이 한 번도 걸리지 않음 (concurrency를 늘려 보세요)")
+    bound = args.latency_ms / 1000 + args.queue_timeout + 0.5
+    if max(latencies) > bound:
+        failures.append(f"최대 지연 {max(latencies):.3f}s > {bound:.3f}s")
+    if lag > 0.1:
+        failures.append(f"이벤트 루프 지연 {lag * 1000:.1f}ms (LLM 호출이 루프를 막음)")
+    return failures
+
+
+SCENARIOS = {
+    "healthy": scenario_healthy,
+    "timeout": scenario_timeout,
+    "recovery": scenario_recovery,
+    "saturation": scenario_saturation,
+}
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Check llm_guard against fake_llm_server.py with injected latency and errors.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="Scenario to run (repeatable, default: all).")
+    parser.add_argument("--timeout", type=float, default=0.3, help="LLM call timeout in seconds.")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake LLM latency in the saturation scenario.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent calls in the saturation scenario.")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="GuardedLLM max_concurrency.")
+    parser.add_argument("--queue-timeout", type=float, default=0.05, help="GuardedLLM queue_timeout.")
+    args = parser.parse_args()
+
+    base_url = start_server()
+    failed = False
+    for name in args.scenario or list(SCENARIOS):
+        print(f"[{name}]")
+        failures = SCENARIOS[name](base_url, args)
+        for failure in failures:
+            print(f"  FAIL: {failure}")
+        print("  OK" if not failures else "  FAILED")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+OpenAI Chat Completions API를 흉내 내는 로컬 가짜 LLM 서버 (지연/오류 주입용).
+
+regenerate_query의 타임아웃, 동시 호출 제한, 서킷 브레이커(backend/app/llm_guard.py)를 실제 HTTP 호출로
+시험하기 위해 사용합니다. 응답 내용은 load_backend.py의 fake_regenerate_query와 같아 결정적입니다.
+
+    python benchmarks/fake_llm_server.py --port 8900 --latency-ms 300 --error-rate 0.2 --hang-rate 0.05
+    python benchmarks/load_backend.py ... --llm-base http://127.0.0.1:8900/v1
+    python benchmarks/check_llm_guard.py   # 서버를 직접 띄워 llm_guard 동작 점검 (실패 시 종료 코드 1)
+
+실행 중에 장애 상황을 바꾸려면 설정을 POST합니다 (지정한 값만 바뀜):
+
+    curl -X POST localhost:8900/config -d '{"error_rate": 1.0}'   # 장애 시작
+    curl -X POST localhost:8900/config -d '{"error_rate": 0.0}'   # 복구
+    curl localhost:8900/stats                                     # 요청/오류/지연 응답 수
+"""
+
+import json
+import random
+import threading
+import time
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from load_backend import fake_regenerate_query
+
+config = {"latency_ms": 0.0, "jitter_ms": 0.0, "error_rate": 0.0, "hang_rate": 0.0, "hang_s": 30.0}
+stats = {"requests": 0, "ok": 0, "errors": 0, "hangs": 0, "in_flight": 0, "max_in_flight": 0}
+_lock = threading.Lock()
+
+
+def count(key: str, delta: int = 1) -> None:
+    with _lock:
+        stats[key] += delta
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+
+def completion(content: str) -> dict:
+    """Chat Completions 응답 형식"""
+    return {
+        "id": f"chatcmpl-fake-{random.getrandbits(32):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # 요청마다 출력하지 않음
+        pass
+
+    def send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.send_json(200, {"config": config, "stats": stats})
+        else:
+            self.send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if self.path == "/config":
+            config.update({key: float(value) for key, value in self.read_json().items() if key in config})
+            self.send_json(200, config)
+            return
+        if not self.path.endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": "not found"}})
+            return
+
+        body = self.read_json()
+        count("requests")
+        count("in_flight")
+        try:
+            r = random.random()
+            if r < config["hang_rate"]:
+                count("hangs")
+                time.sleep(config["hang_s"])  # 클라이언트 타임아웃 시험용
+            latency = config["latency_ms"] + random.uniform(0, config["jitter_ms"])
+            time.sleep(latency / 1000)
+            if r >= config["hang_rate"] and r < config["hang_rate"] + config["error_rate"]:
+                count("errors")
+                self.send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+                return
+            details_input = body["messages"][-1]["content"]
+            count("ok")
+            self.send_json(200, completion(json.dumps(fake_regenerate_query(details_input), ensure_ascii=False)))
+        except (BrokenPipeError, ConnectionResetError):  # 클라이언트가 타임아웃으로 먼저 끊은 경우
+            pass
+        finally:
+            count("in_flight", -1)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Fake OpenAI chat completions server with injected latency and errors.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency of every completion.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random latency added on top.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that stall for --hang-s.")
+    parser.add_argument("--hang-s", type=float, default=30.0, help="Stall duration of hanging requests.")
+    args = parser.parse_args()
+
+    config.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                  hang_rate=args.hang_rate, hang_s=args.hang_s)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"[INFO] 가짜 LLM 서버: http://{args.host}:{args.port}/v1 (설정 변경: POST /config)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,142 @@
+"""
+진입점 모듈 import 시간(콜드 스타트) 측정 및 회귀 검사.
+
+진입점마다 새 파이썬 프로세스에서 `python -X importtime -c "import <모듈>"`을 여러 번 실행해
+import 시간 중앙값과 가장 오래 걸린 하위 모듈을 출력합니다.
+무거운 선택 의존성(openai, torch, sentence_transformers, scipy, bs4, soynlp, kiwipiepy 등)이
+import 시점에 불러와지면 실패로 처리합니다 (처음 사용할 때 불러오도록 지연 import해야 함).
+
+    python benchmarks/import_time.py
+    # 기준 결과 저장 후, 이후 실행에서 기준 대비 threshold 이상 느려지면 exit code 1
+    python benchmarks/import_time.py --save-baseline benchmarks/baselines/import_time.json
+    python benchmarks/import_time.py --baseline benchmarks/baselines/import_time.json --threshold 0.3
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend", "app")
+
+# 이름 -> (작업 디렉터리, import할 모듈)
+ENTRY_POINTS: Dict[str, Tuple[str, str]] = {
+    "backend.main": (BACKEND_DIR, "main"),
+    "backend.loader": (BACKEND_DIR, "loader"),
+    "preprocessing.main": (ROOT_DIR, "review_analysis.preprocessing.main"),
+    "search.vector_index": (ROOT_DIR, "review_analysis.search.vector_index"),
+    "search.bm25": (ROOT_DIR, "review_analysis.search.bm25"),
+}
+# import 시점에 불러오면 안 되는 무거운 선택 의존성
+FORBIDDEN_MODULES: List[str] = [
+    "openai", "dotenv", "torch", "sentence_transformers", "transformers",
+    "scipy", "bs4", "soynlp", "kiwipiepy", "selenium",
+]
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def import_profile(cwd: str, module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    새 프로세스에서 모듈을 import하고 (전체 ms, {최상위 패키지: 누적 ms}) 반환 (import 실패 시 RuntimeError).
+    패키지 누적 시간은 그 패키지가 의존하는 다른 패키지의 import 시간을 포함합니다.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=cwd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import 실패")
+
+    total_us = 0
+    packages: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, name = int(match[1]), int(match[2]), match[3]
+        total_us += self_us
+        if "." not in name:  # 최상위 패키지 (어느 깊이에서 처음 불러왔든 한 번만 기록됨)
+            packages[name] = cumulative_us / 1000
+    return total_us / 1000, packages
+
+
+def measure(name: str, repeats: int) -> dict:
+    cwd, module = ENTRY_POINTS[name]
+    totals, packages = [], {}
+    for _ in range(repeats):
+        total_ms, packages = import_profile(cwd, module)
+        totals.append(total_ms)
+    own = module.split(".")[0]
+    heaviest = sorted(((pkg, ms) for pkg, ms in packages.items() if pkg != own),
+                      key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "import_ms": statistics.median(totals),
+        "heaviest": [[pkg, round(ms, 1)] for pkg, ms in heaviest],
+        "forbidden": sorted(pkg for pkg in packages if pkg in FORBIDDEN_MODULES),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """기준 대비 import 시간이 threshold(비율) 이상 늘어난 진입점 목록"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base and base["import_ms"] > 0:
+            change = (result["import_ms"] - base["import_ms"]) / base["import_ms"]
+            if change > threshold:
+                regressions.append(f"{key}: {base['import_ms']:.0f}ms -> {result['import_ms']:.0f}ms ({change:+.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Measure cold import time of backend and preprocessing entry points.")
+    parser.add_argument("--entries", nargs="+", choices=ENTRY_POINTS.keys(), default=list(ENTRY_POINTS),
+                        help="Entry points to measure.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreter runs per entry point.")
+    parser.add_argument("--max-ms", type=float, help="Fail if any entry point imports slower than this.")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Allowed slowdown ratio vs baseline.")
+    parser.add_argument("--save-baseline", help="Write results to this JSON path.")
+    args = parser.parse_args()
+
+    print(f"{'entry point':<24}{'import':>10}  heaviest packages")
+    results, failures = {}, []
+    for name in args.entries:
+        try:
+            result = measure(name, args.repeats)
+        except RuntimeError as e:
+            print(f"{name:<24}{'-':>10}  import 실패: {e}")
+            failures.append(f"{name}: import 실패 ({e})")
+            continue
+        results[name] = result
+        heaviest = ", ".join(f"{pkg} {ms:.0f}ms" for pkg, ms in result["heaviest"])
+        print(f"{name:<24}{result['import_ms']:>8.0f}ms  {heaviest}")
+        if result["forbidden"]:
+            failures.append(f"{name}: import 시점에 불러온 무거운 의존성 {result['forbidden']}")
+        if args.max_ms is not None and result["import_ms"] > args.max_ms:
+            failures.append(f"{name}: {result['import_ms']:.0f}ms > {args.max_ms:.0f}ms")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] 기준 결과 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures += compare(results, json.load(f), args.threshold)
+
+    if failures:
+        print("[FAIL] import 검사 실패:")
+        for line in failures:
+            print("  -", line)
+        return 1
+    print("[OK] import 검사 통과")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+네이버 지도 검색/상세 페이지를 흉내 내는 로컬 모의 서버 (크롤러 재현 및 프로파일링용).
+
+scraper_naver.NaverMapScraper가 사용하는 XPath(검색창, 검색 결과, entryIframe, 영업시간, 정보 탭,
+편의시설, 주차, 좌석, 리뷰 탭, "이런점이 좋았어요", 리뷰 목록과 더보기)를 같은 클래스 이름으로 제공하므로
+실제 네이버 지도에 접속하지 않고 크롤링 흐름 전체를 재현하고 단계별 소요 시간을 측정할 수 있습니다.
+서버 응답마다 --latency-ms 지연을 넣고, 리뷰 더보기는 /reviews를 호출하여 페이지 단위로 불러옵니다.
+검색 페이지의 지도 타일(/tiles/*.png)과 상세 페이지의 사진(/photos/*.jpg)은 --asset-kb 크기로 내려주므로
+BrowserSession의 리소스 차단 전후 식당별 전송량을 비교할 수 있습니다.
+
+    # 모의 식당 목록 CSV 생성 후 서버 실행
+    python benchmarks/mock_naver_map.py --write-input mock_restaurants.csv --restaurants 20
+    python benchmarks/mock_naver_map.py --port 8920 --latency-ms 150 --reviews 120
+    # 크롤러 재현 + 요약
+    cd review_analysis/crawling
+    CRAWL_SLEEP_SCALE=0.1 python scraper_naver.py --input ../../mock_restaurants.csv \
+        --base-url http://127.0.0.1:8920/ --profile crawl_profile.jsonl
+    python crawl_profiler.py crawl_profile.jsonl
+"""
+
+import csv
+import html
+import json
+import random
+import re
+import time
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REVIEW_PAGE_SIZE = 10
+ADDRESS_PREFIX = "서울 마포구 모의로"
+
+MAP_TILES = 12
+PHOTOS = 6
+
+config = {"latency_ms": 0.0, "reviews": 100, "asset_kb": 40}
+
+SEARCH_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>모의 지도</title></head>
+<body>
+<input class="input_search" id="query" type="text">
+<div id="map">{tiles}</div>
+<div id="results"></div>
+<script>
+const query = document.getElementById("query");
+const results = document.getElementById("results");
+query.addEventListener("keydown", (event) => {
+  if (event.key !== "Enter") return;
+  fetch("/search?q=" + encodeURIComponent(query.value)).then((r) => r.json()).then((places) => {
+    results.innerHTML = '<button class="link_more" type="button">더보기</button><ul>' +
+      places.map((p) => '<li><button class="link_search" type="button" data-id="' + p.id + '">' +
+                        '<strong class="search_title">' + p.name + '</strong></button></li>').join("") + "</ul>";
+    results.querySelectorAll("button.link_search").forEach((button) => button.addEventListener("click", () => {
+      const old = document.getElementById("entryIframe");
+      if (old) old.remove();
+      const frame = document.createElement("iframe");
+      frame.id = "entryIframe";
+      frame.width = 800;
+      frame.height = 2000;
+      frame.src = "/entry?id=" + button.dataset.id;
+      document.body.appendChild(frame);
+    }));
+  });
+});
+</script>
+</body></html>
+"""
+
+ENTRY_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{name}</title></head>
+<body>
+<div class="photos">{photos}</div>
+<div class="A_cdD">영업시간</div>
+<div class="w9QyJ"><span>영업 중</span></div>
+<div class="w9QyJ"><span>매일</span></div>
+{hours}
+<div class="vV_z_"><span class="xlx7Q">{phone}</span></div>
+<a class="fvwqf" href="#info"><span class="iNSaH">정보</span></a>
+<a class="OWPIf" href="#intro"><span class="place_blind">펼쳐보기</span></a>
+<div class="T8RFa CEyr5">{intro}</div>
+<ul class="JU0iX">{services}</ul>
+<div class="qbROU"><div class="TZ6eS">{parking}</div></div>
+<div class="place_section_content"><ul class="GXptY">{seats}</ul></div>
+<a href="#review"><span>리뷰</span></a>
+<ul>{good_points}</ul>
+<em class="place_section_count">{total}</em>
+<a href="#latest">최신순</a>
+<ul id="reviews">{reviews}</ul>
+{more}
+<script>
+let offset = {page_size};
+function more(event) {{
+  event.preventDefault();
+  fetch("/reviews?id={id}&offset=" + offset).then((r) => r.text()).then((items) => {{
+    document.getElementById("reviews").insertAdjacentHTML("beforeend", items);
+    offset += {page_size};
+    if (offset >= {total}) document.getElementById("more").remove();
+  }});
+}}
+</script>
+</body></html>
+"""
+
+SERVICES = ["단체 이용 가능", "예약", "포장", "무선 인터넷", "유아의자", "주차"]
+SEATS = ["단체석", "바 테이블", "룸", "창가석"]
+GOOD_POINTS = ["음식이 맛있어요", "친절해요", "양이 많아요", "가성비가 좋아요", "매장이 청결해요"]
+
+
+def restaurant_name(restaurant_id: int) -> str:
+    return f"모의식당 {restaurant_id}"
+
+
+def review_items(restaurant_id: int, start: int, end: int) -> str:
+    """리뷰 목록 li (식당/순번별로 결정적인 텍스트와 날짜)"""
+    items = []
+    for n in range(start, min(end, config["reviews"])):
+        rng = random.Random(restaurant_id * 100_000 + n)
+        date = f"{rng.randint(1, 12)}.{rng.randint(1, 28)}.월"
+        text = f"{restaurant_name(restaurant_id)} 리뷰 {n}: " + " ".join(rng.sample(GOOD_POINTS, 2))
+        items.append(
+            '<li class="place_apply_pui EjjAW">'
+            f'<time aria-hidden="true">{date}</time>'
+            f'<div class="pui__vn15t2"><a data-pui-click-code="rvshowmore">{html.escape(text)}</a></div></li>'
+        )
+    return "".join(items)
+
+
+def entry_page(restaurant_id: int) -> str:
+    rng = random.Random(restaurant_id)
+    hours = "".join(f'<div class="w9QyJ"><span>{day}<br>11:00 - 21:00</span></div>' for day in "월화수목금토일")
+    total = config["reviews"]
+    return ENTRY_PAGE.format(
+        id=restaurant_id,
+        photos="".join(f'<img src="/photos/{restaurant_id}-{n}.jpg" width="120">' for n in range(PHOTOS)),
+        name=html.escape(restaurant_name(restaurant_id)),
+        hours=hours,
+        phone=f"02-{rng.randint(300, 999)}-{rng.randint(1000, 9999)}",
+        intro=html.escape(f"{restaurant_name(restaurant_id)}은 모의 서버가 만든 식당입니다."),
+        services="".join(f'<li class="c7TR6"><div class="owG4q">{s}</div></li>' for s in rng.sample(SERVICES, 3)),
+        parking=rng.choice(["주차 가능", "주차 불가"]),
+        seats="".join(f'<li class="Lw5L1"><div class="_2eVI0">{s}</div></li>' for s in rng.sample(SEATS, 2)),
+        good_points="".join(
+            f'<li class="MHaAm"><span class="t3JSf">{label}</span><span class="CUoLy">이 키워드를 선택한 인원 {rng.randint(1, 300)}</span></li>'
+            for label in rng.sample(GOOD_POINTS, 4)
+        ),
+        total=total,
+        reviews=review_items(restaurant_id, 0, REVIEW_PAGE_SIZE),
+        more='<a class="fvwqf" id="more" href="#more" onclick="more(event)">더보기</a>' if total > REVIEW_PAGE_SIZE else "",
+        page_size=REVIEW_PAGE_SIZE,
+    )
+
+
+def search_results(query: str) -> list:
+    """도로명주소 끝 번호로 식당을 찾고 비슷한 이름의 다른 식당 두 개를 함께 반환"""
+    match = re.search(r"(\d+)\s*$", query)
+    if not match:
+        return []
+    restaurant_id = int(match.group(1))
+    return [{"id": restaurant_id + 10_000, "name": f"모의주점 {restaurant_id}"},
+            {"id": restaurant_id, "name": restaurant_name(restaurant_id)},
+            {"id": restaurant_id + 20_000, "name": "다른식당"}]
+
+
+def write_input(path: str, restaurants: int) -> None:
+    """scraper_naver.py 입력 형식(eda_restaurant.py 출력과 같은 컬럼)의 모의 식당 CSV 저장"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["도로명주소", "사업장명", "restaurant_id"])
+        for n in range(1, restaurants + 1):
+            writer.writerow([f"{ADDRESS_PREFIX} {n}", restaurant_name(n), f"mock-{n:04d}"])
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):  # 요청마다 출력하지 않음
+        pass
+
+    def send(self, body: str, content_type: str = "text/html; charset=utf-8", status: int = 200) -> None:
+        self.send_bytes(body.encode("utf-8"), content_type, status)
+
+    def send_bytes(self, data: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if config["latency_ms"]:
+            time.sleep(config["latency_ms"] / 1000)
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/":
+                tiles = "".join(f'<img src="/tiles/{n}.png" width="64">' for n in range(MAP_TILES))
+                self.send(SEARCH_PAGE.replace("{tiles}", tiles))
+            elif url.path.startswith(("/tiles/", "/photos/")):
+                content_type = "image/png" if url.path.endswith(".png") else "image/jpeg"
+                self.send_bytes(bytes(int(config["asset_kb"] * 1024)), content_type)
+            elif url.path == "/search":
+                self.send(json.dumps(search_results(params.get("q", "")), ensure_ascii=False), "application/json")
+            elif url.path == "/entry":
+                self.send(entry_page(int(params["id"])))
+            elif url.path == "/reviews":
+                offset = int(params.get("offset", 0))
+                self.send(review_items(int(params["id"]), offset, offset + REVIEW_PAGE_SIZE))
+            else:
+                self.send("not found", "text/plain", 404)
+        except (KeyError, ValueError):
+            self.send("bad request", "text/plain", 400)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Mock Naver Map pages for replaying and profiling the crawler.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8920)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every response.")
+    parser.add_argument("--reviews", type=int, default=100, help="Reviews per restaurant.")
+    parser.add_argument("--asset-kb", type=float, default=40, help="Size of each map tile and photo.")
+    parser.add_argument("--write-input", default=None, help="Write a matching scraper input CSV and exit.")
+    parser.add_argument("--restaurants", type=int, default=20, help="Restaurants in --write-input.")
+    args = parser.parse_args()
+
+    if args.write_input:
+        write_input(args.write_input, args.restaurants)
+        print(f"[INFO] 모의 식당 {args.restaurants}개 저장: {args.write_input}")
+    else:
+        config.update(latency_ms=args.latency_ms, reviews=args.reviews, asset_kb=args.asset_kb)
+        server = ThreadingHTTPServer((args.host, args.port), Handler)
+        print(f"[INFO] 모의 네이버 지도: http://{args.host}:{args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,50 @@
+-- restaurant_updated 테이블을 타입 컬럼 기반으로 재구성합니다.
+-- 기존 테이블은 menu/keyword를 JSON 형태의 문자열로 저장해 요청마다 파싱이 필요했으므로,
+-- menu/facilities/very_good/seat_info를 text[]로, parking을 text로 분리합니다.
+-- 기존 데이터는 restaurant_updated_legacy로 보관하고, 새 테이블은 backend/app/loader.py로 적재합니다.
+--
+-- 여러 번 실행해도 안전합니다: 이미 타입 컬럼 구조(menu text[])면 테이블을 건드리지 않습니다.
+-- 트랜잭션은 실행하는 쪽에서 관리합니다 (psql -1 -f ..., benchmarks/seed_restaurants.py).
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'restaurant_updated'
+          AND column_name = 'menu' AND data_type = 'ARRAY'
+    ) THEN
+        RETURN;
+    END IF;
+
+    DROP TABLE IF EXISTS restaurant_updated_legacy;
+    ALTER TABLE IF EXISTS restaurant_updated RENAME TO restaurant_updated_legacy;
+
+    -- 테이블 이름을 바꿔도 인덱스 이름은 그대로 남아, 새 테이블의 CREATE INDEX IF NOT EXISTS가
+    -- 건너뛰어지지 않도록 기존 인덱스 이름도 함께 바꿈 (003의 restaurant_id 인덱스 포함)
+    ALTER INDEX IF EXISTS restaurant_updated_category_idx RENAME TO restaurant_updated_legacy_category_idx;
+    ALTER INDEX IF EXISTS restaurant_updated_menu_gin RENAME TO restaurant_updated_legacy_menu_gin;
+    ALTER INDEX IF EXISTS restaurant_updated_restaurant_id_idx RENAME TO restaurant_updated_legacy_restaurant_id_idx;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS restaurant_updated (
+    name            text NOT NULL,
+    category        text,
+    jibun_address   text,
+    road_address    text,
+    phone           text,
+    business_hours  text,
+    review_count    integer,
+    description     text,
+    size            double precision,
+    latitude        double precision,
+    longitude       double precision,
+    menu            text[] NOT NULL DEFAULT '{}',  -- 메뉴명 목록
+    facilities      text[] NOT NULL DEFAULT '{}',  -- 편의시설 및 서비스
+    parking         text,                          -- 주차 불가 / 주차 가능 / 유료·무료 주차 가능
+    very_good       text[] NOT NULL DEFAULT '{}',  -- "이런 점이 좋았어요" 라벨
+    seat_info       text[] NOT NULL DEFAULT '{}'   -- 좌석 정보
+);
+
+CREATE INDEX IF NOT EXISTS restaurant_updated_category_idx ON restaurant_updated (category);
+CREATE INDEX IF NOT EXISTS restaurant_updated_menu_gin ON restaurant_updated USING gin (menu);
@@ -0,0 +1,10 @@
+-- restaurant_updated를 다시 적재할 때마다 올라가는 카탈로그 버전.
+-- API 서버의 결과 캐시(menu_filter.py)는 이 값이 바뀌면 캐시를 비웁니다.
+
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    id          boolean PRIMARY KEY DEFAULT true CHECK (id),  -- 항상 한 행만 존재
+    version     bigint NOT NULL DEFAULT 1,
+    updated_at  timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO catalog_meta (id) VALUES (true) ON CONFLICT DO NOTHING;
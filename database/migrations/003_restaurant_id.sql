@@ -0,0 +1,5 @@
+-- 개체 매칭(review_analysis/preprocessing/entity_resolution.py)으로 부여한 안정적인 식당 id.
+-- 크롤링·전처리·API가 모두 이 id로 같은 식당을 가리킵니다.
+
+ALTER TABLE restaurant_updated ADD COLUMN IF NOT EXISTS restaurant_id text;
+CREATE UNIQUE INDEX IF NOT EXISTS restaurant_updated_restaurant_id_idx ON restaurant_updated (restaurant_id);
@@ -0,0 +1,12 @@
+-- 식당별 리뷰 집계 (review_analysis/preprocessing/review_stats.py에서 계산, loader.py로 적재).
+-- API 서버는 restaurant_id 기본 키로 한 번에 조회하고, 원본 리뷰는 다시 읽지 않습니다.
+
+CREATE TABLE IF NOT EXISTS restaurant_stats (
+    restaurant_id       text PRIMARY KEY,
+    review_total        integer NOT NULL DEFAULT 0,
+    latest_review_date  date,
+    reviews_by_month    jsonb NOT NULL DEFAULT '{}',  -- {"2025-02": 12, ...}
+    very_good_counts    jsonb NOT NULL DEFAULT '{}',  -- {"음식이 맛있어요": 123, ...}
+    top_terms           jsonb NOT NULL DEFAULT '[]',  -- [["분위기", 40], ...]
+    updated_at          timestamptz NOT NULL DEFAULT now()
+);
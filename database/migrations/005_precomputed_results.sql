@@ -0,0 +1,15 @@
+-- 자주 들어오는 (메뉴/카테고리, 세부사항) 조합의 미리 계산한 추천 결과 (backend/app/precompute.py).
+-- API 서버는 현재 카탈로그 버전과 같은 버전으로 계산된 행만 메모리에 올려 바로 응답하고,
+-- 없는 조합만 실시간으로 계산합니다.
+
+CREATE TABLE IF NOT EXISTS precomputed_results (
+    query_key        text PRIMARY KEY,       -- 정규화한 "메뉴/카테고리\t세부사항" (세부사항이 없으면 빈 문자열)
+    user_input       text NOT NULL,
+    details          text,                   -- NULL이면 1차 필터링(/filter_restaurants/) 결과
+    result           jsonb NOT NULL,         -- API 응답의 "restaurants" 목록
+    request_count    bigint NOT NULL DEFAULT 0,  -- 계산 시점의 요청 로그 빈도
+    catalog_version  bigint NOT NULL,
+    computed_at      timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS precomputed_results_version_idx ON precomputed_results (catalog_version);
@@ -0,0 +1,160 @@
+"""
+크롤러용 크롬 브라우저 세션 관리 모듈입니다.
+
+  - headless 모드와 이미지 비활성화 설정으로 크롬을 띄우고,
+    CDP(Network.setBlockedURLs)로 이미지/폰트/미디어/지도 타일 요청을 차단합니다.
+    (entryIframe처럼 다른 출처의 iframe은 차단 목록이 적용되지 않을 수 있어 이미지 비활성화 설정을 함께 사용)
+  - 식당마다 지도 페이지를 새로 불러오지 않고 같은 탭의 검색창을 재사용하며,
+    오류가 난 뒤에만(invalidate) 페이지를 다시 불러옵니다.
+  - recycle_pages개 식당을 처리할 때마다 드라이버를 종료하고 새로 띄워 장시간 크롤링 시 메모리 누수를 막습니다.
+  - 크롬 performance 로그의 Network 이벤트로 식당별 전송량/요청 수/차단 수를 집계합니다 (drain_network).
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+# 크롤링에 필요 없는 리소스 (CRAWL_BLOCKED_URLS에 쉼표로 패턴 추가 가능)
+BLOCKED_URL_PATTERNS: List[str] = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*map.pstatic.net/*",  # 지도 타일/스타일
+    "*.map.naver.net/*",
+    "*phinf.pstatic.net/*",  # 장소/리뷰 사진
+]
+CRAWL_RECYCLE_PAGES = int(os.getenv("CRAWL_RECYCLE_PAGES", "50"))
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+def blocked_url_patterns() -> List[str]:
+    extra = [p.strip() for p in os.getenv("CRAWL_BLOCKED_URLS", "").split(",") if p.strip()]
+    return BLOCKED_URL_PATTERNS + extra
+
+
+def build_chrome_options(headless: bool = True, block_resources: bool = True) -> Options:
+    """크롤러용 크롬 옵션 (headless, 이미지 비활성화, performance 로그 수집)"""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,2000")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--log-level=3")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    if block_resources:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # 전송량 집계용 Network 이벤트 (drain_network에서 읽을 때마다 비워짐)
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
+
+
+class BrowserSession:
+    """
+    크롬 드라이버 하나를 여러 식당에 재사용하고, 일정 페이지 수마다 새 드라이버로 교체합니다.
+    """
+
+    def __init__(self, headless: bool = True, block_resources: bool = True,
+                 recycle_pages: int = CRAWL_RECYCLE_PAGES) -> None:
+        """
+        Args:
+            headless: 창 없이 실행할지 여부.
+            block_resources: 이미지/폰트/미디어/지도 타일 요청 차단 여부.
+            recycle_pages: 이 수만큼 식당을 처리하면 드라이버를 새로 띄움 (0이면 교체하지 않음).
+        """
+        self.headless = headless
+        self.block_resources = block_resources
+        self.recycle_pages = recycle_pages
+        self.pages = 0  # 현재 드라이버로 처리한 식당 수
+        self.restarts = 0
+        self._driver: Optional[webdriver.Chrome] = None
+        self._loaded_url: Optional[str] = None  # 재사용 가능한 상태로 열려 있는 페이지
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        if self._driver is None:
+            self._driver = self.start_driver()
+        return self._driver
+
+    def start_driver(self) -> webdriver.Chrome:
+        driver = webdriver.Chrome(options=build_chrome_options(self.headless, self.block_resources))
+        if self.block_resources:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns()})
+            except Exception as e:  # CDP를 지원하지 않는 드라이버는 이미지 비활성화 설정만 적용
+                logging.warning(f"리소스 차단 설정 실패: {e}")
+        return driver
+
+    def open(self, url: str) -> bool:
+        """
+        url 페이지를 엽니다. 이미 같은 페이지가 열려 있으면 다시 불러오지 않고 재사용합니다.
+
+        Returns:
+            새로 불러왔으면 True, 기존 탭을 재사용했으면 False.
+        """
+        driver = self.driver
+        driver.switch_to.default_content()
+        if self._loaded_url == url:
+            return False
+        driver.get(url)
+        self._loaded_url = url
+        return True
+
+    def invalidate(self) -> None:
+        """페이지 상태를 믿을 수 없을 때(오류 발생 등) 다음 open에서 새로 불러오도록 표시"""
+        self._loaded_url = None
+
+    def page_done(self) -> None:
+        """식당 하나 처리가 끝날 때 호출 (recycle_pages에 도달하면 드라이버 교체)"""
+        self.pages += 1
+        if self.recycle_pages and self.pages >= self.recycle_pages:
+            self.restart()
+
+    def restart(self) -> None:
+        print(f"[INFO] 브라우저 재시작 ({self.pages}페이지 처리)")
+        logging.info(f"브라우저 재시작 ({self.pages}페이지 처리)")
+        self.close()
+        self.restarts += 1
+
+    def drain_network(self) -> Dict[str, int]:
+        """
+        마지막 호출 이후의 네트워크 사용량을 반환합니다.
+
+        Returns:
+            {"bytes": 전송량(압축 기준), "requests": 완료된 요청 수, "blocked": 차단된 요청 수}
+        """
+        usage = {"bytes": 0, "requests": 0, "blocked": 0}
+        if self._driver is None:
+            return usage
+        try:
+            entries = self._driver.get_log("performance")
+        except Exception:
+            return usage
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            if message["method"] == "Network.loadingFinished":
+                usage["bytes"] += int(message["params"].get("encodedDataLength", 0))
+                usage["requests"] += 1
+            elif message["method"] == "Network.loadingFailed" and message["params"].get("blockedReason"):
+                usage["blocked"] += 1
+        return usage
+
+    def close(self) -> None:
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            finally:
+                self._driver = None
+                self._loaded_url = None
+                self.pages = 0
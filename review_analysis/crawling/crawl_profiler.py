@@ -0,0 +1,221 @@
+"""
+크롤러 단계별 소요 시간 기록(JSONL) 및 요약 모듈입니다.
+
+NaverMapScraper는 식당 하나를 처리하는 구간("restaurant")과 그 안의 단계
+(search, open_detail, hours, phone, info, review_tab, good_points, review_sort, reviews, save)를 span으로 감싸고,
+span이 끝날 때마다 아래 형식의 한 줄을 JSONL 파일에 기록합니다.
+
+    {"run_id": "...", "restaurant": "r-0001", "name": "모의식당 1", "step": "reviews", "parent": "restaurant",
+     "status": "ok", "duration_ms": 8123.4, "wait_ms": 7020.1, "pages": 10, "reviews": 100, "ts": 1718000000.0}
+
+wait_ms는 span 안에서 random_sleep으로 기다린 시간이므로 duration_ms - wait_ms가 실제 브라우저/페이지 처리 시간입니다.
+"restaurant" 기록에는 BrowserSession이 집계한 식당별 전송량(bytes), 요청 수(requests), 차단 수(blocked)가 함께 남습니다.
+
+요약(가장 오래 걸린 단계와 식당):
+    python crawl_profiler.py crawl_profile.jsonl --top 10
+"""
+
+import json
+import os
+import threading
+import time
+from argparse import ArgumentParser
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# 스레드별 진행 중인 span 목록 (random_sleep의 대기 시간을 모든 진행 중 span에 더하기 위해 공유)
+_local = threading.local()
+
+
+def _active_spans() -> List[Dict[str, Any]]:
+    if not hasattr(_local, "spans"):
+        _local.spans = []
+    return _local.spans
+
+
+def record_wait(seconds: float) -> None:
+    """현재 스레드에서 진행 중인 모든 span에 의도적으로 기다린 시간(초)을 더합니다."""
+    for span in _active_spans():
+        span["wait_ms"] += seconds * 1000
+
+
+class CrawlProfiler:
+    """
+    span 단위 소요 시간을 JSONL 파일에 기록합니다. path가 없으면 시간만 재고 기록하지 않습니다.
+    """
+
+    def __init__(self, path: Optional[str] = None, run_id: Optional[str] = None) -> None:
+        """
+        Args:
+            path: 기록할 JSONL 파일 경로 (이어 쓰기). None이면 기록하지 않음.
+            run_id: 실행 구분자 (기본: 시작 시각-pid).
+        """
+        self.path = path
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, step: str, restaurant: Optional[str] = None, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """
+        with 블록의 소요 시간을 기록합니다. 블록에서 예외가 나면 status="error"로 기록한 뒤 다시 발생시킵니다.
+        반환된 dict에 값을 넣으면(예: span["reviews"] = 100, span["status"] = "skipped") 함께 기록됩니다.
+
+        Args:
+            step: 단계 이름.
+            restaurant: restaurant_id (생략 시 바깥 span의 값을 사용).
+            **fields: 함께 기록할 값 (예: name=식당명).
+        """
+        spans = _active_spans()
+        parent = spans[-1] if spans else None
+        record: Dict[str, Any] = {
+            "run_id": self.run_id,
+            "restaurant": restaurant if restaurant is not None else (parent or {}).get("restaurant"),
+            "step": step,
+            "parent": parent["step"] if parent else None,
+            "status": "ok",
+            "wait_ms": 0.0,
+            **fields,
+        }
+        spans.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            spans.remove(record)
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            record["wait_ms"] = round(record["wait_ms"], 2)
+            record["ts"] = round(time.time(), 3)
+            self.emit(record)
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        """기록 한 줄 쓰기 (크롤링이 중간에 죽어도 남도록 매번 flush)"""
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_records(path: str, run_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """JSONL 기록을 읽습니다 (run_id를 지정하면 해당 실행만, 깨진 줄은 건너뜀)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if run_id is None or record.get("run_id") == run_id:
+                yield record
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """nearest-rank 방식 백분위수"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    단계별 통계와 식당별 소요 시간을 계산합니다.
+
+    Returns:
+        {"steps": {단계: {count, errors, total_s, wait_s, mean_ms, p50_ms, p95_ms, max_ms}},
+         "restaurants": [{restaurant, name, status, duration_ms, wait_ms, bytes, requests, blocked,
+                          steps: {단계: ms}}] (느린 순)}
+    """
+    durations: Dict[str, List[float]] = defaultdict(list)
+    waits: Dict[str, float] = defaultdict(float)
+    errors: Dict[str, int] = defaultdict(int)
+    restaurants: Dict[Any, Dict[str, Any]] = {}
+    step_by_restaurant: Dict[Any, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    for record in records:
+        step = record["step"]
+        durations[step].append(record["duration_ms"])
+        waits[step] += record.get("wait_ms", 0.0)
+        errors[step] += record.get("status") == "error"
+        key = (record.get("run_id"), record.get("restaurant"))
+        if step == "restaurant":
+            restaurants[key] = {
+                "restaurant": record.get("restaurant"), "name": record.get("name"), "status": record.get("status"),
+                "duration_ms": record["duration_ms"], "wait_ms": record.get("wait_ms", 0.0),
+                "bytes": record.get("bytes"), "requests": record.get("requests"), "blocked": record.get("blocked"),
+            }
+        elif record.get("parent") == "restaurant":
+            step_by_restaurant[key][step] += record["duration_ms"]
+
+    steps = {}
+    for step, values in durations.items():
+        values.sort()
+        steps[step] = {
+            "count": len(values),
+            "errors": errors[step],
+            "total_s": sum(values) / 1000,
+            "wait_s": waits[step] / 1000,
+            "mean_ms": sum(values) / len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "max_ms": values[-1],
+        }
+    ranked = sorted(restaurants.items(), key=lambda item: item[1]["duration_ms"], reverse=True)
+    return {
+        "steps": dict(sorted(steps.items(), key=lambda item: item[1]["total_s"], reverse=True)),
+        "restaurants": [{**info, "steps": dict(step_by_restaurant[key])} for key, info in ranked],
+    }
+
+
+def print_summary(summary: Dict[str, Any], top: int = 10) -> None:
+    """단계별 표와 가장 오래 걸린 식당 top개를 출력합니다."""
+    restaurant_total = summary["steps"].get("restaurant", {}).get("total_s") or 0.0
+    header = (f"{'step':<14}{'count':>7}{'errors':>7}{'total_s':>10}{'share':>8}{'wait%':>7}"
+              f"{'mean_ms':>10}{'p50_ms':>10}{'p95_ms':>10}{'max_ms':>10}")
+    print(header)
+    print("-" * len(header))
+    for step, s in summary["steps"].items():
+        share = s["total_s"] / restaurant_total if restaurant_total and step != "restaurant" else None
+        wait = s["wait_s"] / s["total_s"] if s["total_s"] else 0.0
+        print(f"{step:<14}{s['count']:>7}{s['errors']:>7}{s['total_s']:>10.1f}"
+              f"{'' if share is None else f'{share:.1%}':>8}{wait:>7.0%}"
+              f"{s['mean_ms']:>10.0f}{s['p50_ms']:>10.0f}{s['p95_ms']:>10.0f}{s['max_ms']:>10.0f}")
+
+    measured = [r for r in summary["restaurants"] if r["bytes"] is not None]
+    if measured:
+        print(f"\n[네트워크] 식당당 평균 {sum(r['bytes'] for r in measured) / len(measured) / 1024:.0f} KiB, "
+              f"요청 {sum(r['requests'] for r in measured) / len(measured):.0f}개, "
+              f"차단 {sum(r['blocked'] for r in measured) / len(measured):.0f}개 ({len(measured)}개 식당)")
+
+    print(f"\n[가장 오래 걸린 식당 {top}개]")
+    for r in summary["restaurants"][:top]:
+        slowest = sorted(r["steps"].items(), key=lambda item: item[1], reverse=True)[:3]
+        network = "" if r["bytes"] is None else f", {r['bytes'] / 1024:.0f} KiB"
+        print(f"  {r['restaurant']} {r['name'] or ''} ({r['status']}): {r['duration_ms'] / 1000:.1f}s "
+              f"(대기 {r['wait_ms'] / 1000:.1f}s{network}) - "
+              + ", ".join(f"{step} {ms / 1000:.1f}s" for step, ms in slowest))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Summarize crawler span timings.")
+    parser.add_argument("path", help="Span JSONL written by scraper_naver.py --profile.")
+    parser.add_argument("--run", default=None, help="Only this run_id (default: all runs in the file).")
+    parser.add_argument("--top", type=int, default=10, help="Slowest restaurants to show.")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+    args = parser.parse_args()
+
+    summary = summarize(load_records(args.path, args.run))
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary, args.top)
@@ -0,0 +1,458 @@
+"""
+여러 머신의 크롤러 워커가 나눠 처리하는 크롤링 작업 큐 모듈입니다.
+
+CSV의 Processed 컬럼 대신 crawl_jobs 테이블(SQLite 파일 또는 PostgreSQL)에 식당별 작업을 두고,
+워커는 작업을 임대(lease)하여 처리한 뒤 결과를 테이블에 커밋합니다.
+  - 임대: 워커가 lease_s초 동안 작업을 독점하며, 처리 중에는 heartbeat로 임대 시간을 연장
+  - 워커가 죽으면 임대가 만료되어 다른 워커가 가져감 (PostgreSQL은 FOR UPDATE SKIP LOCKED로 경합 없이 분배)
+  - 실패 시 지수 백오프(backoff_s * 2^(시도-1), 최대 MAX_BACKOFF_S) 후 재시도,
+    max_attempts번 실패하거나 검색 결과가 없는 작업은 dead 상태(dead letter)로 보관 (requeue-dead로 재시도)
+  - 결과에는 수집 정보와 리뷰가 함께 저장되며, export로 naver_data.csv와 리뷰 저장소(reviews.db)를 만듦
+
+    python crawl_queue.py enqueue --queue crawl_queue.db --input restaurant_df.csv
+    python crawl_queue.py worker --queue crawl_queue.db            # 머신마다 실행 (PostgreSQL URL 사용 시 여러 머신)
+    python crawl_queue.py stats --queue crawl_queue.db
+    python crawl_queue.py export --queue crawl_queue.db --csv naver_data.csv --reviews reviews.db
+"""
+
+import json
+import logging
+import math
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from review_analysis.review_store import ReviewStore
+
+LEASE_S = float(os.getenv("CRAWL_LEASE_S", "300"))
+MAX_ATTEMPTS = int(os.getenv("CRAWL_MAX_ATTEMPTS", "3"))
+BACKOFF_S = float(os.getenv("CRAWL_BACKOFF_S", "60"))
+MAX_BACKOFF_S = 3600.0
+POLL_S = 10.0
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS crawl_jobs (
+        restaurant_id     TEXT PRIMARY KEY,
+        payload           TEXT NOT NULL,               -- 입력 CSV 행 (JSON)
+        status            TEXT NOT NULL DEFAULT 'pending',  -- pending / leased / done / dead
+        attempts          INTEGER NOT NULL DEFAULT 0,
+        available_at      DOUBLE PRECISION NOT NULL DEFAULT 0,  -- 재시도 가능 시각 (백오프)
+        lease_owner       TEXT,
+        lease_expires_at  DOUBLE PRECISION,
+        last_error        TEXT,
+        result            TEXT,                         -- 수집 결과 (JSON, 리뷰 포함)
+        updated_at        DOUBLE PRECISION NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS crawl_jobs_status_idx ON crawl_jobs (status, available_at)",
+]
+
+
+def clean_value(value: Any) -> Any:
+    """JSON으로 저장할 수 있도록 NaN/numpy 값을 파이썬 기본 값으로 변환"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def backoff_delay(attempts: int, backoff_s: float = BACKOFF_S) -> float:
+    return min(backoff_s * 2 ** max(attempts - 1, 0), MAX_BACKOFF_S)
+
+
+class CrawlQueue:
+    """
+    crawl_jobs 테이블 기반 작업 큐. url이 postgresql:// 로 시작하면 PostgreSQL, 아니면 SQLite 파일 경로로 사용합니다.
+    스레드(heartbeat)에서도 쓸 수 있도록 작업마다 연결을 새로 엽니다.
+    """
+
+    def __init__(self, url: str, max_attempts: int = MAX_ATTEMPTS, backoff_s: float = BACKOFF_S) -> None:
+        self.url = url
+        self.postgres = url.startswith(("postgresql://", "postgres://"))
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        with self.transaction() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """쓰기 트랜잭션 (SQLite는 BEGIN IMMEDIATE로 다른 워커의 동시 임대를 막음)"""
+        if self.postgres:
+            import psycopg2
+
+            conn = psycopg2.connect(self.url)
+            try:
+                with conn, conn.cursor() as cursor:
+                    yield cursor
+            finally:
+                conn.close()
+        else:
+            conn = sqlite3.connect(self.url, timeout=30, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = SqliteCursor(conn.cursor())
+                try:
+                    yield cursor
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+
+    def enqueue(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """식당 행(restaurant_id 포함)을 작업으로 추가 (이미 있는 restaurant_id는 건너뜀), 추가한 수 반환"""
+        now = time.time()
+        added = 0
+        with self.transaction() as cursor:
+            for row in rows:
+                payload = json.dumps({key: clean_value(value) for key, value in row.items()}, ensure_ascii=False)
+                cursor.execute(
+                    "INSERT INTO crawl_jobs (restaurant_id, payload, updated_at) VALUES (%s, %s, %s) "
+                    "ON CONFLICT (restaurant_id) DO NOTHING",
+                    (str(row["restaurant_id"]), payload, now),
+                )
+                added += cursor.rowcount
+        return added
+
+    def requeue(self, rows: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        식당 행을 다시 크롤링하도록 대기 상태로 둡니다 (없으면 추가, 완료/dead/대기 작업은 입력 행을 바꾸고 초기화).
+        워커가 처리 중인(leased) 작업은 건드리지 않습니다.
+
+        Returns:
+            대기 상태로 둔 restaurant_id 목록.
+        """
+        now = time.time()
+        requeued = []
+        with self.transaction() as cursor:
+            for row in rows:
+                payload = json.dumps({key: clean_value(value) for key, value in row.items()}, ensure_ascii=False)
+                cursor.execute(
+                    "INSERT INTO crawl_jobs (restaurant_id, payload, updated_at) VALUES (%s, %s, %s) "
+                    "ON CONFLICT (restaurant_id) DO UPDATE SET payload = EXCLUDED.payload, status = 'pending', "
+                    "attempts = 0, available_at = 0, lease_owner = NULL, lease_expires_at = NULL, last_error = NULL, "
+                    "result = NULL, updated_at = EXCLUDED.updated_at WHERE crawl_jobs.status <> 'leased'",
+                    (str(row["restaurant_id"]), payload, now),
+                )
+                if cursor.rowcount == 1:
+                    requeued.append(str(row["restaurant_id"]))
+        return requeued
+
+    def lease(self, worker_id: str, limit: int = 1, lease_s: float = LEASE_S) -> List[Dict[str, Any]]:
+        """
+        처리할 작업을 최대 limit개 임대합니다.
+        대기 중이면서 백오프가 끝난 작업과, 임대가 만료된(워커가 죽은) 작업이 대상입니다.
+
+        Returns:
+            [{"restaurant_id", "payload": 입력 행 dict, "attempts"}]
+        """
+        now = time.time()
+        ready = ("((status = 'pending' AND available_at <= %s) "
+                 "OR (status = 'leased' AND lease_expires_at <= %s))")
+        with self.transaction() as cursor:
+            # 임대 만료로 시도 횟수를 다 쓴 작업은 dead letter로 이동
+            cursor.execute(
+                "UPDATE crawl_jobs SET status = 'dead', last_error = 'lease expired', lease_owner = NULL, "
+                "updated_at = %s WHERE status = 'leased' AND lease_expires_at <= %s AND attempts >= %s",
+                (now, now, self.max_attempts),
+            )
+            if self.postgres:
+                cursor.execute(
+                    "UPDATE crawl_jobs SET status = 'leased', lease_owner = %s, lease_expires_at = %s, "
+                    "attempts = attempts + 1, updated_at = %s "
+                    "WHERE restaurant_id IN (SELECT restaurant_id FROM crawl_jobs WHERE " + ready +
+                    " ORDER BY available_at, restaurant_id LIMIT %s FOR UPDATE SKIP LOCKED) "
+                    "RETURNING restaurant_id, payload, attempts",
+                    (worker_id, now + lease_s, now, now, now, limit),
+                )
+                rows = cursor.fetchall()
+            else:
+                cursor.execute(
+                    "SELECT restaurant_id FROM crawl_jobs WHERE " + ready +
+                    " ORDER BY available_at, restaurant_id LIMIT %s",
+                    (now, now, limit),
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                rows = []
+                for restaurant_id in ids:
+                    cursor.execute(
+                        "UPDATE crawl_jobs SET status = 'leased', lease_owner = %s, lease_expires_at = %s, "
+                        "attempts = attempts + 1, updated_at = %s WHERE restaurant_id = %s",
+                        (worker_id, now + lease_s, now, restaurant_id),
+                    )
+                    cursor.execute("SELECT restaurant_id, payload, attempts FROM crawl_jobs WHERE restaurant_id = %s",
+                                   (restaurant_id,))
+                    rows.append(cursor.fetchone())
+        return [{"restaurant_id": r[0], "payload": json.loads(r[1]), "attempts": r[2]} for r in rows]
+
+    def heartbeat(self, worker_id: str, restaurant_id: str, lease_s: float = LEASE_S) -> bool:
+        """임대 시간 연장 (임대를 잃었으면 False)"""
+        now = time.time()
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE crawl_jobs SET lease_expires_at = %s, updated_at = %s "
+                "WHERE restaurant_id = %s AND status = 'leased' AND lease_owner = %s",
+                (now + lease_s, now, restaurant_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, worker_id: str, restaurant_id: str, result: Dict[str, Any]) -> bool:
+        """결과를 커밋하고 완료 처리 (임대를 잃었으면 다른 워커가 처리하므로 버리고 False)"""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE crawl_jobs SET status = 'done', result = %s, lease_owner = NULL, last_error = NULL, "
+                "updated_at = %s WHERE restaurant_id = %s AND status = 'leased' AND lease_owner = %s",
+                (json.dumps(result, ensure_ascii=False), time.time(), restaurant_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, worker_id: str, restaurant_id: str, error: str, retry: bool = True) -> Optional[str]:
+        """
+        실패 처리: 시도 횟수가 남았고 retry면 백오프 후 재시도(pending), 아니면 dead.
+
+        Returns:
+            바뀐 상태 ("pending" / "dead"), 임대를 잃었으면 None.
+        """
+        now = time.time()
+        with self.transaction() as cursor:
+            cursor.execute("SELECT attempts FROM crawl_jobs WHERE restaurant_id = %s AND status = 'leased' "
+                           "AND lease_owner = %s", (restaurant_id, worker_id))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            attempts = row[0]
+            status = "pending" if retry and attempts < self.max_attempts else "dead"
+            cursor.execute(
+                "UPDATE crawl_jobs SET status = %s, available_at = %s, last_error = %s, lease_owner = NULL, "
+                "lease_expires_at = NULL, updated_at = %s WHERE restaurant_id = %s",
+                (status, now + backoff_delay(attempts, self.backoff_s), error[:1000], now, restaurant_id),
+            )
+            return status
+
+    def requeue_dead(self) -> int:
+        """dead 작업을 시도 횟수를 초기화하여 다시 대기 상태로"""
+        with self.transaction() as cursor:
+            cursor.execute("UPDATE crawl_jobs SET status = 'pending', attempts = 0, available_at = 0, "
+                           "updated_at = %s WHERE status = 'dead'", (time.time(),))
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """상태별 작업 수"""
+        with self.transaction() as cursor:
+            cursor.execute("SELECT status, COUNT(*) FROM crawl_jobs GROUP BY status")
+            return {status: count for status, count in cursor.fetchall()}
+
+    def dead_jobs(self) -> List[Dict[str, Any]]:
+        with self.transaction() as cursor:
+            cursor.execute("SELECT restaurant_id, attempts, last_error FROM crawl_jobs WHERE status = 'dead' "
+                           "ORDER BY restaurant_id")
+            return [{"restaurant_id": r[0], "attempts": r[1], "last_error": r[2]} for r in cursor.fetchall()]
+
+    def done_jobs(self, since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """완료된 작업의 입력 행, 결과, 완료 시각 (since를 넘기면 그 이후에 완료된 작업만)"""
+        with self.transaction() as cursor:
+            cursor.execute("SELECT payload, result, updated_at FROM crawl_jobs WHERE status = 'done' "
+                           "AND updated_at > %s ORDER BY restaurant_id", (since if since is not None else -1.0,))
+            rows = cursor.fetchall()
+        for payload, result, updated_at in rows:
+            yield {"payload": json.loads(payload), "result": json.loads(result), "updated_at": updated_at}
+
+
+class SqliteCursor:
+    """%s 자리표시자를 SQLite의 ?로 바꿔 실행하는 커서 (PostgreSQL과 같은 SQL 사용)"""
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self.cursor = cursor
+
+    def execute(self, sql: str, params: tuple = ()) -> None:
+        self.cursor.execute(sql.replace("%s", "?"), params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    @property
+    def rowcount(self) -> int:
+        return self.cursor.rowcount
+
+
+class Heartbeat:
+    """작업을 처리하는 동안 백그라운드 스레드에서 주기적으로 임대를 연장"""
+
+    def __init__(self, queue: CrawlQueue, worker_id: str, restaurant_id: str, lease_s: float = LEASE_S) -> None:
+        self.queue = queue
+        self.worker_id = worker_id
+        self.restaurant_id = restaurant_id
+        self.lease_s = lease_s
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="crawl-heartbeat", daemon=True)
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_s / 3):
+            try:
+                if not self.queue.heartbeat(self.worker_id, self.restaurant_id, self.lease_s):
+                    self.lost = True
+                    logging.warning(f"'{self.restaurant_id}' 임대를 잃었습니다 (다른 워커가 처리 중)")
+                    return
+            except Exception as e:  # 일시적인 DB 오류는 다음 주기에 다시 시도
+                logging.warning(f"heartbeat 실패: {e}")
+
+
+def run_worker(queue: CrawlQueue, scraper: Any, worker_id: str, lease_s: float = LEASE_S,
+               exit_when_empty: bool = True) -> int:
+    """
+    큐에서 식당을 하나씩 임대하여 크롤링하고 결과를 커밋합니다.
+
+    Args:
+        queue: 작업 큐.
+        scraper: NaverMapScraper (crawl_restaurant, session, profiler 사용).
+        worker_id: 워커 구분자 (임대 소유자).
+        lease_s: 임대 시간(초). 처리 중에는 lease_s/3마다 연장.
+        exit_when_empty: 대기/임대 중인 작업이 없으면 종료 (False면 새 작업을 계속 기다림).
+
+    Returns:
+        완료한 작업 수.
+    """
+    completed = 0
+    while True:
+        jobs = queue.lease(worker_id, 1, lease_s)
+        if not jobs:
+            stats = queue.stats()
+            if exit_when_empty and not stats.get("pending") and not stats.get("leased"):
+                break
+            time.sleep(POLL_S)  # 백오프 중이거나 다른 워커가 처리 중인 작업 대기
+            continue
+
+        job = jobs[0]
+        restaurant_id, row = job["restaurant_id"], job["payload"]
+        business_name = row["사업장명"]
+        print(f"[INFO] [{worker_id}] 작업 임대: {business_name} ({restaurant_id}, 시도 {job['attempts']})")
+        try:
+            with Heartbeat(queue, worker_id, restaurant_id, lease_s), \
+                    scraper.profiler.span("restaurant", restaurant=restaurant_id, name=business_name,
+                                          worker=worker_id, attempt=job["attempts"]) as span:
+                try:
+                    result = scraper.crawl_restaurant(row["도로명주소"], business_name)
+                finally:
+                    span.update(scraper.session.drain_network())
+                if result is None:
+                    span["status"] = "skipped"
+            if result is None:
+                queue.fail(worker_id, restaurant_id, "검색 결과 없음", retry=False)
+            elif queue.complete(worker_id, restaurant_id, result):
+                completed += 1
+            else:
+                logging.warning(f"'{restaurant_id}' 결과를 버림 (임대 만료)")
+        except Exception as e:
+            scraper.session.invalidate()
+            status = queue.fail(worker_id, restaurant_id, f"{type(e).__name__}: {e}")
+            print(f"[ERROR] [{worker_id}] '{business_name}' 크롤링 실패 ({status}): {e}")
+            logging.error(f"[{worker_id}] '{business_name}' 크롤링 실패 ({status}): {e}")
+        finally:
+            scraper.session.page_done()
+    return completed
+
+
+def run_local_worker(queue: CrawlQueue, worker_id: str, lease_s: float = LEASE_S, exit_when_empty: bool = True,
+                     base_url: Optional[str] = None, profile: Optional[str] = None, headed: bool = False,
+                     recycle_pages: Optional[int] = None) -> int:
+    """이 프로세스에서 브라우저를 띄워 run_worker 실행 (selenium이 필요하므로 호출할 때 import)"""
+    from review_analysis.crawling.browser_session import CRAWL_RECYCLE_PAGES, BrowserSession
+    from review_analysis.crawling.crawl_profiler import CrawlProfiler
+    from review_analysis.crawling.scraper_naver import NAVER_MAP_URL, NaverMapScraper
+
+    session = BrowserSession(headless=not headed,
+                             recycle_pages=CRAWL_RECYCLE_PAGES if recycle_pages is None else recycle_pages)
+    scraper = NaverMapScraper(session, pd.DataFrame(), None, base_url=base_url or NAVER_MAP_URL,
+                              profiler=CrawlProfiler(profile))
+    try:
+        return run_worker(queue, scraper, worker_id, lease_s, exit_when_empty=exit_when_empty)
+    finally:
+        session.close()
+        scraper.profiler.close()
+
+
+def result_record(store: ReviewStore, job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    완료된 작업 하나를 collect_reviews와 같은 형식의 행(입력 컬럼 + 수집 컬럼)으로 만들고
+    리뷰는 리뷰 저장소에 추가합니다 (리뷰 키로 중복 제거되므로 여러 번 실행해도 안전).
+    """
+    row, result = dict(job["payload"]), job["result"]
+    row.update({column: value for column, value in result.items() if column != "reviews"})
+    store.add_reviews(str(row["restaurant_id"]), result["reviews"])
+    row["수집 리뷰 수"] = store.count_reviews(str(row["restaurant_id"]))
+    row["Processed"] = "Yes"
+    return row
+
+
+def export_results(queue: CrawlQueue, csv_path: str, reviews_path: str) -> int:
+    """완료된 작업 전체를 CSV로 저장하고 리뷰는 리뷰 저장소에 추가 (result_record)"""
+    with ReviewStore(reviews_path) as store:
+        records = [result_record(store, job) for job in queue.done_jobs()]
+    pd.DataFrame(records).to_csv(csv_path, index=False, encoding="utf-8-sig")
+    return len(records)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Crawl job queue shared by scraper workers on several machines.")
+    parser.add_argument("command", choices=["enqueue", "worker", "stats", "export", "requeue-dead"])
+    parser.add_argument("--queue", default=os.getenv("CRAWL_QUEUE", "crawl_queue.db"),
+                        help="SQLite file or postgresql:// URL shared by all workers (or set CRAWL_QUEUE).")
+    parser.add_argument("--input", default="restaurant_df.csv", help="enqueue: restaurant CSV from eda_restaurant.py.")
+    parser.add_argument("--csv", default="naver_data.csv", help="export: output CSV.")
+    parser.add_argument("--reviews", default="reviews.db", help="export: review store to add collected reviews to.")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}", help="worker: lease owner id.")
+    parser.add_argument("--lease-s", type=float, default=LEASE_S, help="worker: lease duration in seconds.")
+    parser.add_argument("--wait", action="store_true", help="worker: keep polling when the queue is empty.")
+    parser.add_argument("--base-url", default=None, help="worker: map page to search from (default: Naver Map).")
+    parser.add_argument("--profile", default=None, help="worker: append span timings as JSONL.")
+    parser.add_argument("--headed", action="store_true", help="worker: show the browser window.")
+    parser.add_argument("--recycle-pages", type=int, default=None, help="worker: restart the browser every N restaurants.")
+    args = parser.parse_args()
+
+    queue = CrawlQueue(args.queue)
+    if args.command == "enqueue":
+        df = pd.read_csv(args.input, encoding="UTF-8")
+        df = df[df["restaurant_id"].notna()]
+        added = queue.enqueue(df.to_dict("records"))
+        print(f"[INFO] 작업 {added}개 추가 (전체 {len(df)}개 중)")
+    elif args.command == "worker":
+        completed = run_local_worker(queue, args.worker_id, args.lease_s, not args.wait, args.base_url,
+                                     args.profile, args.headed, args.recycle_pages)
+        print(f"[INFO] [{args.worker_id}] 완료 {completed}개, 큐 상태: {queue.stats()}")
+    elif args.command == "stats":
+        print(queue.stats())
+        for job in queue.dead_jobs():
+            print(f"  dead {job['restaurant_id']} (시도 {job['attempts']}): {job['last_error']}")
+    elif args.command == "export":
+        exported = export_results(queue, args.csv, args.reviews)
+        print(f"[INFO] 완료된 식당 {exported}개 저장: {args.csv}, 리뷰 저장소: {args.reviews}")
+    elif args.command == "requeue-dead":
+        print(f"[INFO] dead 작업 {queue.requeue_dead()}개를 다시 대기 상태로 변경")
+
+
+if __name__ == "__main__":
+    main()
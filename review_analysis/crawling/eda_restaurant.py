@@ -1,103 +1,116 @@
 """
-"restaurant.csv" 파일을 CP949 인코딩으로 읽어 UTF-8로 변환한 후,
-선택한 데이터(서교동, 합정에 위치하며 '영업' 중인 식당)에서 불필요한 업체를 제거하고,
-사업장명에서 괄호 내 텍스트를 삭제하는 전처리를 수행하여
-최종 결과를 "restaurant_df.csv" 파일로 저장합니다.
+"restaurant.csv"(전국 식당 인허가 공공데이터, CP949 인코딩) 파일을 청크 단위로 읽으면서
+선택한 지역(기본: 서교동, 합정)에 위치하며 '영업' 중인 식당만 한 번의 순회로 골라내고,
+불필요한 업체를 제거하고 사업장명에서 괄호 내 텍스트를 삭제하는 전처리를 수행한 뒤,
+중복 식당을 묶어 restaurant_id를 부여하여 최종 결과를 "restaurant_df.csv" 파일로 저장합니다.
+
+CP949 → UTF-8 변환 임시 파일을 만들지 않고 필요한 컬럼만 읽으므로,
+수 GB 크기의 전국 데이터에서도 메모리 사용량이 청크 크기로 제한됩니다.
 """
 
+import os
+import sys
 import pandas as pd
 import re
-from typing import List
-import os
+from argparse import ArgumentParser
+from typing import List, Sequence
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from review_analysis.preprocessing.entity_resolution import assign_restaurant_ids
 
-def convert_file_encoding(input_file: str, output_file: str,
-                          input_encoding: str = "CP949",
-                          output_encoding: str = "UTF-8") -> None:
-    """
-    파일의 인코딩을 변환합니다.
-    
-    Args:
-        input_file: 원본 파일 경로.
-        output_file: 변환 후 저장할 파일 경로.
-        input_encoding: 원본 파일의 인코딩.
-        output_encoding: 저장할 파일의 인코딩.
-    """
-    with open(input_file, "r", encoding=input_encoding, errors="replace") as f:
-        data = f.read()
-    
-    with open(output_file, "w", encoding=output_encoding) as f:
-        f.write(data)
-    print(f"'{input_file}'의 인코딩을 {output_encoding}로 변환하여 '{output_file}'에 저장하였습니다.")
+# 기본 대상 지역 (지번주소에 포함된 문자열 기준)
+DEFAULT_DISTRICTS: List[str] = ["서교동", "합정"]
 
+# 제외할 업태 구분명
+EXCLUDED_CATEGORIES: List[str] = ["까페", "출장조리", "기타"]
 
-def filter_restaurant_data(input_csv: str, output_csv: str) -> None:
+# 최종적으로 저장할 컬럼
+OUTPUT_COLUMNS: List[str] = [
+    "소재지면적", "지번주소", "도로명주소", "사업장명",
+    "업태구분명", "좌표정보(X)", "좌표정보(Y)"
+]
+
+
+def filter_restaurant_data(input_csv: str, output_csv: str,
+                           districts: Sequence[str] = DEFAULT_DISTRICTS,
+                           encoding: str = "CP949",
+                           chunksize: int = 100_000) -> int:
     """
-    CSV 파일을 로드한 후 데이터를 필터링 및 전처리하여 최종 CSV 파일로 저장합니다.
+    CSV 파일을 청크 단위로 읽으며 데이터를 필터링 및 전처리하여 최종 CSV 파일로 저장합니다.
     
     Args:
         input_csv: 입력 CSV 파일 경로.
         output_csv: 출력 CSV 파일 경로.
+        districts: 지번주소에 포함되어야 하는 지역명 목록 (하나라도 포함되면 선택).
+        encoding: 입력 파일의 인코딩 (디코딩 불가한 문자는 대체 문자로 변환).
+        chunksize: 한 번에 읽을 행 수.
+
+    Returns:
+        저장된 식당 수.
     """
-    # CSV 파일 로드 (UTF-8 인코딩)
-    df = pd.read_csv(input_csv, encoding="UTF-8")
-    
-    # 선택할 컬럼 목록
-    columns_to_select: List[str] = [
-        "상세영업상태명", "전화번호", "소재지면적", "소재지우편번호",
-        "지번주소", "도로명주소", "도로명우편번호", "사업장명",
-        "업태구분명", "좌표정보(X)", "좌표정보(Y)"
-    ]
-    df_selected = df[columns_to_select]
-    
-    # '서교동'이 포함된 지번주소 필터링 후 영업 상태("영업") 데이터 선택
-    df_seo = df_selected[df_selected["지번주소"].str.contains("서교동", na=False)]
-    df_seo_fil = df_seo.loc[df_seo["상세영업상태명"] == "영업"]
-    
-    # '합정'이 포함된 지번주소 필터링 후 영업 상태("영업") 데이터 선택
-    df_hap = df_selected[df_selected["지번주소"].str.contains("합정", na=False)]
-    df_hap_fil = df_hap.loc[df_hap["상세영업상태명"] == "영업"]
-    
-    # 서교동과 합정 데이터를 결합
-    df_combined = pd.concat([df_seo_fil, df_hap_fil], ignore_index=True)
-    
-    # 제외할 업태 구분명: "까페", "출장조리", "기타"
-    df_combined_fil = df_combined[~df_combined["업태구분명"].isin(["까페", "출장조리", "기타"])]
-    
-    # 최종적으로 필요한 컬럼만 선택
-    df_final = df_combined_fil[[
-        "소재지면적", "지번주소", "도로명주소", "사업장명",
-        "업태구분명", "좌표정보(X)", "좌표정보(Y)"
-    ]]
-    
-    # '사업장명'에서 괄호 내 텍스트 제거 후 양쪽 공백 제거
-    df_final["사업장명"] = df_final["사업장명"].str.replace(r"\(.*?\)", "", regex=True).str.strip()
-    
-    # 최종 CSV 파일로 저장
-    df_final.to_csv(output_csv, index=False, encoding="UTF-8")
-    print(f"최종 데이터가 '{output_csv}' 파일로 저장되었습니다.")
+    district_pattern = "|".join(re.escape(district) for district in districts)
+    reader = pd.read_csv(
+        input_csv,
+        encoding=encoding,
+        encoding_errors="replace",
+        usecols=["상세영업상태명"] + OUTPUT_COLUMNS,  # 필요한 컬럼만 읽음
+        dtype=str,  # 청크마다 타입 추론이 달라지지 않도록 문자열로 읽고 그대로 저장
+        chunksize=chunksize,
+    )
+
+    total = 0
+    with open(output_csv, "w", encoding="UTF-8", newline="") as f:
+        for i, chunk in enumerate(reader):
+            # 대상 지역의 영업 중인 식당 중 제외 업태가 아닌 데이터 선택
+            mask = (
+                chunk["지번주소"].str.contains(district_pattern, na=False)
+                & (chunk["상세영업상태명"] == "영업")
+                & ~chunk["업태구분명"].isin(EXCLUDED_CATEGORIES)
+            )
+            df_final = chunk.loc[mask, OUTPUT_COLUMNS].copy()
+
+            # '사업장명'에서 괄호 내 텍스트 제거 후 양쪽 공백 제거
+            df_final["사업장명"] = df_final["사업장명"].str.replace(r"\(.*?\)", "", regex=True).str.strip()
+
+            df_final.to_csv(f, index=False, header=(i == 0))
+            total += len(df_final)
+
+    print(f"최종 데이터 {total}개가 '{output_csv}' 파일로 저장되었습니다.")
+    return total
+
+
+def deduplicate_restaurants(csv_path: str) -> int:
+    """
+    필터링 결과에서 같은 식당(이름·주소·좌표 기준)을 묶어 restaurant_id를 부여하고
+    식당마다 한 행만 남겨 다시 저장합니다.
+
+    Returns:
+        남은 식당 수.
+    """
+    df = pd.read_csv(csv_path, dtype=str, encoding="UTF-8")
+    df_ids = assign_restaurant_ids(df).drop_duplicates("restaurant_id")
+    df_ids.to_csv(csv_path, index=False, encoding="UTF-8")
+    print(f"중복 식당 {len(df) - len(df_ids)}개를 제거하고 restaurant_id를 부여하였습니다.")
+    return len(df_ids)
 
 
 def main() -> None:
     """
     메인 함수:
-      1. 원본 파일("restaurant.csv")을 CP949에서 UTF-8로 변환하여 "restaurant_utf8.csv"로 저장합니다.
-      2. 변환된 파일을 로드하여 데이터를 필터링 및 전처리한 후 "restaurant_df.csv"로 저장합니다.
+      1. 원본 파일("restaurant.csv", CP949)을 청크 단위로 읽어 대상 지역의 식당을 필터링 및 전처리합니다.
+      2. 중복 식당을 제거하고 restaurant_id를 부여하여 "restaurant_df.csv"로 저장합니다.
     """
-    input_file: str = "restaurant.csv"
-    utf8_file: str = "restaurant_utf8.csv"
-    output_file: str = "restaurant_df.csv"
-    
-    # 파일 인코딩 변환
-    convert_file_encoding(input_file, utf8_file, input_encoding="CP949", output_encoding="UTF-8")
-    
-    # 데이터 필터링 및 최종 CSV 저장
-    filter_restaurant_data(utf8_file, output_file)
+    parser = ArgumentParser(description="Filter the public restaurant registry by district in one streaming pass.")
+    parser.add_argument("--input", default="restaurant.csv", help="Registry CSV path.")
+    parser.add_argument("--output", default="restaurant_df.csv", help="Output CSV path.")
+    parser.add_argument("--districts", nargs="+", default=DEFAULT_DISTRICTS,
+                        help="Substrings of 지번주소 to keep. Example: --districts 서울특별시")
+    parser.add_argument("--encoding", default="CP949", help="Input file encoding.")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Rows per chunk.")
+    args = parser.parse_args()
 
-    # 작업 완료 후 restaurant_utf8.csv 삭제
-    if os.path.exists(utf8_file):
-        os.remove(utf8_file)
-        print(f"임시 파일 '{utf8_file}' 삭제 완료.")
+    filter_restaurant_data(args.input, args.output, args.districts, args.encoding, args.chunksize)
+    deduplicate_restaurants(args.output)
 
 if __name__ == "__main__":
     main()
@@ -8,7 +8,20 @@
   - "이런점이 좋았어요" 항목 (라벨과 좋아요 개수)
   - 최신 리뷰 최대 300개 (리뷰 작성일 및 텍스트)
 
-수집된 결과는 업데이트된 CSV 파일(updated_naver_map_data.csv)로 저장됩니다.
+수집된 결과는 업데이트된 CSV 파일(updated_naver_map_data.csv)로 저장되고,
+리뷰는 CSV 셀 대신 리뷰 저장소(reviews.db, review_store.ReviewStore)에 리뷰 단위로 저장됩니다.
+
+--profile을 지정하면 식당별/단계별 소요 시간을 JSONL로 기록합니다 (요약: crawl_profiler.py).
+--base-url로 로컬 모의 페이지(benchmarks/mock_naver_map.py)를 대상으로 같은 흐름을 재현할 수 있으며,
+CRAWL_SLEEP_SCALE(기본 1.0)로 단계 사이 대기 시간을 줄일 수 있습니다.
+
+브라우저는 BrowserSession(browser_session.py)이 관리합니다: 기본 headless, 이미지/폰트/지도 타일 차단,
+식당 간 탭 재사용, --recycle-pages개 식당마다 드라이버 교체. 식당별 전송량은 프로파일 기록에 함께 남습니다.
+
+    python scraper_naver.py --profile crawl_profile.jsonl
+    python crawl_profiler.py crawl_profile.jsonl --top 10
+
+여러 머신에서 나눠 크롤링할 때는 CSV의 Processed 컬럼 대신 작업 큐(crawl_queue.py)의 워커로 실행합니다.
 """
 
 import time
@@ -16,12 +29,13 @@ import random
 import logging
 import re
 import os
+import sys
 
-from typing import Any, Dict, List
+from argparse import ArgumentParser
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -29,6 +43,22 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from review_analysis.preprocessing.entity_resolution import best_name_match
+from review_analysis.review_store import ReviewStore
+from review_analysis.crawling.browser_session import CRAWL_RECYCLE_PAGES, BrowserSession
+from review_analysis.crawling.crawl_profiler import CrawlProfiler, record_wait
+
+NAVER_MAP_URL = "https://map.naver.com/"
+# 단계 사이 대기 시간 배율 (모의 페이지 재현 시 0.1 등으로 줄임)
+CRAWL_SLEEP_SCALE = float(os.getenv("CRAWL_SLEEP_SCALE", "1.0"))
+MAX_REVIEWS = 300  # 식당별 최대 수집 리뷰 수
+# crawl_restaurant 결과 중 DataFrame에 저장하는 컬럼 (리뷰는 리뷰 저장소에 저장)
+RESULT_COLUMNS: List[str] = [
+    "전화번호", "운영시간", "총 리뷰 개수", "소개",
+    "편의시설 및 서비스", "주차 정보", "좌석 정보", "이런점이 좋았어요"
+]
+
 # 로깅 설정
 logging.basicConfig(
     filename="crawling.log",
@@ -45,28 +75,44 @@ def random_sleep(min_wait: float = 1.0, max_wait: float = 3.0) -> None:
         min_wait: 최소 대기 시간(초)
         max_wait: 최대 대기 시간(초)
     """
-    time.sleep(random.uniform(min_wait, max_wait))
+    seconds = random.uniform(min_wait, max_wait) * CRAWL_SLEEP_SCALE
+    time.sleep(seconds)
+    record_wait(seconds)  # 프로파일 span의 대기 시간(wait_ms)으로 집계
 
 class NaverMapScraper:
     """
     네이버 지도에서 식당 정보를 크롤링하는 클래스입니다.
     """
     
-    def __init__(self, driver: webdriver.Chrome, df: pd.DataFrame) -> None:
+    def __init__(self, session: BrowserSession, df: pd.DataFrame, review_store: Optional[ReviewStore],
+                 base_url: str = NAVER_MAP_URL, profiler: Optional[CrawlProfiler] = None) -> None:
         """
         초기화합니다.
         
         Args:
-            driver: Selenium WebDriver 인스턴스.
-            df: '도로명주소'와 '사업장명' 컬럼을 포함한 식당 정보 DataFrame.
+            session: 크롬 드라이버를 재사용/교체하는 브라우저 세션.
+            df: '도로명주소', '사업장명', 'restaurant_id' 컬럼을 포함한 식당 정보 DataFrame
+                (eda_restaurant.py 출력).
+            review_store: 수집한 리뷰를 리뷰 단위로 저장할 저장소
+                (crawl_restaurant만 사용하는 큐 워커(crawl_queue.py)는 None).
+            base_url: 검색을 시작할 지도 페이지 주소 (모의 페이지로 바꿔 재현 가능).
+            profiler: 단계별 소요 시간 기록기 (None이면 기록하지 않음).
         """
-        self.driver = driver
+        self.session = session
         self.df = df
+        self.review_store = review_store
+        self.base_url = base_url
+        self.profiler = profiler or CrawlProfiler()
         self.total_rows = len(self.df)
 
         if "Processed" not in self.df.columns:
             self.df["Processed"] = ""
 
+    @property
+    def driver(self) -> webdriver.Chrome:
+        """현재 드라이버 (세션이 드라이버를 교체할 수 있으므로 매번 세션에서 가져옴)"""
+        return self.session.driver
+
     def collect_reviews(self) -> None:
         """
         각 식당에 대해 네이버 지도에서 정보를 수집하여 DataFrame을 업데이트하고,
@@ -75,7 +121,7 @@ class NaverMapScraper:
         # 추가할 컬럼들을 DataFrame에 미리 생성합니다.
         columns_to_add = [
             "전화번호", "운영시간", "총 리뷰 개수", "소개",
-            "편의시설 및 서비스", "주차 정보", "이런점이 좋았어요", "최신 300개 리뷰"
+            "편의시설 및 서비스", "주차 정보", "이런점이 좋았어요", "수집 리뷰 수"
         ]
         for col in columns_to_add:
             if col not in self.df.columns:
@@ -86,374 +132,442 @@ class NaverMapScraper:
 
             if row["Processed"] == "Yes":
                 continue
-            road_address: str = row["도로명주소"]
             business_name: str = row["사업장명"]
 
-            # 기본값 초기화
-            phone: str = "정보 없음"
-            total_reviews: int = 0
-            intro: str = "정보 없음"
-            services: List = []
-            parking: str = "정보 없음"
-            seating_types: List = []
-            good_points: List[List[Any]] = []
-            collected_reviews: List[Dict[str, str]] = []
-            operation_data: Dict = {}
-
             try:
-                print(f"[INFO] 검색 시작: {business_name} ({road_address})")
-                logging.info(f"검색 시작: {business_name} ({road_address})")
-                self.driver.get("https://map.naver.com/")
-                random_sleep(2, 4)
+                with self.profiler.span("restaurant", restaurant=str(row["restaurant_id"]), name=business_name) as span:
+                    try:
+                        if not self.scrape_restaurant(index, row):
+                            span["status"] = "skipped"
+                    finally:
+                        span.update(self.session.drain_network())  # 식당별 전송량/요청 수/차단 수
 
-                # 검색창에 도로명주소 입력 후 검색
-                search_box = self.driver.find_element(By.XPATH, "//input[contains(@class, 'input_search')]")
-                search_box.clear()
-                search_box.send_keys(road_address)
-                search_box.send_keys(Keys.RETURN)
-                random_sleep(3, 5)
+            except Exception as e:
+                self.session.invalidate()  # 페이지 상태를 알 수 없으므로 다음 식당은 새로 불러옴
+                print(f"[ERROR] '{business_name}' 크롤링 중 오류 발생: {e}")
+                logging.error(f"'{business_name}' 크롤링 중 오류 발생: {e}")
 
-                # "더보기" 버튼 클릭 시도
-                try:
-                    more_button = self.driver.find_element(By.XPATH, "//button[contains(@class, 'link_more')]")
-                    more_button.click()
-                    random_sleep(2, 4)
-                except NoSuchElementException:
-                    print(f"[WARNING] '{business_name}' - '더보기' 버튼 없음, 스킵")
-                    logging.warning(f"'{business_name}' - '더보기' 버튼 없음, 스킵")
-
-                # 검색 결과 중에서 식당명을 포함한 요소를 찾음
-                place_elements = self.driver.find_elements(By.XPATH, "//strong[contains(@class, 'search_title')]")
-                target_place = None
-                for place in place_elements:
-                    if business_name.strip() in place.text.strip() or place.text.strip() in business_name.strip():
-                        target_place = place
-                        break
-
-                if target_place:
-                    try:
-                        search_link = target_place.find_element(
-                            By.XPATH, "./ancestor::button[@class='link_search']"
-                        )
-                        search_link.click()
-                        time.sleep(3)
-                        print(f"[INFO] '{business_name}' 버튼 클릭 완료!")
-                        logging.info(f"'{business_name}' 버튼 클릭 완료!")
-                    except NoSuchElementException:
-                        print(f"[ERROR] '{business_name}' - 검색 결과에서 버튼을 찾을 수 없습니다.")
-                        logging.warning(f"'{business_name}' - 조상 <button> 태그를 찾을 수 없습니다.")
-                    except Exception as e:
-                        print(f"[ERROR] '{business_name}' 버튼 클릭 실패: {e}")
-                        logging.warning(f"'{business_name}' 버튼 클릭 실패: {e}")
-                else:
-                    print(f"[WARNING] '{business_name}' - 검색 결과 없음, 스킵")
-                    logging.warning(f"'{business_name}' - 검색 결과 없음, 스킵")
-                    continue
-
-                # iframe 로딩 후 진입
-                WebDriverWait(self.driver, 10).until(
-                    EC.frame_to_be_available_and_switch_to_it((By.ID, "entryIframe"))
-                )
-                print("[INFO] entryIframe 진입 완료")
-                logging.info("entryIframe 진입 완료")
+            self.session.page_done()
 
-                # 영업 시간 버튼
-                try:
-                    hours_tab = self.driver.find_element(By.XPATH, "//div[contains(@class, 'A_cdD')]")
-                    hours_tab.click()
-                    print("[INFO] 영업 시간 버튼 클릭 완료!")
-                    logging.info("영업 시간 버튼 클릭 완료!")
-                    random_sleep(2, 3)
-                except NoSuchElementException:
-                    print("[WARNING] 영업시간 버튼을 찾지 못했습니다.")
-                    logging.warning("영업시간 버튼을 찾지 못했습니다.")
-                
-                valid_days = ["월", "화", "수", "목", "금", "토", "일"]  # 요일 리스트
+        # 모든 식당 처리 후 드라이버 및 리뷰 저장소 종료, CSV 저장
+        self.session.close()
+        self.review_store.close()
+        self.profiler.close()
+        output_filename = "naver_data.csv"
+        self.df.to_csv(output_filename, index=False, encoding="utf-8-sig")
+        print(f"[INFO] 크롤링 완료! CSV 파일로 저장됨: {output_filename}")
+        logging.info(f"크롤링 완료! CSV 파일로 저장됨: {output_filename}")
 
-                try:
-                    # 모든 요일 및 영업시간 요소 찾기
-                    days = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'w9QyJ')]//span[1]")
-                    raw_data = [day.text.strip() for day in days[2:]]  # 불필요한 앞 2개 데이터 제외
-                    print("[DEBUG] raw_data:", raw_data)
-
-                    # 요일과 영업시간 매핑 (2개씩 묶어서 처리)
-                    for item in raw_data:
-                        # 개행 문자가 있는 항목만 처리 (즉, "요일\n영업시간 ..." 형식인 경우)
-                        if "\n" in item:
-                            parts = item.split("\n")
-                            # parts[0]는 요일, parts[1]은 바로 뒤에 있는 영업시간 정보
-                            if len(parts) >= 2:
-                                day = parts[0].strip()
-                                hours = parts[1].strip()
-                                if day in valid_days:
-                                    operation_data[day] = hours
-
-                    print("[DEBUG] operation_data (unsorted):", operation_data)
-                    # 현재까지 '정보없음'인 경우 정리: 당일만 휴무인 경우
-                    sorted_operation_data = {day: operation_data.get(day, "정보 없음") for day in valid_days}
-                    print("[INFO] 영업시간 크롤링 완료:", sorted_operation_data)
-                    logging.info(f"영업시간 크롤링 완료: {sorted_operation_data}")
+        # if os.path.exists("restaurant_temp.csv"):
+        #     os.remove("restaurant_temp.csv")
+        #     print(f"임시 파일 'restaurant_temp.csv' 삭제 완료.")
 
-                except Exception as e:
-                    print("[ERROR] 영업시간 수집 오류 발생:", e)
-                    logging.error("영업시간 수집 오류 발생: " + str(e))
+    def scrape_restaurant(self, index: Any, row: pd.Series) -> bool:
+        """
+        식당 하나를 수집(crawl_restaurant)하여 DataFrame과 리뷰 저장소에 반영합니다.
 
-                try:
-                    phone_element = self.driver.find_element(By.XPATH, "//div[@class='vV_z_']//span[@class='xlx7Q']")
-                    phone = phone_element.text
-                    print("[INFO] 전화번호:", phone)
-                    logging.info(f"전화번호: {phone}")
-                except Exception as e:
-                    print("[ERROR] 전화번호 수집 오류 발생:", e)
-                    logging.error(f"전화번호 수집 오류 발생: {e}")
+        Args:
+            index: DataFrame 행 인덱스.
+            row: 식당 행 ('도로명주소', '사업장명', 'restaurant_id' 포함).
 
-                time.sleep(1)
-                # '정보' 탭 클릭
-                try:
-                    review_tab = self.driver.find_element(By.XPATH, "//a[contains(@class, 'fvwqf') and .//span[contains(@class, 'iNSaH') and text()='정보']]")
-                    review_tab.click()
-                    print("[INFO] 정보 탭 클릭 완료!")
-                    logging.info("정보 탭 클릭 완료!")
-                    random_sleep(2, 3)
-                except NoSuchElementException:
-                    print("[WARNING] '정보' 탭을 찾지 못했습니다.")
-                    logging.warning("'정보' 탭을 찾지 못했습니다.")
+        Returns:
+            수집하여 반영했으면 True, 검색 결과가 없어 건너뛰었으면 False.
+        """
+        business_name: str = row["사업장명"]
+        result = self.crawl_restaurant(row["도로명주소"], business_name)
+        if result is None:
+            return False
+
+        with self.profiler.span("save"):
+            # DataFrame에 수집된 데이터 저장
+            for column in RESULT_COLUMNS:
+                self.df.at[index, column] = result[column]
+            # 리뷰는 리뷰 저장소에 한 행씩 저장 (재수집한 리뷰는 텍스트·작성일·순번 키로 제거됨)
+            new_count = self.review_store.add_reviews(row["restaurant_id"], result["reviews"])
+            self.df.at[index, "수집 리뷰 수"] = self.review_store.count_reviews(row["restaurant_id"])
+            logging.info(f"리뷰 저장소에 새 리뷰 {new_count}개 저장")
+
+            print(f"[INFO] '{business_name}' 데이터프레임 저장 완료")
+            logging.info(f"'{business_name}' 데이터프레임 저장 완료")
+
+            # 식당 처리 완료 표시
+            self.df.at[index, "Processed"] = "Yes"
+
+            # 진행 상황 저장 
+            temp_output = "restaurant_temp.csv"
+            self.df.to_csv(temp_output, index=False, encoding="utf-8-sig")  
+            print(f"[INFO] 현재 진행 상황 저장됨 - {self.total_rows}개 중 {index+1}개 업데이트")
+            print(f"[INFO] 현재 csv 상 위치: ")
+
+        return True
+
+    def crawl_restaurant(self, road_address: str, business_name: str) -> Optional[Dict[str, Any]]:
+        """
+        식당 하나를 검색하여 상세 정보와 리뷰를 수집합니다 (DataFrame/리뷰 저장소는 건드리지 않음).
+        단계(search, open_detail, hours, phone, info, review_tab, good_points, review_sort, reviews)마다
+        profiler span으로 소요 시간을 기록합니다.
 
-                time.sleep(1)
-                # 펼쳐보기 클릭
-                try:
-                    expand_button = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable(
-                            (By.XPATH, "//a[contains(@class, 'OWPIf')]//span[contains(@class, 'place_blind') and contains(text(), '펼쳐보기')]")
-                        )
-                    )
-                    
-                    # 일반 click() 호출이 안 될 경우 JavaScript click() 사용
-                    self.driver.execute_script("arguments[0].click();", expand_button)
-                    print("[INFO] '펼쳐보기' 버튼 클릭 완료!")
-                    logging.info("'펼쳐보기' 버튼 클릭 완료!")
-                except Exception as e:
-                    print("[WARNING] '펼쳐보기' 버튼을 찾지 못했습니다.", e)
-                    logging.warning(f"'펼쳐보기' 버튼을 찾지 못했습니다.: {e}")
-                
-                # 소개 텍스트 추출
-                try:
-                    desc_div = self.driver.find_element(
-                        By.XPATH,
-                        "//div[contains(@class, 'T8RFa') and contains(@class, 'CEyr5')]"
-                    )
-                    intro = desc_div.text.strip()
-                    print("[INFO] 소개 텍스트 추출 완료:")
-                    logging.info("소개 텍스트 추출 완료")
-                    print(intro)
-                except Exception as e:
-                    intro = "정보 없음"
-                    print("[ERROR] 소개 텍스트 추출 실패:", e)
-                    logging.error(f"소개 텍스트 추출 실패: {e}")
-                
-                # 서비스 추출
-                try:
-                    services_ul = self.driver.find_element(By.XPATH, "//ul[contains(@class, 'JU0iX')]")
-                    services_lis = services_ul.find_elements(By.XPATH, ".//li[contains(@class, 'c7TR6')]")
-                    for li in services_lis:
-                        try:
-                            services_text = li.find_element(By.XPATH, ".//div[contains(@class, 'owG4q')]").text.strip()
-                            services.append(services_text)
-                        except Exception as ex:
-                            print("[WARN] 서비스 항목 추출 오류:", ex)
-                            logging.warning(f"서비스 항목 추출 오류: {ex}")
-                    print("[INFO] 서비스 추출 완료:", services)
-                    logging.info("서비스 추출 완료")
-                except Exception as e:
-                    print("[ERROR] 서비스 추출 실패:", e)
-                    logging.error(f"서비스 추출 실패: {e}")
-                
-                # 주차 정보 추출
+        Args:
+            road_address: 검색할 도로명주소.
+            business_name: 검색 결과에서 고를 식당명.
+
+        Returns:
+            RESULT_COLUMNS 값과 "reviews"(최대 MAX_REVIEWS개의 {"date", "text"})를 담은 dict,
+            검색 결과가 없으면 None.
+        """
+        # 기본값 초기화
+        phone: str = "정보 없음"
+        total_reviews: int = 0
+        intro: str = "정보 없음"
+        services: List = []
+        parking: str = "정보 없음"
+        seating_types: List = []
+        good_points: List[List[Any]] = []
+        collected_reviews: List[Dict[str, str]] = []
+        operation_data: Dict = {}
+
+        with self.profiler.span("search") as span:
+            print(f"[INFO] 검색 시작: {business_name} ({road_address})")
+            logging.info(f"검색 시작: {business_name} ({road_address})")
+            # 이전 식당에서 쓰던 탭이 있으면 다시 불러오지 않고 검색창을 재사용
+            if self.session.open(self.base_url):
+                random_sleep(2, 4)
+
+            # 검색창에 도로명주소 입력 후 검색
+            search_box = self.driver.find_element(By.XPATH, "//input[contains(@class, 'input_search')]")
+            search_box.clear()
+            search_box.send_keys(road_address)
+            search_box.send_keys(Keys.RETURN)
+            random_sleep(3, 5)
+
+            # "더보기" 버튼 클릭 시도
+            try:
+                more_button = self.driver.find_element(By.XPATH, "//button[contains(@class, 'link_more')]")
+                more_button.click()
+                random_sleep(2, 4)
+            except NoSuchElementException:
+                print(f"[WARNING] '{business_name}' - '더보기' 버튼 없음, 스킵")
+                logging.warning(f"'{business_name}' - '더보기' 버튼 없음, 스킵")
+
+            # 검색 결과 중에서 식당명이 가장 비슷한 요소를 찾음 (정규화된 이름 유사도 기준)
+            place_elements = self.driver.find_elements(By.XPATH, "//strong[contains(@class, 'search_title')]")
+            match_index = best_name_match(business_name, [place.text.strip() for place in place_elements])
+            target_place = place_elements[match_index] if match_index is not None else None
+
+            if target_place:
                 try:
-                    parking_div = self.driver.find_element(
-                        By.XPATH, 
-                        "//div[contains(@class, 'qbROU')]//div[contains(@class, 'TZ6eS')]"
+                    search_link = target_place.find_element(
+                        By.XPATH, "./ancestor::button[@class='link_search']"
                     )
-                    parking = parking_div.text.strip()
-                    print("[INFO] 주차 정보 추출 완료:", parking)
-                    logging.info("주차 정보 추출 완료")
+                    search_link.click()
+                    random_sleep(3, 3)
+                    print(f"[INFO] '{business_name}' 버튼 클릭 완료!")
+                    logging.info(f"'{business_name}' 버튼 클릭 완료!")
+                except NoSuchElementException:
+                    print(f"[ERROR] '{business_name}' - 검색 결과에서 버튼을 찾을 수 없습니다.")
+                    logging.warning(f"'{business_name}' - 조상 <button> 태그를 찾을 수 없습니다.")
                 except Exception as e:
-                    parking = "정보 없음"
-                    print("[ERROR] 주차 정보 추출 실패:", e)
-                    logging.info(f"주차 정보 추출 실패: {e}")
-                
-                # 좌석 정보 추출
-                try:
-                    seating_ul = self.driver.find_element(
-                        By.XPATH, 
-                        "//div[contains(@class, 'place_section_content')]//ul[contains(@class, 'GXptY')]"
+                    print(f"[ERROR] '{business_name}' 버튼 클릭 실패: {e}")
+                    logging.warning(f"'{business_name}' 버튼 클릭 실패: {e}")
+            else:
+                print(f"[WARNING] '{business_name}' - 검색 결과 없음, 스킵")
+                logging.warning(f"'{business_name}' - 검색 결과 없음, 스킵")
+                span["status"] = "skipped"
+                return None
+
+        with self.profiler.span("open_detail"):
+            # iframe 로딩 후 진입
+            WebDriverWait(self.driver, 10).until(
+                EC.frame_to_be_available_and_switch_to_it((By.ID, "entryIframe"))
+            )
+            print("[INFO] entryIframe 진입 완료")
+            logging.info("entryIframe 진입 완료")
+
+        with self.profiler.span("hours"):
+            # 영업 시간 버튼
+            try:
+                hours_tab = self.driver.find_element(By.XPATH, "//div[contains(@class, 'A_cdD')]")
+                hours_tab.click()
+                print("[INFO] 영업 시간 버튼 클릭 완료!")
+                logging.info("영업 시간 버튼 클릭 완료!")
+                random_sleep(2, 3)
+            except NoSuchElementException:
+                print("[WARNING] 영업시간 버튼을 찾지 못했습니다.")
+                logging.warning("영업시간 버튼을 찾지 못했습니다.")
+
+            valid_days = ["월", "화", "수", "목", "금", "토", "일"]  # 요일 리스트
+
+            try:
+                # 모든 요일 및 영업시간 요소 찾기
+                days = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'w9QyJ')]//span[1]")
+                raw_data = [day.text.strip() for day in days[2:]]  # 불필요한 앞 2개 데이터 제외
+                print("[DEBUG] raw_data:", raw_data)
+
+                # 요일과 영업시간 매핑 (2개씩 묶어서 처리)
+                for item in raw_data:
+                    # 개행 문자가 있는 항목만 처리 (즉, "요일\n영업시간 ..." 형식인 경우)
+                    if "\n" in item:
+                        parts = item.split("\n")
+                        # parts[0]는 요일, parts[1]은 바로 뒤에 있는 영업시간 정보
+                        if len(parts) >= 2:
+                            day = parts[0].strip()
+                            hours = parts[1].strip()
+                            if day in valid_days:
+                                operation_data[day] = hours
+
+                print("[DEBUG] operation_data (unsorted):", operation_data)
+                # 현재까지 '정보없음'인 경우 정리: 당일만 휴무인 경우
+                sorted_operation_data = {day: operation_data.get(day, "정보 없음") for day in valid_days}
+                print("[INFO] 영업시간 크롤링 완료:", sorted_operation_data)
+                logging.info(f"영업시간 크롤링 완료: {sorted_operation_data}")
+
+            except Exception as e:
+                print("[ERROR] 영업시간 수집 오류 발생:", e)
+                logging.error("영업시간 수집 오류 발생: " + str(e))
+
+        with self.profiler.span("phone"):
+            try:
+                phone_element = self.driver.find_element(By.XPATH, "//div[@class='vV_z_']//span[@class='xlx7Q']")
+                phone = phone_element.text
+                print("[INFO] 전화번호:", phone)
+                logging.info(f"전화번호: {phone}")
+            except Exception as e:
+                print("[ERROR] 전화번호 수집 오류 발생:", e)
+                logging.error(f"전화번호 수집 오류 발생: {e}")
+
+        with self.profiler.span("info"):
+            random_sleep(1, 1)
+            # '정보' 탭 클릭
+            try:
+                review_tab = self.driver.find_element(By.XPATH, "//a[contains(@class, 'fvwqf') and .//span[contains(@class, 'iNSaH') and text()='정보']]")
+                review_tab.click()
+                print("[INFO] 정보 탭 클릭 완료!")
+                logging.info("정보 탭 클릭 완료!")
+                random_sleep(2, 3)
+            except NoSuchElementException:
+                print("[WARNING] '정보' 탭을 찾지 못했습니다.")
+                logging.warning("'정보' 탭을 찾지 못했습니다.")
+
+            random_sleep(1, 1)
+            # 펼쳐보기 클릭
+            try:
+                expand_button = WebDriverWait(self.driver, 10).until(
+                    EC.element_to_be_clickable(
+                        (By.XPATH, "//a[contains(@class, 'OWPIf')]//span[contains(@class, 'place_blind') and contains(text(), '펼쳐보기')]")
                     )
-                    seating_lis = seating_ul.find_elements(By.XPATH, ".//li[contains(@class, 'Lw5L1')]")
-                    for li in seating_lis:
-                        try:
-                            seating_text = li.find_element(By.XPATH, ".//div[contains(@class, '_2eVI0')]").text.strip()
-                            seating_types.append(seating_text)
-                        except Exception as ex:
-                            print("[WARN] 좌석 정보 추출 오류:", ex)
-                            logging.warning(f"좌석 정보 추출 오류: {ex}")
-                    print("[INFO] 좌석 정보 추출 완료:", seating_types)
-                    logging.info("좌석 정보 추출 완료")
-                except Exception as e:
-                    print("[ERROR] 좌석 정보 추출 실패:", e)
-                    logging.error(f"좌석 정보 추출 실패: {e}")
+                )
 
-                # '리뷰' 탭 클릭
-                try:
-                    review_tab = self.driver.find_element(By.XPATH, "//span[normalize-space(text())='리뷰']")
-                    review_tab.click()
-                    print("[INFO] 리뷰 탭 클릭 완료!")
-                    logging.info("리뷰 탭 클릭 완료!")
-                    random_sleep(2, 3)
-                except NoSuchElementException:
-                    print("[WARNING] '리뷰' 탭을 찾지 못했습니다.")
-                    logging.warning("'리뷰' 탭을 찾지 못했습니다.")
+                # 일반 click() 호출이 안 될 경우 JavaScript click() 사용
+                self.driver.execute_script("arguments[0].click();", expand_button)
+                print("[INFO] '펼쳐보기' 버튼 클릭 완료!")
+                logging.info("'펼쳐보기' 버튼 클릭 완료!")
+            except Exception as e:
+                print("[WARNING] '펼쳐보기' 버튼을 찾지 못했습니다.", e)
+                logging.warning(f"'펼쳐보기' 버튼을 찾지 못했습니다.: {e}")
 
-                # "이런점이 좋았어요" 항목 수집 (최대 4개)
-                try:
-                    items = self.driver.find_elements(By.XPATH, "//li[contains(@class, 'MHaAm')]")
-                    for item in items[:4]:
-                        label_elem = item.find_element(By.XPATH, ".//span[contains(@class,'t3JSf')]")
-                        label_text = label_elem.text.strip()
+            # 소개 텍스트 추출
+            try:
+                desc_div = self.driver.find_element(
+                    By.XPATH,
+                    "//div[contains(@class, 'T8RFa') and contains(@class, 'CEyr5')]"
+                )
+                intro = desc_div.text.strip()
+                print("[INFO] 소개 텍스트 추출 완료:")
+                logging.info("소개 텍스트 추출 완료")
+                print(intro)
+            except Exception as e:
+                intro = "정보 없음"
+                print("[ERROR] 소개 텍스트 추출 실패:", e)
+                logging.error(f"소개 텍스트 추출 실패: {e}")
 
-                        count_elem = item.find_element(By.XPATH, ".//span[contains(@class,'CUoLy')]")
-                        count_text = count_elem.text.strip()
+            # 서비스 추출
+            try:
+                services_ul = self.driver.find_element(By.XPATH, "//ul[contains(@class, 'JU0iX')]")
+                services_lis = services_ul.find_elements(By.XPATH, ".//li[contains(@class, 'c7TR6')]")
+                for li in services_lis:
+                    try:
+                        services_text = li.find_element(By.XPATH, ".//div[contains(@class, 'owG4q')]").text.strip()
+                        services.append(services_text)
+                    except Exception as ex:
+                        print("[WARN] 서비스 항목 추출 오류:", ex)
+                        logging.warning(f"서비스 항목 추출 오류: {ex}")
+                print("[INFO] 서비스 추출 완료:", services)
+                logging.info("서비스 추출 완료")
+            except Exception as e:
+                print("[ERROR] 서비스 추출 실패:", e)
+                logging.error(f"서비스 추출 실패: {e}")
 
-                        match = re.search(r'\d+', count_text)
-                        count_val = int(match.group()) if match else 0
+            # 주차 정보 추출
+            try:
+                parking_div = self.driver.find_element(
+                    By.XPATH, 
+                    "//div[contains(@class, 'qbROU')]//div[contains(@class, 'TZ6eS')]"
+                )
+                parking = parking_div.text.strip()
+                print("[INFO] 주차 정보 추출 완료:", parking)
+                logging.info("주차 정보 추출 완료")
+            except Exception as e:
+                parking = "정보 없음"
+                print("[ERROR] 주차 정보 추출 실패:", e)
+                logging.info(f"주차 정보 추출 실패: {e}")
 
-                        good_points.append([label_text, count_val])
-                    print(f"[INFO] '이런점이 좋았어요' 수집 완료: {good_points}")
-                    logging.info(f"'이런점이 좋았어요' 수집 완료: {good_points}")
-                except NoSuchElementException:
-                    print("[WARNING] '이런점이 좋았어요' 항목을 찾지 못했습니다.")
-                    logging.warning("'이런점이 좋았어요' 항목을 찾지 못했습니다.")
-                except Exception as e:
-                    print(f"[WARNING] '이런점이 좋았어요' 수집 중 오류: {e}")
-                    logging.warning(f"'이런점이 좋았어요' 수집 중 오류: {e}")
+            # 좌석 정보 추출
+            try:
+                seating_ul = self.driver.find_element(
+                    By.XPATH, 
+                    "//div[contains(@class, 'place_section_content')]//ul[contains(@class, 'GXptY')]"
+                )
+                seating_lis = seating_ul.find_elements(By.XPATH, ".//li[contains(@class, 'Lw5L1')]")
+                for li in seating_lis:
+                    try:
+                        seating_text = li.find_element(By.XPATH, ".//div[contains(@class, '_2eVI0')]").text.strip()
+                        seating_types.append(seating_text)
+                    except Exception as ex:
+                        print("[WARN] 좌석 정보 추출 오류:", ex)
+                        logging.warning(f"좌석 정보 추출 오류: {ex}")
+                print("[INFO] 좌석 정보 추출 완료:", seating_types)
+                logging.info("좌석 정보 추출 완료")
+            except Exception as e:
+                print("[ERROR] 좌석 정보 추출 실패:", e)
+                logging.error(f"좌석 정보 추출 실패: {e}")
 
-                # 총 리뷰 수 수집
-                try:
-                    count_elem = self.driver.find_element(By.XPATH, "//em[@class='place_section_count']")
+        with self.profiler.span("review_tab"):
+            # '리뷰' 탭 클릭
+            try:
+                review_tab = self.driver.find_element(By.XPATH, "//span[normalize-space(text())='리뷰']")
+                review_tab.click()
+                print("[INFO] 리뷰 탭 클릭 완료!")
+                logging.info("리뷰 탭 클릭 완료!")
+                random_sleep(2, 3)
+            except NoSuchElementException:
+                print("[WARNING] '리뷰' 탭을 찾지 못했습니다.")
+                logging.warning("'리뷰' 탭을 찾지 못했습니다.")
+
+        with self.profiler.span("good_points"):
+            # "이런점이 좋았어요" 항목 수집 (최대 4개)
+            try:
+                items = self.driver.find_elements(By.XPATH, "//li[contains(@class, 'MHaAm')]")
+                for item in items[:4]:
+                    label_elem = item.find_element(By.XPATH, ".//span[contains(@class,'t3JSf')]")
+                    label_text = label_elem.text.strip()
+
+                    count_elem = item.find_element(By.XPATH, ".//span[contains(@class,'CUoLy')]")
                     count_text = count_elem.text.strip()
-                    total_reviews = int(count_text)
-                    print(f"[INFO] 총 리뷰 수: {total_reviews}")
-                    logging.info(f"총 리뷰 수: {total_reviews}")
-                except NoSuchElementException:
-                    print("[WARNING] 총 리뷰 수를 찾을 수 없습니다.")
-                    logging.warning("총 리뷰 수를 찾을 수 없습니다.")
-                except ValueError:
-                    print(f"[WARNING] 리뷰 수 텍스트를 숫자로 변환할 수 없음: {count_text}")
-                    logging.warning(f"리뷰 수 텍스트를 숫자로 변환할 수 없음: {count_text}")
 
-                # 최신순 정렬 클릭
-                try:
-                    latest_sort = self.driver.find_element(By.XPATH, "//a[contains(., '최신순')]")
-                    latest_sort.click()
-                    print("[INFO] 최신순 클릭 완료")
-                    logging.info("최신순 클릭 완료")
-                    random_sleep(2, 4)
-                except Exception:
-                    print("[WARNING] 최신순 클릭 불가")
-                    logging.warning("최신순 클릭 불가")
-
-                # 리뷰 최대 300개 수집
-                MAX_REVIEWS = 300
-                while len(collected_reviews) < MAX_REVIEWS:
-                    review_elements = self.driver.find_elements(
-                        By.XPATH,
-                        "//li[contains(@class,'place_apply_pui') and contains(@class,'EjjAW')]"
-                    )
-                    new_reviews = []
-                    for rev in review_elements:
-                        try:
-                            date_elem = rev.find_element(By.XPATH, ".//time[@aria-hidden='true']")
-                            review_date = date_elem.text.strip()
-                        except NoSuchElementException:
-                            review_date = ""
-
-                        try:
-                            text_anchor = rev.find_element(
-                                By.XPATH,
-                                ".//div[contains(@class,'pui__vn15t2')]//a[@data-pui-click-code='rvshowmore']"
-                            )
-                            review_text = text_anchor.text.strip()
-                        except NoSuchElementException:
-                            review_text = ""
-
-                        if review_text:
-                            new_reviews.append({
-                                "date": review_date,
-                                "text": review_text
-                            })
-
-                    collected_reviews.extend(new_reviews)
-                    print(f"[INFO] 현재까지 수집된 리뷰: {len(collected_reviews)}개")
-                    logging.info(f"[진행상황] 현재까지 수집된 리뷰: {len(collected_reviews)}개")
-
-                    # "더보기" 버튼 클릭하여 추가 리뷰 로딩
+                    match = re.search(r'\d+', count_text)
+                    count_val = int(match.group()) if match else 0
+
+                    good_points.append([label_text, count_val])
+                print(f"[INFO] '이런점이 좋았어요' 수집 완료: {good_points}")
+                logging.info(f"'이런점이 좋았어요' 수집 완료: {good_points}")
+            except NoSuchElementException:
+                print("[WARNING] '이런점이 좋았어요' 항목을 찾지 못했습니다.")
+                logging.warning("'이런점이 좋았어요' 항목을 찾지 못했습니다.")
+            except Exception as e:
+                print(f"[WARNING] '이런점이 좋았어요' 수집 중 오류: {e}")
+                logging.warning(f"'이런점이 좋았어요' 수집 중 오류: {e}")
+
+        with self.profiler.span("review_sort"):
+            # 총 리뷰 수 수집
+            try:
+                count_elem = self.driver.find_element(By.XPATH, "//em[@class='place_section_count']")
+                count_text = count_elem.text.strip()
+                total_reviews = int(count_text)
+                print(f"[INFO] 총 리뷰 수: {total_reviews}")
+                logging.info(f"총 리뷰 수: {total_reviews}")
+            except NoSuchElementException:
+                print("[WARNING] 총 리뷰 수를 찾을 수 없습니다.")
+                logging.warning("총 리뷰 수를 찾을 수 없습니다.")
+            except ValueError:
+                print(f"[WARNING] 리뷰 수 텍스트를 숫자로 변환할 수 없음: {count_text}")
+                logging.warning(f"리뷰 수 텍스트를 숫자로 변환할 수 없음: {count_text}")
+
+            # 최신순 정렬 클릭
+            try:
+                latest_sort = self.driver.find_element(By.XPATH, "//a[contains(., '최신순')]")
+                latest_sort.click()
+                print("[INFO] 최신순 클릭 완료")
+                logging.info("최신순 클릭 완료")
+                random_sleep(2, 4)
+            except Exception:
+                print("[WARNING] 최신순 클릭 불가")
+                logging.warning("최신순 클릭 불가")
+
+        with self.profiler.span("reviews") as span:
+            # 리뷰 최대 300개 수집
+            span["pages"] = 0
+            read_elements = 0
+            while len(collected_reviews) < MAX_REVIEWS:
+                span["pages"] += 1
+                review_elements = self.driver.find_elements(
+                    By.XPATH,
+                    "//li[contains(@class,'place_apply_pui') and contains(@class,'EjjAW')]"
+                )
+                # 더보기는 목록 뒤에 리뷰를 덧붙이므로 이전 반복에서 읽은 리뷰는 건너뜀
+                # (같은 날 같은 텍스트의 리뷰는 리뷰 저장소에서 순번으로 구분되므로 한 번씩만 수집해야 함)
+                new_elements = review_elements[read_elements:]
+                read_elements = len(review_elements)
+                new_reviews = []
+                for rev in new_elements:
+                    try:
+                        date_elem = rev.find_element(By.XPATH, ".//time[@aria-hidden='true']")
+                        review_date = date_elem.text.strip()
+                    except NoSuchElementException:
+                        review_date = ""
+
                     try:
-                        more_button = self.driver.find_element(
+                        text_anchor = rev.find_element(
                             By.XPATH,
-                            "//a[contains(@class,'fvwqf') and contains(., '더보기')]"
+                            ".//div[contains(@class,'pui__vn15t2')]//a[@data-pui-click-code='rvshowmore']"
                         )
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", more_button)
-                        more_button.click()
-                        print("[INFO] '더보기' 버튼 클릭 완료!")
-                        logging.info("'더보기' 버튼 클릭 완료!")
-                        random_sleep(2, 4)
+                        review_text = text_anchor.text.strip()
                     except NoSuchElementException:
-                        print("[WARNING] 더보기 버튼을 더 이상 찾을 수 없으므로 반복 종료")
-                        logging.warning("더보기 버튼을 더 이상 찾을 수 없으므로 반복 종료")
-                        break
-
-                print(f"[INFO] 최종 수집된 리뷰: 총 {len(collected_reviews)}개")
-                logging.info(f"최종 수집된 리뷰: 총 {len(collected_reviews)}개")
-
-                # DataFrame에 수집된 데이터 저장
-                self.df.at[index, "전화번호"] = phone
-                self.df.at[index, "운영시간"] = operation_data
-                self.df.at[index, "총 리뷰 개수"] = total_reviews
-                self.df.at[index, "소개"] = intro
-                self.df.at[index, "편의시설 및 서비스"] = services
-                self.df.at[index, "주차 정보"] = parking
-                self.df.at[index, "좌석 정보"] = seating_types
-                self.df.at[index, "이런점이 좋았어요"] = str(good_points)
-                self.df.at[index, "최신 300개 리뷰"] = str(collected_reviews[:300])
-
-                print(f"[INFO] '{business_name}' 데이터프레임 저장 완료")
-                logging.info(f"'{business_name}' 데이터프레임 저장 완료")
-
-                # 식당 처리 완료 표시
-                self.df.at[index, "Processed"] = "Yes"
-                
-                # 현재 식당 처리가 끝난 후 기본 컨텐츠로 전환
-                self.driver.switch_to.default_content()
-
-                # 진행 상황 저장 
-                temp_output = "restaurant_temp.csv"
-                self.df.to_csv(temp_output, index=False, encoding="utf-8-sig")  
-                print(f"[INFO] 현재 진행 상황 저장됨 - {self.total_rows}개 중 {index+1}개 업데이트")
-                print(f"[INFO] 현재 csv 상 위치: ")
+                        review_text = ""
 
-            except Exception as e:
-                print(f"[ERROR] '{business_name}' 크롤링 중 오류 발생: {e}")
-                logging.error(f"'{business_name}' 크롤링 중 오류 발생: {e}")
+                    if review_text:
+                        new_reviews.append({
+                            "date": review_date,
+                            "text": review_text
+                        })
 
-        # 모든 식당 처리 후 드라이버 종료 및 CSV 저장
-        self.driver.quit()
-        output_filename = "naver_data.csv"
-        self.df.to_csv(output_filename, index=False, encoding="utf-8-sig")
-        print(f"[INFO] 크롤링 완료! CSV 파일로 저장됨: {output_filename}")
-        logging.info(f"크롤링 완료! CSV 파일로 저장됨: {output_filename}")
+                collected_reviews.extend(new_reviews)
+                print(f"[INFO] 현재까지 수집된 리뷰: {len(collected_reviews)}개")
+                logging.info(f"[진행상황] 현재까지 수집된 리뷰: {len(collected_reviews)}개")
 
-        # if os.path.exists("restaurant_temp.csv"):
-        #     os.remove("restaurant_temp.csv")
-        #     print(f"임시 파일 'restaurant_temp.csv' 삭제 완료.")
+                # "더보기" 버튼 클릭하여 추가 리뷰 로딩
+                try:
+                    more_button = self.driver.find_element(
+                        By.XPATH,
+                        "//a[contains(@class,'fvwqf') and contains(., '더보기')]"
+                    )
+                    self.driver.execute_script("arguments[0].scrollIntoView(true);", more_button)
+                    more_button.click()
+                    print("[INFO] '더보기' 버튼 클릭 완료!")
+                    logging.info("'더보기' 버튼 클릭 완료!")
+                    random_sleep(2, 4)
+                except NoSuchElementException:
+                    print("[WARNING] 더보기 버튼을 더 이상 찾을 수 없으므로 반복 종료")
+                    logging.warning("더보기 버튼을 더 이상 찾을 수 없으므로 반복 종료")
+                    break
+
+            span["reviews"] = len(collected_reviews)
+            print(f"[INFO] 최종 수집된 리뷰: 총 {len(collected_reviews)}개")
+            logging.info(f"최종 수집된 리뷰: 총 {len(collected_reviews)}개")
+
+        # 현재 식당 처리가 끝난 후 기본 컨텐츠로 전환
+        self.driver.switch_to.default_content()
+
+        return {
+            "전화번호": phone,
+            "운영시간": operation_data,
+            "총 리뷰 개수": total_reviews,
+            "소개": intro,
+            "편의시설 및 서비스": services,
+            "주차 정보": parking,
+            "좌석 정보": seating_types,
+            "이런점이 좋았어요": str(good_points),
+            "reviews": collected_reviews[:MAX_REVIEWS],
+        }
 
 def main() -> None:
     """
@@ -462,7 +576,19 @@ def main() -> None:
       - Selenium WebDriver 및 크롬 옵션 설정
       - NaverMapScraper 인스턴스를 생성하여 크롤링 작업 실행
     """
-    input_csv = "restaurant_df.csv"
+    parser = ArgumentParser(description="Crawl restaurant details and reviews from Naver Map.")
+    parser.add_argument("--input", default="restaurant_df.csv", help="Restaurant CSV from eda_restaurant.py.")
+    parser.add_argument("--base-url", default=NAVER_MAP_URL,
+                        help="Map page to search from. Example: http://127.0.0.1:8920/ (benchmarks/mock_naver_map.py)")
+    parser.add_argument("--profile", default=None,
+                        help="Append per-restaurant/per-step span timings as JSONL. Example: crawl_profile.jsonl")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window instead of running headless.")
+    parser.add_argument("--no-block", action="store_true", help="Load images, fonts, media and map tiles.")
+    parser.add_argument("--recycle-pages", type=int, default=CRAWL_RECYCLE_PAGES,
+                        help="Restart the browser after this many restaurants (0 = never).")
+    args = parser.parse_args()
+
+    input_csv = args.input
     temp_csv = "restaurant_temp.csv"
 
     if os.path.exists(temp_csv):
@@ -483,25 +609,13 @@ def main() -> None:
             logging.error(f"CSV 파일 읽기 오류: {e}")
             return
 
-    # 크롬 옵션 설정
-    chrome_options = Options()
-    # headless 모드 사용 시 아래 주석 해제
-    # chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--log-level=3")
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/91.0.4472.124 Safari/537.36"
-    )
-
-    # Selenium WebDriver 초기화
-    driver = webdriver.Chrome(options=chrome_options)
+    # 브라우저 세션 (headless, 리소스 차단, 탭 재사용, 주기적 드라이버 교체)
+    session = BrowserSession(headless=not args.headed, block_resources=not args.no_block,
+                             recycle_pages=args.recycle_pages)
 
     # 크롤러 인스턴스 생성 및 실행
-    scraper = NaverMapScraper(driver, df)
+    scraper = NaverMapScraper(session, df, ReviewStore("reviews.db"), base_url=args.base_url,
+                              profiler=CrawlProfiler(args.profile))
     scraper.collect_reviews()
 
 if __name__ == "__main__":
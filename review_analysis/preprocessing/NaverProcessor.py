@@ -1,25 +1,35 @@
 import pandas as pd
+import ast
 import os
-import json
-import re
-from datetime import datetime
-from scipy.stats import zscore
 from review_analysis.preprocessing.base_processor import BaseDataProcessor
-from bs4 import BeautifulSoup
-from soynlp.normalizer import repeat_normalize # pip install soynlp
+from review_analysis.preprocessing.entity_resolution import PROCESSED_COLUMNS, assign_restaurant_ids
+from review_analysis.preprocessing.review_stats import build_restaurant_stats
+from review_analysis.preprocessing.text_normalizer import TextNormalizer, clean_store_reviews
+from review_analysis.review_store import ReviewStore, parse_review_blob
+from review_analysis.search.bm25 import build_index
 
 class NaverProcessor(BaseDataProcessor):
-    def __init__(self, input_path: str, output_path: str):
+    def __init__(self, input_path: str, output_path: str, review_store_path: str = None,
+                 stopwords_path: str = None, workers: int = None, restaurant_ids=None, recompute: bool = False):
         super().__init__(input_path, output_path)
         self.df = pd.read_csv(input_path, na_values=["N/A"])
-        self.STOPWORDS = {}
+        # 일부 식당만 다시 전처리하는 경우 (refresh.py에서 변경된 식당만 전달)
+        if restaurant_ids is not None and 'restaurant_id' in self.df.columns:
+            self.df = self.df[self.df['restaurant_id'].isin(set(restaurant_ids))]
+        # 반복 문자 정규화 + 불용어(기본 + stopwords_path) + 형태소/공백 토큰화
+        self.normalizer = TextNormalizer(stopwords_path=stopwords_path)
+        self.STOPWORDS = self.normalizer.stopwords
+        self.workers = workers  # 리뷰 토큰화 프로세스 수 (None이면 CPU 수)
+        self.recompute = recompute  # True면 토큰 캐시 없이 모든 리뷰를 다시 정제
+        # 리뷰는 CSV 셀이 아닌 리뷰 저장소(SQLite)에서 리뷰 단위로 읽고 정제 결과도 같은 곳에 저장
+        self.review_store_path = review_store_path or os.path.join(output_path, "reviews.db")
 
     def preprocess(self):
         """
         1. 결측값 제거
         2. 이상치 제거
         3. 날짜 변환 및 정리
-        4. 리뷰 텍스트 전처리
+        4. 리뷰 텍스트 전처리 (리뷰 저장소)
         """
         # 컬럼명 변경
         self.df.rename(columns={
@@ -35,12 +45,21 @@ class NaverProcessor(BaseDataProcessor):
             '주차 정보': 'parking',
             '좌석 정보': 'seat_info',
             '최신 300개 리뷰': 'latest_reviews',
+            '수집 리뷰 수': 'collected_reviews',
             '소재지면적': 'size',
             '이런점이 좋았어요': 'very_good',
             '좌표정보(X)': 'latitude',
             '좌표정보(Y)': 'longitude'
         }, inplace=True)
 
+        # 식당 id가 없는 이전 크롤링 결과는 이름/주소로 id 부여
+        if 'restaurant_id' not in self.df.columns:
+            self.df = assign_restaurant_ids(self.df, PROCESSED_COLUMNS)
+
+        # 이전 크롤링 결과의 '최신 300개 리뷰' 문자열은 리뷰 저장소로 옮긴 뒤 컬럼 삭제
+        if 'latest_reviews' in self.df.columns:
+            self.migrate_review_blobs()
+
         # 결측값 제거
         self.df_cleaned = self.df.dropna()
 
@@ -62,8 +81,8 @@ class NaverProcessor(BaseDataProcessor):
         # 운영시간 JSON 파싱 및 정리
         self.df_cleaned['business_hours'] = self.df_cleaned['business_hours'].apply(self.parse_operating_hours)
 
-        # 최신 300개 리뷰 텍스트 정리 (JSON 형식 → 리스트 변환 후 텍스트 정리)
-        self.df_cleaned['latest_reviews'] = self.df_cleaned['latest_reviews'].apply(self.clean_review_texts)
+        # 리뷰 저장소에서 현재 정규화 설정으로 정제되지 않은 리뷰만 스트리밍으로 정리 (토큰화 결과는 텍스트 해시로 캐시)
+        self.clean_stored_reviews(self.recompute)
 
         # 주차 정보 전처리
         self.df_cleaned['parking'] = self.df_cleaned['parking'].astype(str).apply(self.classify_parking)
@@ -92,6 +111,9 @@ class NaverProcessor(BaseDataProcessor):
         if 'tfidf_features' in self.df_cleaned.columns:
             self.df_cleaned.drop(columns=['tfidf_features'], inplace=True, errors='ignore')
 
+        # 식당별 리뷰 집계 (월별 리뷰 수, '이런점이 좋았어요' 라벨별 개수, 상위 단어)
+        self.df_stats = build_restaurant_stats(self.df_cleaned, self.review_store_path, self.STOPWORDS)
+
     def save_to_database(self):
         """
         처리된 데이터를 CSV로 저장
@@ -104,6 +126,19 @@ class NaverProcessor(BaseDataProcessor):
         else:
             print("No data to save.")
 
+        # 식당별 리뷰 집계 (loader.py로 restaurant_stats 테이블에 적재)
+        if isinstance(getattr(self, 'df_stats', None), pd.DataFrame):
+            stats_path = os.path.join(self.output_dir, "restaurant_stats.csv")
+            self.df_stats.to_csv(stats_path, index=False, encoding='utf-8-sig')
+            print(f"Saved review stats to: {stats_path}")
+
+        # 정제된 리뷰로 BM25 검색 색인 생성 (API 서버의 /search_reviews/에서 사용)
+        # 전처리에서 제외된 식당의 리뷰는 색인하지 않음 (검색 결과 상위권을 DB에 없는 식당이 차지하지 않도록)
+        index_dir = os.path.join(self.output_dir, "review_index")
+        restaurant_ids = set(self.df_cleaned['restaurant_id'].astype(str)) if isinstance(self.df_cleaned, pd.DataFrame) else set()
+        n_docs = build_index(self.review_store_path, index_dir, self.normalizer, restaurant_ids=restaurant_ids)
+        print(f"Saved review index ({n_docs} restaurants) to: {index_dir}")
+
     ### 보조 함수 (JSON 처리 및 텍스트 전처리)
     def parse_operating_hours(self, raw_hours):
         """
@@ -116,32 +151,42 @@ class NaverProcessor(BaseDataProcessor):
         except:
             return None
 
-    def clean_review_texts(self, raw_text):
+    def migrate_review_blobs(self):
+        """
+        이전 형식의 '최신 300개 리뷰' 문자열을 리뷰 저장소로 옮기고 latest_reviews 컬럼을 삭제
+        """
+        with ReviewStore(self.review_store_path) as store:
+            for restaurant_id, raw_blob in zip(self.df['restaurant_id'], self.df['latest_reviews']):
+                reviews = parse_review_blob(raw_blob)
+                if reviews:
+                    store.add_reviews(restaurant_id, reviews)
+            counts = {rid: store.count_reviews(rid) for rid in self.df['restaurant_id'].unique()}
+        self.df['collected_reviews'] = self.df['restaurant_id'].map(counts)
+        self.df.drop(columns=['latest_reviews'], inplace=True)
+
+    def clean_stored_reviews(self, recompute: bool = False):
         """
-        최신 300개 리뷰 데이터를 정리 (JSON 문자열 → 텍스트)
+        리뷰 저장소의 리뷰를 정제하여 cleaned_text에 저장 (text_normalizer.clean_store_reviews)
+        - 불용어/토크나이저가 바뀌면 다른 설정으로 정제된 리뷰는 자동으로 다시 정제
+        - recompute=True면 설정과 관계없이 토큰 캐시 없이 전체 리뷰를 다시 정제
         """
-        stopwords = {}
+        tokenized = clean_store_reviews(self.review_store_path, self.normalizer, self.workers, recompute)
+        print(f"리뷰 토큰화 완료: 새로 처리한 리뷰 {tokenized}개")
 
+    def clean_review_text(self, text):
+        """
+        리뷰 한 개의 텍스트 정리 (정규화 → 토큰화 → 불용어 제거 후 공백으로 연결)
+        """
+        return self.normalizer.clean(text)
+
+    def clean_review_texts(self, raw_text):
+        """
+        이전 형식의 최신 300개 리뷰 문자열을 정리 (문자열 → 정제된 텍스트 리스트)
+        """
         try:
-            reviews = eval(raw_text)  # JSON 문자열을 파이썬 객체로 변환
-            cleaned_reviews = []
-
-            for review in reviews:
-                # 1. 텍스트 추출
-                text = review['text']
-                # 2. 한글(가-힣)과 공백만 남기고 모두 제거
-                text = re.sub(r'[^가-힣\s]', '', text)
-                # 3. 토큰(단어) 분리
-                tokens = text.split()
-                # 4. 불용어 제거
-                tokens = [token for token in tokens if token not in stopwords]
-                # 5. 정제 후 한 문장으로 합치거나(token 단위 유지도 가능) 리스트에 저장
-                cleaned_text = " ".join(tokens)
-                cleaned_reviews.append(cleaned_text)
-
-            return cleaned_reviews
-        
-        except:
+            reviews = ast.literal_eval(raw_text)
+            return [self.clean_review_text(review['text']) for review in reviews]
+        except (ValueError, SyntaxError, TypeError, KeyError):
             return None
         
     def classify_parking(self, info):
@@ -0,0 +1,299 @@
+"""
+식당 공공데이터(restaurant.csv)와 네이버 크롤링/메뉴 데이터 사이의 중복 제거 및 개체 매칭 모듈입니다.
+
+식당명은 괄호·공백·특수문자와 지점명("합정점" 등)을 제거해 정규화하고,
+도로명주소/지번주소에서 "도로명 건물번호", "동 번지" 토큰을 뽑아 비교하며,
+좌표정보(X, Y; 미터 단위 TM 좌표)가 있으면 거리도 함께 사용합니다.
+
+모든 쌍을 비교하지 않도록 주소 토큰과 좌표 격자(GRID_SIZE m)를 블로킹 키로 사용하여
+같은 블록 안의 후보끼리만 비교하므로 데이터 크기에 거의 선형으로 동작합니다.
+
+매칭된 레코드 묶음에는 대표 레코드(정규화된 식당명 + 주소 토큰)로부터 만든
+안정적인 restaurant_id를 부여하며, 이후 크롤링·전처리·DB 적재가 모두 이 id를 사용합니다.
+"""
+
+import hashlib
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# 컬럼 매핑: 공공데이터(eda_restaurant.py 출력)와 전처리 결과(NaverProcessor 출력)
+REGISTRY_COLUMNS: Dict[str, str] = {
+    "name": "사업장명", "road_address": "도로명주소", "jibun_address": "지번주소",
+    "x": "좌표정보(X)", "y": "좌표정보(Y)",
+}
+PROCESSED_COLUMNS: Dict[str, str] = {
+    "name": "name", "road_address": "road_address", "jibun_address": "jibun_address",
+    "x": "latitude", "y": "longitude",  # NaverProcessor는 좌표정보(X)/(Y)를 latitude/longitude로 저장
+}
+
+GRID_SIZE = 50.0  # 좌표 블로킹 격자 크기 (m)
+MATCH_DISTANCE = 50.0  # 같은 식당으로 볼 최대 거리 (m)
+MAX_BLOCK_SIZE = 200  # 이보다 큰 이름 블록은 비교하지 않음 (흔한 이름 접두어로 인한 폭증 방지)
+
+BRACKETS = re.compile(r"\(.*?\)|\[.*?\]")
+NON_ALNUM = re.compile(r"[^0-9a-z가-힣]")
+BRANCH_SUFFIX = re.compile(r"\s+\S*[^반\s]점$")  # "스타벅스 서교점" (단, "홍콩반점" 같은 상호는 제외)
+ROAD_TOKEN = re.compile(r"([0-9A-Za-z가-힣]+(?:로|길))\s*(\d+(?:-\d+)?)")
+JIBUN_TOKEN = re.compile(r"([0-9가-힣]+(?:동|가|리))\s+(산?\d+(?:-\d+)?)")
+
+
+def normalize_name(name: str) -> str:
+    """식당명 정규화: 괄호 내용, 공백, 특수문자 제거 및 소문자 변환"""
+    if not isinstance(name, str):
+        return ""
+    name = BRACKETS.sub("", unicodedata.normalize("NFKC", name)).lower()
+    return NON_ALNUM.sub("", name)
+
+
+def core_name(name: str) -> str:
+    """지점명을 제거한 식당명 ("스타벅스 서교점" -> "스타벅스")"""
+    if not isinstance(name, str):
+        return ""
+    name = BRACKETS.sub("", unicodedata.normalize("NFKC", name)).strip()
+    core = normalize_name(BRANCH_SUFFIX.sub("", name))
+    return core if len(core) >= 2 else normalize_name(name)
+
+
+def road_key(address: str) -> Optional[str]:
+    """도로명주소에서 "도로명 건물번호" 토큰 추출 ("... 양화로6길 57-12, 1층" -> "양화로6길 57-12")"""
+    if not isinstance(address, str):
+        return None
+    match = ROAD_TOKEN.search(address)
+    return f"{match.group(1)} {match.group(2)}" if match else None
+
+
+def jibun_key(address: str) -> Optional[str]:
+    """지번주소에서 "동 번지" 토큰 추출 ("... 서교동 378-10 H 스퀘어" -> "서교동 378-10")"""
+    if not isinstance(address, str):
+        return None
+    match = JIBUN_TOKEN.search(address)
+    return f"{match.group(1)} {match.group(2)}" if match else None
+
+
+def name_similarity(a: str, b: str) -> float:
+    """
+    정규화된 두 식당명의 유사도 (0~1)
+    - 짧은 쪽이 긴 쪽의 절반 이상이면서 포함되면 0.9 ("소울버튼" / "소울버튼블루")
+    - 그 외에는 글자 bigram Dice 계수
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    short, long = sorted((a, b), key=len)
+    if len(short) >= 3 and 2 * len(short) >= len(long) and short in long:
+        return 0.9
+    bigrams_a = {a[i:i + 2] for i in range(len(a) - 1)} or {a}
+    bigrams_b = {b[i:i + 2] for i in range(len(b) - 1)} or {b}
+    return 2 * len(bigrams_a & bigrams_b) / (len(bigrams_a) + len(bigrams_b))
+
+
+def best_name_match(name: str, candidates: Sequence[str], threshold: float = 0.6) -> Optional[int]:
+    """
+    candidates 중 name과 가장 비슷한 항목의 인덱스를 반환 (threshold 미만이면 None).
+    크롤러에서 검색 결과 목록 중 대상 식당을 고를 때 사용합니다.
+    """
+    target, target_core = normalize_name(name), core_name(name)
+    best_index, best_score = None, threshold
+    for i, candidate in enumerate(candidates):
+        score = max(name_similarity(target, normalize_name(candidate)),
+                    name_similarity(target_core, core_name(candidate)))
+        if score >= best_score:
+            best_index, best_score = i, score
+            if score == 1.0:
+                break
+    return best_index
+
+
+def to_float(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def prepare_records(df: pd.DataFrame, columns: Dict[str, str]) -> List[dict]:
+    """DataFrame 각 행에서 매칭에 필요한 정규화 필드만 추출 (없는 컬럼은 None 처리)"""
+    def column(key):
+        name = columns.get(key)
+        return df[name].tolist() if name in df.columns else [None] * len(df)
+
+    records = []
+    for name, road, jibun, x, y in zip(column("name"), column("road_address"), column("jibun_address"),
+                                       column("x"), column("y")):
+        records.append({
+            "name": normalize_name(name),
+            "core": core_name(name),
+            "road": road_key(road),
+            "jibun": jibun_key(jibun),
+            "x": to_float(x),
+            "y": to_float(y),
+        })
+    return records
+
+
+def has_location(record: dict) -> bool:
+    return bool(record["road"] or record["jibun"] or record["x"] is not None)
+
+
+def blocking_keys(record: dict) -> List[Tuple]:
+    """레코드가 색인될 블록 키 목록"""
+    keys = []
+    if record["road"]:
+        keys.append(("road", record["road"]))
+    if record["jibun"]:
+        keys.append(("jibun", record["jibun"]))
+    if record["x"] is not None and record["y"] is not None:
+        keys.append(("grid", int(record["x"] // GRID_SIZE), int(record["y"] // GRID_SIZE)))
+    if record["core"]:
+        keys.append(("name", record["core"][:2]))
+    return keys
+
+
+def query_keys(record: dict) -> List[Tuple]:
+    """레코드의 후보를 찾을 때 조회할 블록 키 목록 (좌표는 주변 3x3 격자, 이름 블록은 위치 정보가 없을 때만)"""
+    keys = []
+    if record["road"]:
+        keys.append(("road", record["road"]))
+    if record["jibun"]:
+        keys.append(("jibun", record["jibun"]))
+    if record["x"] is not None and record["y"] is not None:
+        gx, gy = int(record["x"] // GRID_SIZE), int(record["y"] // GRID_SIZE)
+        keys.extend(("grid", gx + dx, gy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+    if not has_location(record) and record["core"]:
+        keys.append(("name", record["core"][:2]))
+    return keys
+
+
+def build_index(records: List[dict]) -> Dict[Tuple, List[int]]:
+    index = defaultdict(list)
+    for i, record in enumerate(records):
+        for key in blocking_keys(record):
+            index[key].append(i)
+    return index
+
+
+def candidates(record: dict, index: Dict[Tuple, List[int]]) -> Iterable[int]:
+    seen = set()
+    for key in query_keys(record):
+        block = index.get(key, ())
+        if key[0] == "name" and len(block) > MAX_BLOCK_SIZE:
+            continue
+        for j in block:
+            if j not in seen:
+                seen.add(j)
+                yield j
+
+
+def match_score(a: dict, b: dict) -> float:
+    """
+    두 레코드가 같은 식당이면 점수(> 0), 아니면 0을 반환.
+    - 식당명이 매우 비슷하고(>= 0.85) 주소 토큰이 같거나 거리가 MATCH_DISTANCE 이내
+    - 식당명이 어느 정도 비슷하고(>= 0.6) 주소 토큰이 같으며 거리가 가깝거나 좌표가 없음
+    - 양쪽 모두 위치 정보가 없으면 식당명이 거의 같을 때(>= 0.95)만 매칭
+    같은 건물의 체인 지점("파스타집이야 마포점", "덮밥집이야 마포점")이 묶이지 않도록 지점명을 제외한 이름으로 비교합니다.
+    """
+    similarity = name_similarity(a["core"], b["core"])
+    if similarity < 0.6:
+        return 0.0
+
+    same_address = bool((a["road"] and a["road"] == b["road"]) or (a["jibun"] and a["jibun"] == b["jibun"]))
+    distance = None
+    if None not in (a["x"], a["y"], b["x"], b["y"]):
+        distance = math.hypot(a["x"] - b["x"], a["y"] - b["y"])
+    near = distance is not None and distance <= MATCH_DISTANCE
+
+    if similarity >= 0.85 and (same_address or near):
+        return similarity + 0.5 * same_address + 0.5 * near
+    if same_address and (distance is None or near):
+        return similarity + 0.5 + 0.5 * near
+    if not has_location(a) or not has_location(b):
+        return similarity if similarity >= 0.95 else 0.0
+    return 0.0
+
+
+def stable_id(record: dict) -> str:
+    """정규화된 식당명과 주소 토큰으로 만든 restaurant_id (입력 순서와 무관하게 항상 같은 값)"""
+    key = f"{record['core']}|{record['jibun'] or record['road'] or ''}"
+    return "r" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:15]
+
+
+def assign_restaurant_ids(df: pd.DataFrame, columns: Dict[str, str] = REGISTRY_COLUMNS,
+                          id_column: str = "restaurant_id") -> pd.DataFrame:
+    """
+    DataFrame 안의 중복 식당을 찾아 묶고, 같은 식당에는 같은 restaurant_id를 부여한 복사본을 반환합니다.
+    (중복 행 제거는 호출하는 쪽에서 drop_duplicates(id_column)로 처리)
+    """
+    records = prepare_records(df, columns)
+    index = build_index(records)
+
+    # union-find로 매칭된 레코드 묶기
+    parent = list(range(len(records)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, record in enumerate(records):
+        for j in candidates(record, index):
+            if j > i and match_score(record, records[j]) > 0:
+                parent[find(j)] = find(i)
+
+    # 묶음마다 대표 레코드(가장 작은 id 후보)의 id를 사용
+    cluster_ids = {}
+    for i, record in enumerate(records):
+        root = find(i)
+        candidate_id = stable_id(record)
+        if root not in cluster_ids or candidate_id < cluster_ids[root]:
+            cluster_ids[root] = candidate_id
+
+    result = df.copy()
+    result[id_column] = [cluster_ids[find(i)] for i in range(len(records))]
+    return result
+
+
+def link_records(left: pd.DataFrame, right: pd.DataFrame,
+                 left_columns: Dict[str, str], right_columns: Dict[str, str]) -> pd.DataFrame:
+    """
+    left의 각 행에 대해 right에서 같은 식당으로 판단되는 가장 점수가 높은 행을 찾습니다.
+
+    Returns:
+        left_index, right_index, score 컬럼의 DataFrame (매칭된 행만 포함).
+    """
+    left_records = prepare_records(left, left_columns)
+    right_records = prepare_records(right, right_columns)
+    index = build_index(right_records)
+
+    matches = []
+    for i, record in enumerate(left_records):
+        best_j, best_score = None, 0.0
+        for j in candidates(record, index):
+            score = match_score(record, right_records[j])
+            if score > best_score:
+                best_j, best_score = j, score
+        if best_j is not None:
+            matches.append((left.index[i], right.index[best_j], best_score))
+    return pd.DataFrame(matches, columns=["left_index", "right_index", "score"])
+
+
+def attach_restaurant_ids(df: pd.DataFrame, reference: pd.DataFrame,
+                          columns: Dict[str, str], reference_columns: Dict[str, str],
+                          id_column: str = "restaurant_id") -> pd.DataFrame:
+    """
+    restaurant_id가 없는 데이터(예: menu_updated.csv)에 reference의 restaurant_id를 붙인 복사본을 반환합니다.
+    매칭되지 않은 행의 id는 NaN으로 남습니다.
+    """
+    links = link_records(df, reference, columns, reference_columns)
+    result = df.copy()
+    result[id_column] = pd.Series(
+        reference.loc[links["right_index"], id_column].to_numpy(), index=links["left_index"]
+    ).reindex(df.index)
+    return result
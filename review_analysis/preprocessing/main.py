@@ -8,7 +8,6 @@ from review_analysis.preprocessing.base_processor import BaseDataProcessor
 from review_analysis.preprocessing.NaverProcessor import NaverProcessor 
 # from preprocessing.GoogleProcessor import GoogleProcessor  # 나중에 더 추가
 
-print("main.py 실행")
 # 1. 지원하는 리뷰 사이트별 전처리 클래스 매핑
 PREPROCESS_CLASSES: Dict[str, Type[BaseDataProcessor]] = {
     "reviews_naver": NaverProcessor,  # 네이버 리뷰 추가 가능
@@ -16,8 +15,9 @@ PREPROCESS_CLASSES: Dict[str, Type[BaseDataProcessor]] = {
     # 추가적인 사이트가 있으면 여기에 key-value 형식으로 추가
 }
 
-# 2. 리뷰 데이터 파일 자동 탐색
-REVIEW_COLLECTIONS = glob.glob(os.path.join("..", "..", "database", "reviews_*.csv"))
+# 2. 리뷰 데이터 파일 자동 탐색 (-a 옵션일 때만 실행)
+def find_review_collections():
+    return glob.glob(os.path.join("..", "..", "database", "reviews_*.csv"))
 
 # 3. Argument Parser 생성
 def create_parser() -> ArgumentParser:
@@ -37,20 +37,36 @@ def create_parser() -> ArgumentParser:
         '-a', '--all', action='store_true',
         help="Run all data preprocessors. Default is False."
     )
+
+    parser.add_argument(
+        '--stopwords', type=str, required=False, default=None,
+        help="Extra stopword file (one word per line) for review tokenization."
+    )
+
+    parser.add_argument(
+        '--workers', type=int, required=False, default=None,
+        help="Processes used for review tokenization. Default is the CPU count (0 = no process pool)."
+    )
+
+    parser.add_argument(
+        '--recompute', action='store_true',
+        help="Re-tokenize every stored review, ignoring the token cache. Reviews cleaned with other settings are re-cleaned anyway."
+    )
     
     return parser
 
 # 4. 전처리 실행 함수
-def run_preprocessing(preprocessor_name: str, csv_file: str, output_dir: str):
+def run_preprocessing(preprocessor_name: str, csv_file: str, output_dir: str, **options):
     """
     주어진 CSV 파일을 해당 전처리 클래스로 처리하는 함수
+    (options: 전처리 클래스 생성자에 넘길 추가 설정, 예: stopwords_path, workers, recompute)
     """
     if preprocessor_name in PREPROCESS_CLASSES:
         print(f"Processing {csv_file} with {preprocessor_name}...")
 
         # 클래스 인스턴스 생성 및 실행
         preprocessor_class = PREPROCESS_CLASSES[preprocessor_name]
-        preprocessor = preprocessor_class(csv_file, output_dir)
+        preprocessor = preprocessor_class(csv_file, output_dir, **options)
         
         preprocessor.preprocess()
         preprocessor.feature_engineering()
@@ -62,28 +78,30 @@ def run_preprocessing(preprocessor_name: str, csv_file: str, output_dir: str):
 
 # 5. 메인 실행 로직
 if __name__ == "__main__":
-    print("parsing 실행")
+    print("main.py 실행")
     parser = create_parser()
     args = parser.parse_args()
 
     os.makedirs(args.output_dir, exist_ok=True)
+    options = {"stopwords_path": args.stopwords, "workers": args.workers, "recompute": args.recompute}
 
     # 특정 리뷰 사이트만 실행하는 경우
     if args.preprocessor:
         print(f"preprocessing {args.preprocessor} 실행")
         csv_file = os.path.join("..", "..", "database", f"{args.preprocessor}.csv")
         if os.path.exists(csv_file):
-            run_preprocessing(args.preprocessor, csv_file, args.output_dir)
+            run_preprocessing(args.preprocessor, csv_file, args.output_dir, **options)
         else:
             print(f"Error: {csv_file} not found. Please check the file name.")
             sys.exit(1)
 
     # 모든 리뷰 CSV 파일을 처리하는 경우
     elif args.all:
-        print(f"리뷰 데이터 처리 실행: {REVIEW_COLLECTIONS}")
-        for csv_file in REVIEW_COLLECTIONS:
+        review_collections = find_review_collections()
+        print(f"리뷰 데이터 처리 실행: {review_collections}")
+        for csv_file in review_collections:
             base_name = os.path.splitext(os.path.basename(csv_file))[0]
-            run_preprocessing(base_name, csv_file, args.output_dir)
+            run_preprocessing(base_name, csv_file, args.output_dir, **options)
 
     # 옵션을 지정하지 않은 경우
     else:
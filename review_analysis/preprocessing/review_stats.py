@@ -0,0 +1,127 @@
+"""
+식당별 리뷰 집계 모듈입니다.
+
+NaverProcessor 전처리 이후 한 번만 계산해 restaurant_stats.csv로 저장하고,
+backend/app/loader.py가 restaurant_stats 테이블(database/migrations/004_restaurant_stats.sql)에 적재합니다.
+API 서버는 원본 리뷰를 다시 읽지 않고 restaurant_id 인덱스 조회 한 번으로 집계값을 사용합니다.
+  - review_total / latest_review_date: 리뷰 저장소에 저장된 리뷰 수와 최근 리뷰 작성일
+  - reviews_by_month: 월별 리뷰 수 {"2025-02": 12, ...}
+  - very_good_counts: "이런점이 좋았어요" 라벨별 개수 (크롤링한 [라벨, 개수] 목록 전체)
+  - top_terms: 정제된 리뷰 텍스트에서 많이 나온 단어 [[단어, 횟수], ...]
+"""
+
+import ast
+import json
+from collections import Counter
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import pandas as pd
+
+from review_analysis.review_store import ReviewStore
+
+TOP_TERMS = 20
+MIN_TERM_LENGTH = 2  # 한 글자 단어("맛", "잘" 등)는 정보가 적어 제외
+
+STATS_COLUMNS = [
+    "restaurant_id", "review_total", "latest_review_date",
+    "reviews_by_month", "very_good_counts", "top_terms",
+]
+
+
+def very_good_counts(raw_value) -> Dict[str, int]:
+    """'[["음식이 맛있어요", 123], ...]' 문자열(또는 리스트)을 {라벨: 개수}로 변환 (실패 시 빈 딕셔너리)"""
+    if isinstance(raw_value, str):
+        try:
+            raw_value = ast.literal_eval(raw_value)
+        except (ValueError, SyntaxError):
+            return {}
+    if not isinstance(raw_value, (list, tuple)):
+        return {}
+
+    counts = {}
+    for item in raw_value:
+        if not isinstance(item, (list, tuple)) or len(item) < 2:
+            continue
+        label = str(item[0]).replace('"', "").strip()
+        try:
+            count = int(item[1])
+        except (TypeError, ValueError):
+            continue
+        if label:
+            counts[label] = counts.get(label, 0) + count
+    return counts
+
+
+def summarize_reviews(reviews: Iterable[dict], stopwords: Set[str] = frozenset(),
+                      top_n: int = TOP_TERMS) -> dict:
+    """한 식당의 리뷰 목록에서 리뷰 수, 최근 작성일, 월별 리뷰 수, 상위 단어를 계산"""
+    by_month = Counter()
+    terms = Counter()
+    total = 0
+    latest = None
+
+    for review in reviews:
+        total += 1
+        review_date = review.get("review_date")
+        if review_date:
+            by_month[review_date[:7]] += 1
+            latest = max(latest, review_date) if latest else review_date
+        text = review.get("cleaned_text") or review.get("text") or ""
+        terms.update(t for t in text.split() if len(t) >= MIN_TERM_LENGTH and t not in stopwords)
+
+    return {
+        "review_total": total,
+        "latest_review_date": latest,
+        "reviews_by_month": dict(sorted(by_month.items())),
+        "top_terms": [[term, count] for term, count in terms.most_common(top_n)],
+    }
+
+
+def iter_review_summaries(store: ReviewStore, stopwords: Set[str] = frozenset(),
+                          top_n: int = TOP_TERMS, restaurant_ids: Optional[Iterable[str]] = None) -> Iterator[tuple]:
+    """
+    리뷰 저장소 전체를 restaurant_id 순서로 한 번 스트리밍하며 (restaurant_id, 요약)을 반환.
+    한 번에 한 식당의 리뷰만 메모리에 올립니다.
+    restaurant_ids를 넘기면 전체를 읽지 않고 해당 식당만 인덱스로 조회합니다 (리뷰가 없는 식당은 건너뜀).
+    """
+    if restaurant_ids is not None:
+        for restaurant_id in sorted(set(restaurant_ids)):
+            reviews = list(store.iter_reviews(restaurant_id=restaurant_id))
+            if reviews:
+                yield restaurant_id, summarize_reviews(reviews, stopwords, top_n)
+        return
+    for restaurant_id, reviews in groupby(store.iter_reviews(), key=lambda r: r["restaurant_id"]):
+        yield restaurant_id, summarize_reviews(reviews, stopwords, top_n)
+
+
+def build_restaurant_stats(df: pd.DataFrame, store_path: str, stopwords: Optional[Set[str]] = None,
+                           top_n: int = TOP_TERMS, lookup: bool = False) -> pd.DataFrame:
+    """
+    전처리된 식당 DataFrame(restaurant_id, very_good 컬럼)과 리뷰 저장소로 식당별 집계 테이블을 생성.
+    딕셔너리/리스트 값은 JSON 문자열로 저장합니다 (restaurant_stats의 jsonb 컬럼).
+    lookup=True면 저장소 전체를 스트리밍하지 않고 df의 식당만 조회합니다 (일부 식당만 다시 계산할 때).
+    """
+    stopwords = set(stopwords or ())
+    restaurant_ids = set(df["restaurant_id"])
+
+    summaries = {}
+    with ReviewStore(store_path) as store:
+        for restaurant_id, summary in iter_review_summaries(store, stopwords, top_n,
+                                                            restaurant_ids if lookup else None):
+            if restaurant_id in restaurant_ids:
+                summaries[restaurant_id] = summary
+
+    empty = summarize_reviews([])
+    rows: List[dict] = []
+    for restaurant_id, raw_very_good in zip(df["restaurant_id"], df["very_good"]):
+        summary = summaries.get(restaurant_id, empty)
+        rows.append({
+            "restaurant_id": restaurant_id,
+            "review_total": summary["review_total"],
+            "latest_review_date": summary["latest_review_date"],
+            "reviews_by_month": json.dumps(summary["reviews_by_month"], ensure_ascii=False),
+            "very_good_counts": json.dumps(very_good_counts(raw_very_good), ensure_ascii=False),
+            "top_terms": json.dumps(summary["top_terms"], ensure_ascii=False),
+        })
+    return pd.DataFrame(rows, columns=STATS_COLUMNS).drop_duplicates("restaurant_id")
@@ -0,0 +1,225 @@
+"""
+리뷰 텍스트 정규화 및 토큰화 모듈입니다.
+
+  1. 유니코드 정규화(NFC) 및 반복 문자 정규화 ("ㅋㅋㅋㅋㅋ" -> "ㅋㅋ", "맛있어요오오오" -> "맛있어요오오")
+  2. 한글/영문/숫자 이외의 문자 제거, 영문 소문자 변환, 자모("ㅋㅋ", "ㅠㅠ")와 음절 사이 띄어쓰기
+  3. 토큰화: kiwipiepy가 설치되어 있으면 형태소 분석(내용어만, 원형 사용), 없으면 공백 분리 후 조사·어미 제거
+  4. 불용어 제거 (기본 불용어 + 파일/인자로 추가)
+
+토큰화 결과는 리뷰 텍스트 해시와 정규화 설정(fingerprint) 기준으로 리뷰 저장소(token_cache)에 저장되어
+같은 리뷰를 다시 토큰화하지 않으며, 많은 리뷰는 프로세스 풀로 나누어 처리합니다.
+리뷰마다 cleaned_text를 만든 설정(cleaned_fingerprint)을 함께 저장하므로, 불용어나 토크나이저를 바꾸면
+다음 정제 때 다른 설정으로 정제된 리뷰가 모두 다시 정제됩니다.
+검색(BM25)과 임베딩 단계는 리뷰 저장소의 cleaned_text(공백으로 연결된 토큰)를 그대로 사용합니다.
+"""
+
+import hashlib
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Set
+
+from review_analysis.review_store import ReviewStore
+
+DEFAULT_STOPWORDS: Set[str] = {
+    "진짜", "정말", "너무", "완전", "그냥", "약간", "조금", "좀", "많이", "매우", "아주",
+    "그리고", "근데", "그래서", "하지만", "또", "다시", "이번", "오늘", "여기", "거기", "저희", "제가",
+    "있다", "없다", "하다", "되다", "이다", "같다", "보다", "것", "수", "때", "곳", "거", "등",
+    "ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅜㅜ",
+}
+
+# 공백 분리 토큰화 시 떼어낼 조사와 명사 뒤 서술격 조사 어미 ("파스타에요", "맛집이에요")
+# (긴 것부터 검사, 토큰이 조사보다 2글자 이상 길 때만)
+JOSA: Sequence[str] = (
+    "이었어요", "이에요", "이예요", "이네요", "입니다", "였어요",
+    "에서는", "에서도", "으로는", "이라서", "에서", "으로", "에는", "에도", "까지", "부터", "보다", "처럼",
+    "에요", "예요", "이랑", "하고", "은", "는", "이", "가", "을", "를", "에", "도", "로", "와", "과", "의", "랑",
+)
+
+# kiwipiepy 사용 시 남길 품사 (일반/고유명사, 동사, 형용사, 어근, 외국어, 숫자)
+CONTENT_TAGS: Set[str] = {"NNG", "NNP", "VV", "VA", "XR", "SL", "SN"}
+
+# 정규화/토큰화 규칙이 바뀌면 올려서 fingerprint를 바꿈 (저장된 정제 결과와 토큰 캐시를 다시 계산)
+NORMALIZER_VERSION = 2
+
+NON_TEXT = re.compile(r"[^가-힣ㄱ-ㅎㅏ-ㅣa-z0-9\s]")
+JAMO_RUN = re.compile(r"[ㄱ-ㅎㅏ-ㅣ]+")  # "맛있어요ㅋㅋ" -> "맛있어요 ㅋㅋ"
+REPEAT = re.compile(r"(.+?)\1{2,}")
+
+
+def load_stopwords(path: Optional[str]) -> Set[str]:
+    """한 줄에 하나씩 적힌 불용어 파일 로딩 (# 주석, 빈 줄 무시)"""
+    if not path:
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip() and not line.startswith("#")}
+
+
+def regex_repeat_normalize(text: str, num_repeats: int = 2) -> str:
+    """soynlp가 없을 때 사용하는 반복 문자 정규화 (같은 패턴이 num_repeats번 넘게 반복되면 num_repeats번으로 줄임)"""
+    return REPEAT.sub(lambda m: m.group(1) * num_repeats, text)
+
+
+def strip_josa(token: str) -> str:
+    for josa in JOSA:
+        if token.endswith(josa) and len(token) >= len(josa) + 2:
+            return token[:-len(josa)]
+    return token
+
+
+class TextNormalizer:
+    """
+    리뷰 텍스트 정규화기.
+
+    Args:
+        stopwords: 추가 불용어 (DEFAULT_STOPWORDS에 합쳐짐).
+        stopwords_path: 추가 불용어 파일 경로.
+        num_repeats: 반복 문자 정규화 시 남길 반복 횟수.
+        tokenizer: "auto"(kiwipiepy가 있으면 형태소 분석), "kiwi", "whitespace".
+    """
+
+    def __init__(self, stopwords: Optional[Iterable[str]] = None, stopwords_path: Optional[str] = None,
+                 num_repeats: int = 2, tokenizer: str = "auto") -> None:
+        self.stopwords = DEFAULT_STOPWORDS | set(stopwords or ()) | load_stopwords(stopwords_path)
+        self.num_repeats = num_repeats
+        self.tokenizer = tokenizer
+        self._kiwi = None
+        self._repeat_normalize = None
+
+    def __getstate__(self):
+        # 프로세스 풀로 보낼 때 Kiwi 인스턴스는 제외하고 각 프로세스에서 다시 생성
+        state = self.__dict__.copy()
+        state["_kiwi"] = None
+        state["_repeat_normalize"] = None
+        return state
+
+    @property
+    def uses_kiwi(self) -> bool:
+        if self.tokenizer == "whitespace":
+            return False
+        if self._kiwi is None:
+            try:
+                from kiwipiepy import Kiwi  # pip install kiwipiepy
+            except ImportError:
+                if self.tokenizer == "kiwi":
+                    raise
+                self.tokenizer = "whitespace"
+                return False
+            self._kiwi = Kiwi()
+        return True
+
+    @property
+    def fingerprint(self) -> str:
+        """정규화 설정 식별자 (설정이 바뀌면 토큰 캐시를 새로 계산)"""
+        tokenizer = "kiwi" if self.uses_kiwi else "whitespace"
+        config = f"{NORMALIZER_VERSION}|{tokenizer}|{self.num_repeats}|{'|'.join(sorted(self.stopwords))}"
+        return hashlib.blake2b(config.encode("utf-8"), digest_size=8).hexdigest()
+
+    def config(self) -> dict:
+        """검색 색인 등에 함께 저장해 질의도 같은 설정으로 토큰화할 수 있도록 하는 설정값"""
+        return {
+            "stopwords": sorted(self.stopwords),
+            "num_repeats": self.num_repeats,
+            "tokenizer": "kiwi" if self.uses_kiwi else "whitespace",
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TextNormalizer":
+        normalizer = cls(num_repeats=config["num_repeats"], tokenizer=config["tokenizer"])
+        normalizer.stopwords = set(config["stopwords"])
+        return normalizer
+
+    def normalize(self, text: str) -> str:
+        """반복 문자 정규화, 특수문자 제거, 자모와 음절 분리, 공백 정리"""
+        if self._repeat_normalize is None:
+            try:
+                from soynlp.normalizer import repeat_normalize  # pip install soynlp
+            except ImportError:
+                repeat_normalize = regex_repeat_normalize
+            self._repeat_normalize = repeat_normalize
+        text = unicodedata.normalize("NFC", text or "").lower()
+        text = self._repeat_normalize(text, num_repeats=self.num_repeats)
+        text = JAMO_RUN.sub(lambda m: f" {m.group(0)} ", NON_TEXT.sub(" ", text))
+        return " ".join(text.split())
+
+    def tokenize(self, text: str) -> List[str]:
+        """정규화된 텍스트를 토큰 리스트로 변환 (불용어, 한 글자 자모 제거)"""
+        text = self.normalize(text)
+        if self.uses_kiwi:
+            tokens = [
+                token.form + "다" if token.tag in ("VV", "VA") else token.form
+                for token in self._kiwi.tokenize(text) if token.tag in CONTENT_TAGS
+            ]
+        else:
+            tokens = [strip_josa(token) for token in text.split()]
+        return [t for t in tokens if t not in self.stopwords and not re.fullmatch(r"[ㄱ-ㅎㅏ-ㅣ]", t)]
+
+    def clean(self, text: str) -> str:
+        """토큰을 공백으로 연결한 정제 텍스트 (리뷰 저장소 cleaned_text)"""
+        return " ".join(self.tokenize(text))
+
+
+_worker_normalizer: Optional[TextNormalizer] = None
+
+
+def _init_worker(normalizer: TextNormalizer) -> None:
+    global _worker_normalizer
+    _worker_normalizer = normalizer
+
+
+def _clean_texts(texts: List[str]) -> List[str]:
+    return [_worker_normalizer.clean(text) for text in texts]
+
+
+def clean_store_reviews(store_path: str, normalizer: TextNormalizer, workers: Optional[int] = None,
+                        recompute: bool = False, batch_size: int = 5000) -> int:
+    """
+    리뷰 저장소의 리뷰를 정제하여 cleaned_text에 저장하고, 새로 토큰화한 리뷰 수를 반환합니다.
+    - 기본은 현재 정규화 설정(fingerprint)으로 정제되지 않은 리뷰만 처리 (새 리뷰, 설정이 바뀐 뒤의 기존 리뷰)
+    - recompute=True면 모든 리뷰를 토큰 캐시 없이 다시 토큰화 (설정은 같지만 정규화 코드가 바뀐 경우)
+    - 같은 텍스트(해시)는 token_cache에서 재사용하고, 나머지만 workers개 프로세스로 토큰화
+      (workers=0이면 현재 프로세스에서 처리)
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    fingerprint = normalizer.fingerprint
+    tokenized = 0
+
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(normalizer,)) if workers > 1 else None
+    try:
+        with ReviewStore(store_path) as store:
+            batch = []
+            reviews = store.iter_reviews(stale_fingerprint=None if recompute else fingerprint, batch_size=batch_size)
+            for review in reviews:
+                batch.append(review)
+                if len(batch) >= batch_size:
+                    tokenized += _clean_batch(store, batch, normalizer, fingerprint, executor, workers, recompute)
+                    batch = []
+            if batch:
+                tokenized += _clean_batch(store, batch, normalizer, fingerprint, executor, workers, recompute)
+    finally:
+        if executor:
+            executor.shutdown()
+    return tokenized
+
+
+def _clean_batch(store: ReviewStore, batch: List[dict], normalizer: TextNormalizer, fingerprint: str,
+                 executor: Optional[ProcessPoolExecutor], workers: int, recompute: bool = False) -> int:
+    """리뷰 한 묶음 정제: 캐시 조회 -> 캐시에 없는 텍스트만 토큰화 -> 캐시 및 cleaned_text 저장"""
+    cached = {} if recompute else store.get_cached_tokens({r["text_hash"] for r in batch}, fingerprint)
+    missing = {r["text_hash"]: r["text"] for r in batch if r["text_hash"] not in cached}
+
+    if missing:
+        hashes, texts = list(missing), list(missing.values())
+        if executor:
+            chunk = max(1, len(texts) // (workers * 4))
+            chunks = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+            cleaned = [text for result in executor.map(_clean_texts, chunks) for text in result]
+        else:
+            cleaned = [normalizer.clean(text) for text in texts]
+        fresh = dict(zip(hashes, cleaned))
+        store.cache_tokens(fingerprint, fresh.items())
+        cached.update(fresh)
+
+    store.update_cleaned(((r["restaurant_id"], r["text_hash"], cached[r["text_hash"]]) for r in batch), fingerprint)
+    return len(missing)
@@ -0,0 +1,646 @@
+"""
+크롤링부터 API 서빙 데이터까지 바뀐 식당만 다시 처리하는 증분 갱신(refresh) 모듈입니다.
+
+eda_restaurant.py → scraper_naver.py → preprocessing/main.py → extra_preprocessing.ipynb → loader.py 순서로
+매번 전체를 다시 처리하는 대신, 단계마다 식당별 입력 해시와 갱신 시각을 refresh_state.db(SQLite)에 기록하고
+입력 해시가 달라진 식당(dirty)만 다시 계산합니다. 야간 갱신은 바뀐 식당만 건드립니다.
+
+단계(DAG, 괄호 안은 앞 단계):
+  restaurants  eda_restaurant.py 결과(restaurant_df.csv)의 식당 행 (--registry를 주면 먼저 다시 필터링)
+  crawl        (restaurants) 새 식당·바뀐 식당·--max-age-days보다 오래된 식당을 크롤링 큐(crawl_queue.py)에 넣고,
+               완료된 결과를 naver_data.csv와 리뷰 저장소(reviews.db)에 반영
+  reviews      (crawl) 리뷰 저장소의 식당별 리뷰 집합 (ReviewStore.review_digests)
+  preprocess   (crawl) 바뀐 식당만 NaverProcessor로 전처리하여 preprocessed_naver.csv에 병합
+  stats        (preprocess, reviews) 식당별 리뷰 집계와 상위 단어 (restaurant_stats.csv)
+  keywords     (reviews) BM25 리뷰 검색 색인 (IDF가 전체 문서에 의존하므로 바뀐 식당이 있을 때만 다시 생성)
+  embeddings   (reviews) 식당 벡터 색인 (바뀐 식당의 행만 다시 인코딩, vector_index.update_vector_index)
+  load         (preprocess, stats) 노트북의 카테고리 매핑/메뉴 연결 후 preprocessed_naver_updated.csv를 저장하고
+               바뀐 식당만 DB에 upsert, 사라진 식당은 삭제 (loader.upsert_catalog)
+
+단계의 입력 해시 = 단계 설정(fingerprint) + 앞 단계들의 식당별 출력 해시이므로, 불용어나 임베딩 모델을 바꾸면
+해당 단계 이후만 전체가 다시 계산됩니다. 정제된 리뷰 토큰을 쓰는 단계(preprocess, stats, keywords)는 먼저
+현재 정규화 설정으로 정제되지 않은 리뷰를 다시 정제하므로 (text_normalizer.clean_store_reviews) 새 설정의 토큰을 씁니다. 앞 단계에 없는 식당(크롤링 전, 전처리에서 제외)은 이후 단계에서 삭제됩니다.
+상태는 단계의 결과 파일을 모두 쓴 뒤에 기록하므로 중간에 실패하면 다음 실행에서 같은 식당을 다시 처리합니다.
+
+    python -m review_analysis.refresh run --dry-run                 # 단계별로 다시 계산할 식당 수만 출력
+    python -m review_analysis.refresh run --crawl-wait-s 3600       # 큐에 넣고 워커들이 끝낼 때까지 최대 1시간 대기
+    python -m review_analysis.refresh run --stages embeddings --force embeddings
+    python -m review_analysis.refresh status
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from argparse import ArgumentParser
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from review_analysis.crawling.crawl_queue import POLL_S, CrawlQueue, clean_value, result_record, run_local_worker
+from review_analysis.preprocessing.entity_resolution import (PROCESSED_COLUMNS, REGISTRY_COLUMNS,
+                                                             assign_restaurant_ids, attach_restaurant_ids)
+from review_analysis.preprocessing.review_stats import TOP_TERMS, build_restaurant_stats
+from review_analysis.preprocessing.text_normalizer import TextNormalizer, clean_store_reviews
+from review_analysis.review_store import ReviewStore
+from review_analysis.search.bm25 import B, K1, build_index
+from review_analysis.search.vector_index import DEFAULT_MODEL, REVIEWS_PER_RESTAURANT, update_vector_index
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATABASE_DIR = os.path.join(ROOT_DIR, "database")
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend", "app")
+MAX_AGE_DAYS = float(os.getenv("REFRESH_MAX_AGE_DAYS", "30"))
+COLLECT_OVERLAP_S = 3600.0  # 워커 머신 간 시계 차이를 감안해 마지막 반영 시각보다 이만큼 앞에서부터 다시 확인
+
+# 단계 이름과 앞 단계 (실행 순서)
+STAGES: List[Tuple[str, List[str]]] = [
+    ("restaurants", []),
+    ("crawl", ["restaurants"]),
+    ("reviews", ["crawl"]),
+    ("preprocess", ["crawl"]),
+    ("stats", ["preprocess", "reviews"]),
+    ("keywords", ["reviews"]),
+    ("embeddings", ["reviews"]),
+    ("load", ["preprocess", "stats"]),
+]
+# 앞 단계 출력이 없어도 되는 의존 관계 (리뷰가 없는 식당도 빈 집계를 가짐)
+OPTIONAL_DEPS = {("stats", "reviews")}
+
+# extra_preprocessing.ipynb의 업태구분명 → API 카테고리 매핑 (매핑에 없는 값은 결측)
+CATEGORY_MAPPING: Dict[str, str] = {
+    '한식': '한식', '냉면집': '한식', '식육(숯불구이)': '한식',
+    '중국식': '중식',
+    '경양식': '양식', '패밀리레스트랑': '양식', '패스트푸드': '양식',
+    '일식': '일식', '횟집': '일식',
+    '외국음식전문점(인도,태국등)': '기타', '분식': '한식',
+    '호프/통닭': '양식', '통닭(치킨)': '양식', '정종/대포집/소주방': '주점', '감성주점': '주점'
+}
+EXCLUDED_CATEGORIES = ['라이브카페']
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_state (
+    stage          TEXT NOT NULL,
+    restaurant_id  TEXT NOT NULL,
+    input_hash     TEXT NOT NULL,
+    output_hash    TEXT,            -- NULL이면 이 단계에서 제외된 식당 (예: 전처리 조건 미달)
+    updated_at     REAL NOT NULL,
+    PRIMARY KEY (stage, restaurant_id)
+);
+-- 크롤링 큐에 넣은 시각과 결과를 반영한 시각 (재크롤링 주기 판단)
+CREATE TABLE IF NOT EXISTS crawl_state (
+    restaurant_id  TEXT PRIMARY KEY,
+    row_hash       TEXT NOT NULL,   -- 큐에 넣을 때의 restaurant_df.csv 행 해시
+    queued_at      REAL,
+    crawled_at     REAL
+);
+CREATE TABLE IF NOT EXISTS refresh_meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT NOT NULL
+);
+"""
+
+
+def content_hash(*parts: Any) -> str:
+    """JSON으로 직렬화한 값들의 해시 (NaN/numpy 값은 파이썬 기본 값으로 변환)"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def row_hash(record: Dict[str, Any]) -> str:
+    return content_hash({key: clean_value(value) for key, value in record.items()})
+
+
+def read_table(path: str) -> pd.DataFrame:
+    """
+    식당 CSV 읽기 (파일이 없으면 빈 DataFrame).
+    restaurant_id가 없는 이전 형식의 restaurant_df.csv/naver_data.csv는 이름·주소·좌표로 id를 부여합니다.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["restaurant_id"])
+    df = pd.read_csv(path, dtype={"restaurant_id": str}, encoding="utf-8-sig")
+    if "restaurant_id" not in df.columns:
+        df = assign_restaurant_ids(df, REGISTRY_COLUMNS)
+    return df[df["restaurant_id"].notna()].drop_duplicates("restaurant_id", keep="last")
+
+
+def merge_table(path: str, rows: pd.DataFrame, replace_ids: Iterable[str]) -> pd.DataFrame:
+    """기존 CSV에서 replace_ids 식당의 행을 빼고 rows를 더해 저장한 뒤 합친 DataFrame 반환"""
+    table = read_table(path)
+    table = table[~table["restaurant_id"].isin(set(replace_ids))]
+    if len(rows):
+        table = pd.concat([table, rows], ignore_index=True) if len(table) else rows
+    table = table.sort_values("restaurant_id", kind="stable")
+    table.to_csv(path, index=False, encoding="utf-8-sig")
+    return table
+
+
+class RefreshState:
+    """단계별·식당별 입력/출력 해시와 갱신 시각을 저장하는 SQLite 상태 파일"""
+
+    def __init__(self, path: str) -> None:
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(STATE_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def rows(self, stage: str) -> Dict[str, Tuple[str, Optional[str], float]]:
+        """{restaurant_id: (input_hash, output_hash, updated_at)}"""
+        cursor = self.conn.execute(
+            "SELECT restaurant_id, input_hash, output_hash, updated_at FROM stage_state WHERE stage = ?", (stage,))
+        return {restaurant_id: (input_hash, output_hash, updated_at)
+                for restaurant_id, input_hash, output_hash, updated_at in cursor}
+
+    def outputs(self, stage: str) -> Dict[str, str]:
+        """이 단계 출력이 있는 식당의 {restaurant_id: output_hash}"""
+        return {restaurant_id: row[1] for restaurant_id, row in self.rows(stage).items() if row[1] is not None}
+
+    def commit(self, stage: str, results: Dict[str, Tuple[str, Optional[str]]], removed: Iterable[str] = ()) -> None:
+        """{restaurant_id: (input_hash, output_hash)} 기록, removed 식당의 상태 삭제"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO stage_state (stage, restaurant_id, input_hash, output_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((stage, restaurant_id, input_hash, output_hash, now)
+                 for restaurant_id, (input_hash, output_hash) in results.items()),
+            )
+            self.conn.executemany("DELETE FROM stage_state WHERE stage = ? AND restaurant_id = ?",
+                                  ((stage, restaurant_id) for restaurant_id in removed))
+
+    def crawl_state(self) -> Dict[str, Tuple[str, Optional[float], Optional[float]]]:
+        """{restaurant_id: (row_hash, queued_at, crawled_at)}"""
+        cursor = self.conn.execute("SELECT restaurant_id, row_hash, queued_at, crawled_at FROM crawl_state")
+        return {restaurant_id: (row_hash, queued_at, crawled_at)
+                for restaurant_id, row_hash, queued_at, crawled_at in cursor}
+
+    def mark_queued(self, row_hashes: Dict[str, str]) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO crawl_state (restaurant_id, row_hash, queued_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (restaurant_id) DO UPDATE SET row_hash = excluded.row_hash, queued_at = excluded.queued_at",
+                ((restaurant_id, hash_, now) for restaurant_id, hash_ in row_hashes.items()),
+            )
+
+    def mark_crawled(self, crawled_at: Dict[str, float], row_hashes: Optional[Dict[str, str]] = None) -> None:
+        """결과를 반영한 시각 기록 (row_hashes를 넘기면 큐를 거치지 않은 기존 크롤링 결과를 그 행의 결과로 인정)"""
+        with self.conn:
+            if row_hashes:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO crawl_state (restaurant_id, row_hash) VALUES (?, ?)", row_hashes.items())
+            self.conn.executemany("UPDATE crawl_state SET crawled_at = ? WHERE restaurant_id = ?",
+                                  ((at, restaurant_id) for restaurant_id, at in crawled_at.items()))
+
+    def remove_crawl_state(self, restaurant_ids: Iterable[str]) -> None:
+        with self.conn:
+            self.conn.executemany("DELETE FROM crawl_state WHERE restaurant_id = ?", ((r,) for r in restaurant_ids))
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM refresh_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO refresh_meta (key, value) VALUES (?, ?)", (key, value))
+
+
+class Refresher:
+    """
+    STAGES 순서대로 단계를 실행합니다. 단계마다 식당별 입력 해시를 계산해 이전 실행과 비교하고
+    바뀐 식당(dirty)과 사라진 식당(removed)만 처리한 뒤 상태를 기록합니다.
+
+    Args:
+        database_dir: 데이터 파일 디렉터리 (restaurant_df.csv, naver_data.csv, reviews.db, 색인 등).
+        queue: 크롤링 작업 큐 (CrawlQueue).
+        stages: 실행할 단계 (나머지 단계는 이전 실행의 출력 해시를 그대로 사용).
+        force: 모든 식당을 dirty로 볼 단계.
+        dry_run: 실행하지 않고 단계별로 다시 계산할 식당 수만 출력.
+        registry: 식당 인허가 원본 CSV (있으면 restaurants 단계에서 eda_restaurant.py 필터링부터 다시 실행).
+        crawl: "enqueue"(큐에 넣기만), "local"(이 프로세스에서 워커 실행), "skip"(완료된 결과만 반영).
+        crawl_wait_s: 큐에 넣은 뒤 다른 머신의 워커들이 끝낼 때까지 기다릴 최대 시간(초).
+        max_age_days: 이 기간보다 오래전에 크롤링한 식당은 다시 크롤링 (0이면 바뀐 식당만).
+        menu_path: menu_updated.csv (없으면 기존 preprocessed_naver_updated.csv의 메뉴를 유지).
+        stopwords_path, workers: NaverProcessor 설정.
+        model_name: 임베딩 모델.
+        snapshot_path: load 후 다시 만들 카탈로그 스냅샷 경로.
+    """
+
+    def __init__(self, database_dir: str, queue: CrawlQueue, stages: Optional[Iterable[str]] = None,
+                 force: Iterable[str] = (), dry_run: bool = False, registry: Optional[str] = None,
+                 crawl: str = "enqueue", crawl_wait_s: float = 0.0, max_age_days: float = MAX_AGE_DAYS,
+                 menu_path: Optional[str] = None, stopwords_path: Optional[str] = None,
+                 workers: Optional[int] = None, model_name: str = DEFAULT_MODEL,
+                 snapshot_path: Optional[str] = None) -> None:
+        self.database_dir = database_dir
+        self.queue = queue
+        self.stages = set(stages) if stages else {name for name, _ in STAGES}
+        self.force = set(force)
+        self.dry_run = dry_run
+        self.registry = registry
+        self.crawl = crawl
+        self.crawl_wait_s = crawl_wait_s
+        self.max_age_days = max_age_days
+        self.menu_path = menu_path
+        self.stopwords_path = stopwords_path
+        self.workers = workers
+        self.model_name = model_name
+        self.snapshot_path = snapshot_path
+        self.normalizer = TextNormalizer(stopwords_path=stopwords_path)
+        self.state = RefreshState(self.path("refresh_state.db"))
+        self.restaurants: Optional[Dict[str, dict]] = None  # restaurants 단계에서 읽은 restaurant_df.csv 행
+        self.changed: Dict[str, Set[str]] = {}  # 단계별 출력이 바뀌거나 사라진 식당 (dry-run 추정용)
+        self.reviews_cleaned = False  # 이번 실행에서 clean_reviews()를 했는지
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.database_dir, name)
+
+    def fingerprint(self, stage: str) -> str:
+        """단계 설정 해시 (바뀌면 그 단계의 모든 식당이 dirty)"""
+        if stage == "preprocess":
+            return self.normalizer.fingerprint
+        if stage == "stats":
+            return content_hash(self.normalizer.fingerprint, TOP_TERMS)  # 상위 단어는 정제된 토큰 기준
+        if stage == "keywords":
+            return content_hash(self.normalizer.fingerprint, K1, B)
+        if stage == "embeddings":
+            return content_hash(self.model_name, REVIEWS_PER_RESTAURANT)
+        if stage == "load":
+            return content_hash(CATEGORY_MAPPING, EXCLUDED_CATEGORIES)
+        return ""
+
+    def current_inputs(self, stage: str, deps: List[str]) -> Dict[str, str]:
+        """앞 단계 출력이 모두(선택 의존은 제외) 있는 식당의 {restaurant_id: 입력 해시}"""
+        outputs = {dep: self.state.outputs(dep) for dep in deps}
+        required = [dep for dep in deps if (stage, dep) not in OPTIONAL_DEPS]
+        restaurant_ids = set.intersection(*(set(outputs[dep]) for dep in required))
+        fingerprint = self.fingerprint(stage)
+        return {restaurant_id: content_hash(fingerprint, [outputs[dep].get(restaurant_id) for dep in deps])
+                for restaurant_id in restaurant_ids}
+
+    def plan(self, stage: str, deps: List[str],
+             inputs: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], List[str], List[str]]:
+        """(현재 입력 해시, dirty 식당, removed 식당)"""
+        inputs = self.current_inputs(stage, deps) if inputs is None else inputs
+        previous = self.state.rows(stage)
+        if stage in self.force:
+            dirty = sorted(inputs)
+        else:
+            dirty = sorted(r for r, h in inputs.items() if r not in previous or previous[r][0] != h)
+        removed = sorted(set(previous) - set(inputs))
+        if self.dry_run:  # 앞 단계에서 바뀔 식당까지 포함한 추정치
+            upstream = set().union(*(self.changed.get(dep, set()) for dep in deps)) if deps else set()
+            dirty = sorted(set(dirty) | (upstream - set(removed)))
+        return inputs, dirty, removed
+
+    def observe(self, stage: str, outputs: Dict[str, str], deps: Iterable[str] = ()) -> Set[str]:
+        """입력이 곧 데이터인 단계(restaurants, crawl, reviews)의 출력 해시 기록, 바뀐 식당 반환"""
+        previous = self.state.outputs(stage)
+        changed = {r: h for r, h in outputs.items() if previous.get(r) != h}
+        removed = set(previous) - set(outputs)
+        if self.dry_run:  # 앞 단계에서 바뀔 식당까지 포함한 추정치
+            return set(changed) | removed | set().union(*(self.changed.get(dep, set()) for dep in deps))
+        self.state.commit(stage, {r: (h, h) for r, h in changed.items()}, removed)
+        return set(changed) | removed
+
+    def run(self) -> None:
+        for stage, deps in STAGES:
+            if stage not in self.stages:
+                print(f"[{stage}] 건너뜀")
+                continue
+            started = time.perf_counter()
+            self.changed[stage] = getattr(self, f"run_{stage}")(deps)
+            print(f"[{stage}] 출력이 바뀐 식당 {len(self.changed[stage])}개 ({time.perf_counter() - started:.1f}s)")
+
+    # 단계별 실행 함수: 출력이 바뀌거나 사라진 식당 집합을 반환
+
+    def run_restaurants(self, deps: List[str]) -> Set[str]:
+        restaurant_csv = self.path("restaurant_df.csv")
+        if self.registry and not self.dry_run:
+            from review_analysis.crawling.eda_restaurant import deduplicate_restaurants, filter_restaurant_data
+
+            filter_restaurant_data(self.registry, restaurant_csv)
+            deduplicate_restaurants(restaurant_csv)
+        self.restaurants = {row["restaurant_id"]: row for row in read_table(restaurant_csv).to_dict("records")}
+        return self.observe("restaurants", {r: row_hash(row) for r, row in self.restaurants.items()})
+
+    def run_crawl(self, deps: List[str]) -> Set[str]:
+        naver_csv = self.path("naver_data.csv")
+        rows = {row["restaurant_id"]: row for row in read_table(naver_csv).to_dict("records")}
+        restaurants = self.restaurants
+        if restaurants is None:  # restaurants 단계를 건너뛴 경우 파일 그대로 사용
+            restaurants = {row["restaurant_id"]: row
+                           for row in read_table(self.path("restaurant_df.csv")).to_dict("records")}
+
+        if self.dry_run:
+            done = {str(job["payload"]["restaurant_id"]) for job in self.pending_results()}
+            print(f"[crawl] 반영할 완료 작업 {len(done)}개, 큐에 넣을 식당 {len(self.crawl_targets(restaurants, rows))}개")
+            return (done & set(restaurants)) | (set(rows) - set(restaurants))
+
+        crawled = self.collect(rows)
+        if self.crawl != "skip":
+            targets = self.crawl_targets(restaurants, rows)
+            requeued = set(self.queue.requeue(restaurants[r] for r in targets))
+            self.state.mark_queued({r: row_hash(restaurants[r]) for r in targets if r in requeued})
+            print(f"[crawl] 큐에 넣은 식당 {len(requeued)}개 (처리 중이라 건너뜀 {len(targets) - len(requeued)}개), "
+                  f"큐 상태: {self.queue.stats()}")
+            if self.crawl == "local":
+                run_local_worker(self.queue, f"refresh-{socket.gethostname()}-{os.getpid()}")
+                crawled.update(self.collect(rows, crawled))
+            elif self.crawl_wait_s > 0:
+                self.wait_for_queue()
+                crawled.update(self.collect(rows, crawled))
+
+        removed = set(rows) - set(restaurants)
+        for restaurant_id in removed:
+            del rows[restaurant_id]
+        collected = set(crawled)
+        if collected or removed:
+            # 해시는 CSV로 저장했다가 다시 읽은 값으로 계산 (JSON 결과와 CSV의 자료형 차이로 해시가 바뀌지 않도록)
+            merge_table(naver_csv, pd.DataFrame([rows[r] for r in collected if r in rows]), collected | removed)
+            rows = {row["restaurant_id"]: row for row in read_table(naver_csv).to_dict("records")}
+        # naver_data.csv를 저장한 뒤에 반영 시각을 기록 (중간에 실패하면 다음 실행에서 다시 반영)
+        self.state.remove_crawl_state(removed)
+        if crawled:
+            self.state.mark_crawled(crawled)
+            last = max(crawled.values())
+            if last > float(self.state.get_meta("crawl_collected_until", "-1")):
+                self.state.set_meta("crawl_collected_until", repr(last))
+        return self.observe("crawl", {r: row_hash(row) for r, row in rows.items()})
+
+    def crawl_targets(self, restaurants: Dict[str, dict], rows: Dict[str, dict]) -> List[str]:
+        """큐에 넣을 식당: 처음 보는 식당, 행이 바뀐 식당, max_age_days보다 오래전에 크롤링한 식당"""
+        crawl_state = self.state.crawl_state()
+        cutoff = time.time() - self.max_age_days * 86400
+        adopted, targets = {}, []
+        for restaurant_id, row in restaurants.items():
+            hash_ = row_hash(row)
+            if restaurant_id not in crawl_state:
+                if restaurant_id in rows:  # 큐 도입 전 scraper_naver.py로 수집한 결과는 그대로 인정
+                    adopted[restaurant_id] = hash_
+                else:
+                    targets.append(restaurant_id)
+                continue
+            previous_hash, queued_at, crawled_at = crawl_state[restaurant_id]
+            if previous_hash != hash_:
+                targets.append(restaurant_id)
+            elif (self.max_age_days and crawled_at is not None and crawled_at < cutoff
+                  and (queued_at or 0) <= crawled_at):  # 이미 큐에서 기다리는 식당은 다시 넣지 않음
+                targets.append(restaurant_id)
+        if adopted and not self.dry_run:
+            now = time.time()
+            self.state.mark_crawled({r: now for r in adopted}, adopted)
+        return sorted(targets)
+
+    def pending_results(self, seen: Optional[Dict[str, float]] = None) -> Iterable[Dict[str, Any]]:
+        """아직 반영하지 않은 완료 작업 (완료 시각이 기록된 crawled_at 또는 seen과 같으면 이미 반영한 결과)"""
+        since = float(self.state.get_meta("crawl_collected_until", "-1"))
+        crawled_at = {r: state[2] for r, state in self.state.crawl_state().items()}
+        crawled_at.update(seen or {})
+        for job in self.queue.done_jobs(since - COLLECT_OVERLAP_S if since >= 0 else None):
+            if crawled_at.get(str(job["payload"]["restaurant_id"])) != job["updated_at"]:
+                yield job
+
+    def collect(self, rows: Dict[str, dict], seen: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        완료된 작업을 rows와 리뷰 저장소에 반영하고 {restaurant_id: 완료 시각} 반환.
+        반영 시각은 호출하는 쪽에서 naver_data.csv를 저장한 뒤에 기록합니다.
+        """
+        crawled_at = {}
+        with ReviewStore(self.path("reviews.db")) as store:
+            for job in self.pending_results(seen):
+                record = result_record(store, job)
+                restaurant_id = str(record["restaurant_id"])
+                rows[restaurant_id] = record
+                crawled_at[restaurant_id] = job["updated_at"]
+        if crawled_at:
+            print(f"[crawl] 완료된 크롤링 결과 {len(crawled_at)}개 반영")
+        return crawled_at
+
+    def wait_for_queue(self) -> None:
+        deadline = time.monotonic() + self.crawl_wait_s
+        while time.monotonic() < deadline:
+            stats = self.queue.stats()
+            if not stats.get("pending") and not stats.get("leased"):
+                return
+            time.sleep(min(POLL_S, max(deadline - time.monotonic(), 0)))
+        print(f"[crawl] {self.crawl_wait_s:.0f}초 안에 끝나지 않은 작업은 다음 실행에서 반영합니다: {self.queue.stats()}")
+
+    def run_reviews(self, deps: List[str]) -> Set[str]:
+        crawled = self.state.outputs("crawl")
+        with ReviewStore(self.path("reviews.db")) as store:
+            digests = store.review_digests()
+        return self.observe("reviews", {r: h for r, h in digests.items() if r in crawled}, deps)
+
+    def run_preprocess(self, deps: List[str]) -> Set[str]:
+        from review_analysis.preprocessing.NaverProcessor import NaverProcessor
+
+        inputs, dirty, removed = self.plan("preprocess", deps)
+        print(f"[preprocess] dirty {len(dirty)}개, 삭제 {len(removed)}개")
+        if self.dry_run or not (dirty or removed):
+            return set(dirty) | set(removed)
+
+        cleaned = pd.DataFrame(columns=["restaurant_id"])
+        if dirty:
+            self.clean_reviews()
+            processor = NaverProcessor(self.path("naver_data.csv"), self.database_dir,
+                                       review_store_path=self.path("reviews.db"),
+                                       stopwords_path=self.stopwords_path, workers=self.workers,
+                                       restaurant_ids=dirty)
+            processor.preprocess()
+            cleaned = processor.df_cleaned.astype({"restaurant_id": str})
+        merge_table(self.path("preprocessed_naver.csv"), cleaned, set(dirty) | set(removed))
+
+        # 전처리 조건(결측, 리뷰 수 등)으로 제외된 식당은 출력 없음으로 기록하여 입력이 바뀔 때까지 다시 보지 않음
+        outputs = {row["restaurant_id"]: row_hash(row) for row in cleaned.to_dict("records")}
+        return self.commit_plan("preprocess", inputs, dirty, removed, outputs)
+
+    def commit_plan(self, stage: str, inputs: Dict[str, str], dirty: List[str], removed: List[str],
+                    outputs: Dict[str, str]) -> Set[str]:
+        """dirty 식당의 (입력, 출력) 해시 기록 후 출력이 바뀌거나 사라진 식당 반환"""
+        previous = self.state.outputs(stage)
+        self.state.commit(stage, {r: (inputs[r], outputs.get(r)) for r in dirty}, removed)
+        return {r for r in dirty if previous.get(r) != outputs.get(r)} | set(removed)
+
+    def clean_reviews(self) -> None:
+        """
+        리뷰 저장소에서 현재 정규화 설정으로 정제되지 않은 리뷰를 정제 (실행마다 한 번).
+        설정이 바뀌면 기존 리뷰도 다시 정제되므로, preprocess 단계를 건너뛰어도 stats/keywords가 새 토큰을 씀
+        """
+        if self.reviews_cleaned:
+            return
+        tokenized = clean_store_reviews(self.path("reviews.db"), self.normalizer, self.workers)
+        print(f"[reviews] 리뷰 토큰화: 새로 처리한 리뷰 {tokenized}개")
+        self.reviews_cleaned = True
+
+    def run_stats(self, deps: List[str]) -> Set[str]:
+        inputs, dirty, removed = self.plan("stats", deps)
+        print(f"[stats] dirty {len(dirty)}개, 삭제 {len(removed)}개")
+        if self.dry_run or not (dirty or removed):
+            return set(dirty) | set(removed)
+
+        self.clean_reviews()
+        table = read_table(self.path("preprocessed_naver.csv"))
+        stats = build_restaurant_stats(table[table["restaurant_id"].isin(set(dirty))], self.path("reviews.db"),
+                                       self.normalizer.stopwords, lookup=True)
+        merge_table(self.path("restaurant_stats.csv"), stats, set(dirty) | set(removed))
+        outputs = {row["restaurant_id"]: row_hash(row) for row in stats.to_dict("records")}
+        return self.commit_plan("stats", inputs, dirty, removed, outputs)
+
+    def missing_index(self, stage: str, name: str) -> None:
+        """색인 디렉터리가 지워졌으면 모든 식당을 다시 계산"""
+        if not os.path.exists(os.path.join(self.path(name), "meta.json")):
+            self.force.add(stage)
+
+    def run_keywords(self, deps: List[str]) -> Set[str]:
+        self.missing_index("keywords", "review_index")
+        inputs, dirty, removed = self.plan("keywords", deps)
+        print(f"[keywords] dirty {len(dirty)}개, 삭제 {len(removed)}개")
+        if self.dry_run or not (dirty or removed):
+            return set(dirty) | set(removed)
+
+        self.clean_reviews()
+        # BM25는 문서 수와 평균 길이, 단어별 문서 빈도가 전체 색인에 걸쳐 있으므로 색인을 다시 만듦 (스트리밍 한 번)
+        n_docs = build_index(self.path("reviews.db"), self.path("review_index"), self.normalizer,
+                             restaurant_ids=set(inputs))
+        print(f"[keywords] 리뷰 색인 다시 생성: 식당 {n_docs}개")
+        return self.commit_plan("keywords", inputs, dirty, removed, {r: inputs[r] for r in dirty})
+
+    def run_embeddings(self, deps: List[str]) -> Set[str]:
+        self.missing_index("embeddings", "vector_index")
+        inputs, dirty, removed = self.plan("embeddings", deps)
+        print(f"[embeddings] dirty {len(dirty)}개, 삭제 {len(removed)}개")
+        if self.dry_run or not (dirty or removed):
+            return set(dirty) | set(removed)
+
+        n_docs = update_vector_index(self.path("reviews.db"), self.path("vector_index"), dirty, removed,
+                                     self.model_name)
+        print(f"[embeddings] 벡터 색인 갱신: 식당 {n_docs}개")
+        return self.commit_plan("embeddings", inputs, dirty, removed, {r: inputs[r] for r in dirty})
+
+    def run_load(self, deps: List[str]) -> Set[str]:
+        inputs = self.current_inputs("load", deps)
+        if self.dry_run:
+            inputs, dirty, removed = self.plan("load", deps, inputs)
+            print(f"[load] dirty {len(dirty)}개, 삭제 {len(removed)}개")
+            return set(dirty) | set(removed)
+
+        # 노트북 단계(카테고리 매핑, 메뉴 연결)를 전체 표에 적용해 preprocessed_naver_updated.csv 저장 (loader 입력)
+        table = read_table(self.path("preprocessed_naver.csv"))
+        table = table[table["restaurant_id"].isin(set(inputs))]
+        updated_csv = self.path("preprocessed_naver_updated.csv")
+        enriched = {}
+        if len(table):
+            table = enrich_restaurants(table, self.menu_mapping(table))
+            table.to_csv(updated_csv, index=False)
+            # 메뉴와 카테고리 매핑 결과도 입력에 포함 (메뉴 파일만 바뀐 식당도 다시 적재)
+            enriched = {row["restaurant_id"]: content_hash(clean_value(row["menu"]), clean_value(row["category"]))
+                        for row in table.to_dict("records")}
+        inputs, dirty, removed = self.plan(
+            "load", deps, {r: content_hash(h, enriched[r]) for r, h in inputs.items() if r in enriched})
+        print(f"[load] dirty {len(dirty)}개, 삭제 {len(removed)}개")
+        if not (dirty or removed):
+            return set()
+
+        if BACKEND_DIR not in sys.path:
+            sys.path.append(BACKEND_DIR)
+        from loader import upsert_catalog  # psycopg2, DATABASE_URL 필요
+
+        if not upsert_catalog(updated_csv, self.path("restaurant_stats.csv"), dirty, removed):
+            raise RuntimeError("DB 적재에 실패했습니다 (DATABASE_URL 확인). 다음 실행에서 다시 적재합니다.")
+        if self.snapshot_path:
+            from catalog_snapshot import export_catalog_snapshot
+
+            export_catalog_snapshot(self.snapshot_path)
+        return self.commit_plan("load", inputs, dirty, removed, {r: inputs[r] for r in dirty})
+
+    def menu_mapping(self, table: pd.DataFrame) -> Dict[str, Any]:
+        """{restaurant_id: 메뉴 문자열} (menu_path가 있으면 식당명/주소/좌표로 연결, 없으면 기존 적재 파일의 메뉴)"""
+        if self.menu_path:
+            menu_df = attach_restaurant_ids(pd.read_csv(self.menu_path), table, PROCESSED_COLUMNS, PROCESSED_COLUMNS)
+            matched = menu_df[menu_df["restaurant_id"].notna()].drop_duplicates("restaurant_id")
+            return matched.set_index("restaurant_id")["menu"].to_dict()
+        previous = read_table(self.path("preprocessed_naver_updated.csv"))
+        if "menu" not in previous.columns:
+            return {}
+        return previous.set_index("restaurant_id")["menu"].to_dict()
+
+    def close(self) -> None:
+        self.state.close()
+
+
+def enrich_restaurants(df: pd.DataFrame, menus: Dict[str, Any]) -> pd.DataFrame:
+    """extra_preprocessing.ipynb: '라이브카페' 제외, 업태구분명을 API 카테고리로 매핑, 메뉴 열 추가"""
+    df = df[~df["category"].isin(EXCLUDED_CATEGORIES)].copy()
+    df["category"] = df["category"].map(CATEGORY_MAPPING)
+    df["menu"] = df["restaurant_id"].map(menus)
+    return df
+
+
+def print_status(state: RefreshState, max_age_days: float = MAX_AGE_DAYS) -> None:
+    """단계별 식당 수, 제외된 식당 수, 가장 오래된/최근 갱신 시각과 크롤링 신선도 출력"""
+    def fmt(ts: Optional[float]) -> str:
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts)) if ts else "-"
+
+    print(f"{'stage':<13}{'restaurants':>12}{'excluded':>10}  {'oldest':<17}  {'newest':<17}")
+    for stage, _ in STAGES:
+        rows = state.rows(stage)
+        times = [row[2] for row in rows.values()]
+        excluded = sum(1 for row in rows.values() if row[1] is None)
+        print(f"{stage:<13}{len(rows) - excluded:>12}{excluded:>10}  "
+              f"{fmt(min(times) if times else None):<17}  {fmt(max(times) if times else None):<17}")
+
+    crawl_state = state.crawl_state().values()
+    cutoff = time.time() - max_age_days * 86400
+    waiting = sum(1 for _, queued_at, crawled_at in crawl_state if queued_at and (crawled_at or 0) < queued_at)
+    stale = sum(1 for _, _, crawled_at in crawl_state if crawled_at and crawled_at < cutoff)
+    print(f"\n[crawl] 결과 대기 {waiting}개, {max_age_days:g}일보다 오래된 크롤링 {stale}개, "
+          f"마지막 반영 {fmt(float(state.get_meta('crawl_collected_until', '0')))}")
+
+
+def main() -> None:
+    stage_names = [name for name, _ in STAGES]
+    parser = ArgumentParser(description="Incrementally refresh crawl, preprocessing, indexes and the DB for changed restaurants.")
+    parser.add_argument("command", choices=["run", "status"])
+    parser.add_argument("--database", default=DATABASE_DIR, help="Data directory (restaurant_df.csv, reviews.db, ...).")
+    parser.add_argument("--queue", default=os.getenv("CRAWL_QUEUE"),
+                        help="Crawl queue: SQLite file or postgresql:// URL (default: <database>/crawl_queue.db).")
+    parser.add_argument("--stages", nargs="+", choices=stage_names, default=None, help="Only run these stages.")
+    parser.add_argument("--force", nargs="+", choices=stage_names, default=[], help="Recompute every restaurant in these stages.")
+    parser.add_argument("--dry-run", action="store_true", help="Only print how many restaurants each stage would recompute.")
+    parser.add_argument("--registry", default=None, help="Registry CSV to re-filter with eda_restaurant.py first.")
+    parser.add_argument("--crawl", choices=["enqueue", "local", "skip"], default="enqueue",
+                        help="enqueue: leave jobs for workers, local: crawl in this process, skip: only collect results.")
+    parser.add_argument("--crawl-wait-s", type=float, default=0.0, help="Wait up to N seconds for workers to drain the queue.")
+    parser.add_argument("--max-age-days", type=float, default=MAX_AGE_DAYS, help="Recrawl restaurants crawled longer ago (0 = never).")
+    parser.add_argument("--menu", default=None, help="menu_updated.csv to link menus from (default: keep loaded menus).")
+    parser.add_argument("--stopwords", default=None, help="Extra stopword file for review tokenization.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes used for review tokenization.")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="sentence-transformers model for the vector index.")
+    parser.add_argument("--snapshot", default=None, help="Rewrite the catalog snapshot after loading.")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        state = RefreshState(os.path.join(args.database, "refresh_state.db"))
+        try:
+            print_status(state, args.max_age_days)
+        finally:
+            state.close()
+        return
+
+    queue = CrawlQueue(args.queue or os.path.join(args.database, "crawl_queue.db"))
+    refresher = Refresher(args.database, queue, args.stages, args.force, args.dry_run, args.registry, args.crawl,
+                          args.crawl_wait_s, args.max_age_days, args.menu, args.stopwords, args.workers,
+                          args.model, args.snapshot)
+    try:
+        refresher.run()
+    finally:
+        refresher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+리뷰 단위 저장소 모듈입니다.
+
+크롤러가 수집한 리뷰를 식당별 문자열 하나(str(reviews[:300]))로 저장하지 않고
+(restaurant_id, 리뷰 키, 리뷰 작성일, 텍스트 해시, 원문, 정제된 텍스트) 한 행씩 SQLite에 저장합니다.
+리뷰 키는 (텍스트, 작성일, 한 번의 수집에서 같은 텍스트·작성일이 나온 순번)의 해시라서
+같은 날 같은 짧은 리뷰("맛있어요")가 여러 개여도 모두 저장되고, 재크롤링 시에는 새 리뷰만 추가되며,
+분석·임베딩 단계는 전체 문자열을 역직렬화하지 않고 리뷰를 스트리밍으로 읽을 수 있습니다.
+"""
+
+import ast
+import hashlib
+import re
+import sqlite3
+import unicodedata
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    restaurant_id  TEXT NOT NULL,
+    review_key     TEXT NOT NULL,  -- review_key(텍스트, 작성일, 순번)
+    text_hash      TEXT NOT NULL,
+    review_date    TEXT,           -- YYYY-MM-DD (변환할 수 없으면 NULL)
+    raw_date       TEXT,           -- 네이버에 표시된 날짜 문자열 ("2.15.토", "24.2.15.목")
+    text           TEXT NOT NULL,
+    cleaned_text   TEXT,           -- NaverProcessor에서 정제한 텍스트
+    collected_at   TEXT NOT NULL,
+    cleaned_fingerprint TEXT,      -- cleaned_text를 만든 정규화 설정 (TextNormalizer.fingerprint)
+    PRIMARY KEY (restaurant_id, review_key)
+);
+CREATE INDEX IF NOT EXISTS reviews_restaurant_text_idx ON reviews (restaurant_id, text_hash);
+CREATE INDEX IF NOT EXISTS reviews_restaurant_date_idx ON reviews (restaurant_id, review_date);
+CREATE INDEX IF NOT EXISTS reviews_date_idx ON reviews (review_date);
+
+-- 정규화 설정(fingerprint)별 토큰화 결과 (같은 텍스트는 식당이 달라도 한 번만 토큰화)
+CREATE TABLE IF NOT EXISTS token_cache (
+    text_hash    TEXT NOT NULL,
+    fingerprint  TEXT NOT NULL,
+    tokens       TEXT NOT NULL,    -- 공백으로 연결된 토큰
+    PRIMARY KEY (text_hash, fingerprint)
+);
+"""
+
+REVIEW_DATE = re.compile(r"^(?:(\d{2})\.)?(\d{1,2})\.(\d{1,2})\.")
+
+
+def text_hash(text: str) -> str:
+    """리뷰 텍스트 해시 (유니코드 정규화 및 앞뒤 공백 제거 후 계산)"""
+    normalized = unicodedata.normalize("NFC", text).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def review_key(text: str, review_date: str, ordinal: int = 0) -> str:
+    """
+    리뷰 한 개의 키. review_date는 변환된 작성일(YYYY-MM-DD, 없으면 표시된 날짜 문자열)이고,
+    ordinal은 한 번의 수집에서 같은 (텍스트, 작성일)이 앞서 나온 횟수입니다.
+    """
+    normalized = unicodedata.normalize("NFC", text).strip()
+    key = f"{normalized}\x1f{review_date}\x1f{ordinal}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def parse_review_date(raw_date: str, collected_on: date) -> Optional[str]:
+    """
+    네이버 리뷰 날짜 문자열을 YYYY-MM-DD로 변환합니다.
+    연도가 없는 경우("2.15.토") 수집일 기준 연도를 사용하고, 수집일보다 미래가 되면 전년도로 봅니다.
+    """
+    match = REVIEW_DATE.match(raw_date.strip()) if isinstance(raw_date, str) else None
+    if not match:
+        return None
+    year, month, day = match.groups()
+    try:
+        if year:
+            parsed = date(2000 + int(year), int(month), int(day))
+        else:
+            parsed = date(collected_on.year, int(month), int(day))
+            if parsed > collected_on:
+                parsed = parsed.replace(year=collected_on.year - 1)
+    except ValueError:
+        return None
+    return parsed.isoformat()
+
+
+def parse_review_blob(raw_blob: str) -> List[Dict[str, str]]:
+    """
+    기존 CSV의 '최신 300개 리뷰' 문자열([{'date': ..., 'text': ...}, ...])을 리스트로 변환 (실패 시 빈 리스트).
+    이전 스크래퍼는 더보기마다 앞서 읽은 리뷰를 다시 덧붙였으므로 같은 (날짜, 텍스트)는 한 번만 남깁니다.
+    """
+    if not isinstance(raw_blob, str):
+        return []
+    try:
+        reviews = ast.literal_eval(raw_blob)
+    except (ValueError, SyntaxError):
+        return []
+    if not isinstance(reviews, list):
+        return []
+    seen, unique = set(), []
+    for review in reviews:
+        if not isinstance(review, dict):
+            continue
+        key = (review.get("date"), review.get("text"))
+        if key not in seen:
+            seen.add(key)
+            unique.append(review)
+    return unique
+
+
+class ReviewStore:
+    """
+    SQLite 기반 리뷰 저장소.
+
+    Args:
+        path: SQLite 파일 경로 (예: "reviews.db").
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # 크롤링 중에도 다른 프로세스가 읽을 수 있도록
+        self.migrate_text_keyed()
+        self.conn.executescript(SCHEMA)
+        self.migrate_cleaned_fingerprint()
+
+    def __enter__(self) -> "ReviewStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def migrate_text_keyed(self) -> None:
+        """
+        (restaurant_id, text_hash)를 기본 키로 쓰던 이전 저장소를 review_key 기본 키로 옮깁니다.
+        이전 저장소에는 식당별로 같은 텍스트가 한 번만 있으므로 순번은 모두 0입니다.
+        """
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(reviews)")]
+        if not columns or "review_key" in columns:
+            return
+        # DDL까지 한 트랜잭션으로 실행해 중간에 중단되어도 이전 테이블이 그대로 남도록 함
+        self.conn.execute("BEGIN")
+        try:
+            # 이름을 바꾼 테이블의 인덱스가 이름을 차지하면 새 테이블에 인덱스가 만들어지지 않으므로 먼저 삭제
+            self.conn.execute("DROP INDEX IF EXISTS reviews_restaurant_date_idx")
+            self.conn.execute("DROP INDEX IF EXISTS reviews_date_idx")
+            self.conn.execute("ALTER TABLE reviews RENAME TO reviews_text_keyed")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.conn.execute(statement)
+            self.conn.create_function("review_key", 2, review_key, deterministic=True)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO reviews (restaurant_id, review_key, text_hash, review_date, raw_date, text, "
+                "cleaned_text, collected_at) "
+                "SELECT restaurant_id, review_key(text, COALESCE(review_date, raw_date, '')), text_hash, review_date, "
+                "raw_date, text, cleaned_text, collected_at FROM reviews_text_keyed"
+            )
+            self.conn.execute("DROP TABLE reviews_text_keyed")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def migrate_cleaned_fingerprint(self) -> None:
+        """
+        cleaned_fingerprint 컬럼이 없는 이전 저장소에 컬럼을 추가합니다.
+        기존 cleaned_text는 어떤 설정으로 만들었는지 알 수 없으므로 NULL로 두어 다음 정제 때 다시 토큰화합니다.
+        """
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(reviews)")]
+        if "cleaned_fingerprint" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE reviews ADD COLUMN cleaned_fingerprint TEXT")
+
+    def add_reviews(self, restaurant_id: str, reviews: Iterable[Dict[str, str]],
+                    collected_at: Optional[datetime] = None) -> int:
+        """
+        식당의 리뷰들을 저장합니다. 이미 저장된 리뷰(같은 리뷰 키)는 건너뜁니다.
+        같은 텍스트·작성일의 리뷰가 목록에 여러 번 있으면 순번으로 구분해 모두 저장하므로,
+        reviews에는 화면의 리뷰가 한 번씩만 들어 있어야 합니다 (더보기 반복 시 이미 읽은 리뷰 제외).
+
+        Args:
+            restaurant_id: 식당 id.
+            reviews: {"date": 날짜 문자열, "text": 리뷰 텍스트} 목록 (최신순).
+            collected_at: 수집 시각 (날짜 연도 추정에 사용, 기본값은 현재 시각).
+
+        Returns:
+            새로 저장된 리뷰 수.
+        """
+        collected_at = collected_at or datetime.now()
+        rows = []
+        seen = Counter()
+        for review in reviews:
+            text = (review.get("text") or "").strip()
+            if not text:
+                continue
+            raw_date = review.get("date") or ""
+            review_date = parse_review_date(raw_date, collected_at.date())
+            # 연도가 생략된 날짜도 재수집 시 같은 키가 되도록 변환된 작성일 기준 (변환 실패 시 표시 문자열)
+            date_key = review_date or raw_date
+            hash_ = text_hash(text)
+            ordinal = seen[hash_, date_key]
+            seen[hash_, date_key] += 1
+            rows.append((restaurant_id, review_key(text, date_key, ordinal), hash_, review_date,
+                         raw_date, text, collected_at.isoformat(timespec="seconds")))
+
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO reviews "
+                "(restaurant_id, review_key, text_hash, review_date, raw_date, text, collected_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self.conn.total_changes - before
+
+    def iter_reviews(self, restaurant_id: Optional[str] = None, since: Optional[str] = None,
+                     stale_fingerprint: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict[str, str]]:
+        """
+        조건에 맞는 리뷰를 한 행씩 스트리밍합니다 (전체를 메모리에 올리지 않음).
+
+        Args:
+            restaurant_id: 특정 식당만 조회.
+            since: 이 날짜(YYYY-MM-DD) 이후 작성된 리뷰만 조회.
+            stale_fingerprint: 이 정규화 설정으로 정제되지 않은 리뷰만 조회 (아직 정제되지 않았거나 다른 설정으로 정제됨).
+            batch_size: 한 번에 가져올 행 수.
+        """
+        conditions, params = [], []
+        if restaurant_id is not None:
+            conditions.append("restaurant_id = ?")
+            params.append(restaurant_id)
+        if since is not None:
+            conditions.append("review_date >= ?")
+            params.append(since)
+        if stale_fingerprint is not None:
+            conditions.append("cleaned_fingerprint IS NOT ?")
+            params.append(stale_fingerprint)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # 읽는 도중 update_cleaned()로 쓰더라도 영향이 없도록 별도 연결(WAL 스냅샷)에서 읽음
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                "SELECT restaurant_id, text_hash, review_date, raw_date, text, cleaned_text, cleaned_fingerprint "
+                f"FROM reviews {where} ORDER BY restaurant_id, review_date DESC",
+                params,
+            )
+            columns = [c[0] for c in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            conn.close()
+
+    def update_cleaned(self, rows: Iterable[Tuple[str, str, str]], fingerprint: str) -> None:
+        """(restaurant_id, text_hash, cleaned_text) 목록으로 정제된 텍스트와 정규화 설정(fingerprint) 저장"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE reviews SET cleaned_text = ?, cleaned_fingerprint = ? WHERE restaurant_id = ? AND text_hash = ?",
+                ((cleaned, fingerprint, restaurant_id, hash_) for restaurant_id, hash_, cleaned in rows),
+            )
+
+    def get_cached_tokens(self, hashes: Iterable[str], fingerprint: str) -> Dict[str, str]:
+        """text_hash 목록 중 캐시된 토큰화 결과 {text_hash: tokens}"""
+        hashes = list(hashes)
+        cached = {}
+        for start in range(0, len(hashes), 500):  # SQLite 바인딩 변수 개수 제한
+            chunk = hashes[start:start + 500]
+            cached.update(self.conn.execute(
+                f"SELECT text_hash, tokens FROM token_cache WHERE fingerprint = ? "
+                f"AND text_hash IN ({', '.join('?' * len(chunk))})",
+                [fingerprint, *chunk],
+            ).fetchall())
+        return cached
+
+    def cache_tokens(self, fingerprint: str, rows: Iterable[Tuple[str, str]]) -> None:
+        """(text_hash, tokens) 목록을 토큰 캐시에 저장"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO token_cache (text_hash, fingerprint, tokens) VALUES (?, ?, ?)",
+                ((hash_, fingerprint, tokens) for hash_, tokens in rows),
+            )
+
+    def review_digests(self) -> Dict[str, str]:
+        """
+        식당별 저장된 리뷰 집합의 해시 {restaurant_id: digest}.
+        (restaurant_id, review_key) 기본 키 순서로 읽으므로 리뷰 원문은 읽지 않으며,
+        새 리뷰가 추가된 식당만 값이 바뀝니다 (refresh.py의 변경 감지에 사용).
+        """
+        digests = {}
+        cursor = self.conn.execute("SELECT restaurant_id, review_key FROM reviews ORDER BY restaurant_id, review_key")
+        current, digest = None, None
+        for restaurant_id, hash_ in cursor:
+            if restaurant_id != current:
+                if current is not None:
+                    digests[current] = digest.hexdigest()
+                current, digest = restaurant_id, hashlib.blake2b(digest_size=16)
+            digest.update(hash_.encode("ascii"))
+        if current is not None:
+            digests[current] = digest.hexdigest()
+        return digests
+
+    def count_reviews(self, restaurant_id: Optional[str] = None) -> int:
+        if restaurant_id is None:
+            return self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM reviews WHERE restaurant_id = ?", (restaurant_id,)).fetchone()[0]
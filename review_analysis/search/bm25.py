@@ -0,0 +1,227 @@
+"""
+리뷰 텍스트 BM25 검색 색인 모듈입니다.
+
+리뷰 저장소의 정제된 리뷰(cleaned_text, text_normalizer로 토큰화한 결과)를 식당 단위 문서로 묶어
+역색인(inverted index)을 만들고, 포스팅 리스트를 numpy 배열 파일로 저장합니다.
+API 서버는 배열 파일을 np.load(mmap_mode="r")로 메모리 매핑하여 필요한 단어의 포스팅만 읽으므로
+색인 크기와 관계없이 빠르게 시작하고, 여러 워커 프로세스가 같은 페이지 캐시를 공유합니다.
+
+색인 디렉터리 구성:
+  - meta.json:        BM25 파라미터(k1, b), 평균 문서 길이, 문서 수, 질의 토큰화용 정규화 설정
+  - vocab.json:       {단어: [포스팅 시작, 끝]}
+  - doc_ids.json:     문서 번호 -> restaurant_id
+  - postings_doc.npy: 단어별로 이어 붙인 문서 번호 (int32)
+  - postings_tf.npy:  같은 위치의 단어 빈도 (uint16)
+  - doc_len.npy:      문서(식당) 길이 (float32)
+
+색인을 다시 만들 때는 새 버전 디렉터리(<색인>.v<번호>)에 모든 파일을 쓴 뒤 색인 경로의 심볼릭 링크를
+원자적으로 교체하고, 읽는 쪽은 링크를 한 번만 해석해 모든 파일을 같은 버전에서 읽습니다.
+(열려 있는 색인을 위해 직전 버전 하나는 남겨 두고, 로딩 시 meta.json/vocab.json과 배열 크기를 검증)
+
+    python -m review_analysis.search.bm25 --store ../../database/reviews.db --output ../../database/review_index
+"""
+
+import json
+import math
+import os
+import shutil
+import sys
+import time
+from array import array
+from argparse import ArgumentParser
+from collections import Counter, defaultdict
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from review_analysis.preprocessing.text_normalizer import TextNormalizer
+from review_analysis.review_store import ReviewStore
+
+K1 = 1.2
+B = 0.75
+MAX_TF = np.iinfo(np.uint16).max
+
+
+def build_index(store_path: str, output_dir: str, normalizer: Optional[TextNormalizer] = None,
+                k1: float = K1, b: float = B, restaurant_ids: Optional[Set[str]] = None) -> int:
+    """
+    리뷰 저장소에서 식당별 BM25 색인을 만들어 output_dir에 저장하고 문서(식당) 수를 반환.
+    리뷰는 restaurant_id 순서로 스트리밍하므로 한 번에 한 식당의 리뷰만 메모리에 올립니다.
+    새 색인은 버전 디렉터리에 만든 뒤 링크를 교체하므로, 만드는 동안에도 기존 색인을 계속 읽을 수 있습니다.
+    restaurant_ids를 넘기면 그 식당들만 색인합니다 (폐업 등으로 목록에서 빠진 식당의 리뷰 제외).
+    """
+    normalizer = normalizer or TextNormalizer()
+    fingerprint = normalizer.fingerprint
+    doc_ids: List[str] = []
+    doc_len = array("f")
+    postings: Dict[str, Tuple[array, array]] = defaultdict(lambda: (array("i"), array("H")))
+
+    with ReviewStore(store_path) as store:
+        for restaurant_id, reviews in groupby(store.iter_reviews(), key=lambda r: r["restaurant_id"]):
+            if restaurant_ids is not None and restaurant_id not in restaurant_ids:
+                continue
+            counts = Counter()
+            for review in reviews:
+                # 다른 설정으로 정제된 리뷰는 질의(meta.json의 normalizer)와 같은 설정으로 다시 토큰화
+                tokens = review["cleaned_text"] if review["cleaned_fingerprint"] == fingerprint else None
+                counts.update(tokens.split() if tokens is not None else normalizer.tokenize(review["text"]))
+            if not counts:
+                continue
+            doc = len(doc_ids)
+            doc_ids.append(restaurant_id)
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                docs, tfs = postings[term]
+                docs.append(doc)
+                tfs.append(min(tf, MAX_TF))
+
+    vocab = {}
+    postings_doc = np.empty(sum(len(d) for d, _ in postings.values()), dtype=np.int32)
+    postings_tf = np.empty(len(postings_doc), dtype=np.uint16)
+    offset = 0
+    for term in sorted(postings):
+        docs, tfs = postings[term]
+        postings_doc[offset:offset + len(docs)] = docs
+        postings_tf[offset:offset + len(tfs)] = tfs
+        vocab[term] = [offset, offset + len(docs)]
+        offset += len(docs)
+
+    lengths = np.frombuffer(doc_len, dtype=np.float32) if doc_ids else np.zeros(0, dtype=np.float32)
+    meta = {
+        "k1": k1, "b": b,
+        "n_docs": len(doc_ids),
+        "avgdl": float(lengths.mean()) if len(lengths) else 0.0,
+        "normalizer": normalizer.config(),
+    }
+
+    write_index_dir(output_dir,
+                    {"postings_doc.npy": postings_doc, "postings_tf.npy": postings_tf, "doc_len.npy": lengths},
+                    {"meta.json": meta, "vocab.json": vocab, "doc_ids.json": doc_ids})
+    return len(doc_ids)
+
+
+def index_versions(output_dir: str) -> List[str]:
+    """색인 버전 디렉터리 목록 (<output_dir>.v<번호>, 오래된 순)"""
+    prefix = os.path.basename(output_dir) + ".v"
+    parent = os.path.dirname(output_dir) or "."
+    versions = [name for name in os.listdir(parent) if name.startswith(prefix) and name[len(prefix):].isdigit()]
+    return [os.path.join(parent, name) for name in sorted(versions, key=lambda name: int(name[len(prefix):]))]
+
+
+def write_index_dir(output_dir: str, arrays: Dict[str, np.ndarray], documents: Dict[str, object]) -> None:
+    """
+    새 버전 디렉터리에 배열(.npy)/JSON 파일을 모두 쓴 뒤 output_dir 심볼릭 링크를 원자적으로 교체.
+    교체 도중 색인을 여는 쪽이 이전 버전의 JSON과 새 버전의 배열을 함께 읽는 일이 없도록 함
+    """
+    output_dir = output_dir.rstrip(os.sep)
+    version_dir = f"{output_dir}.v{time.time_ns()}"
+    os.makedirs(version_dir)
+    for name, values in arrays.items():
+        np.save(os.path.join(version_dir, name), values)
+    for name, value in documents.items():
+        with open(os.path.join(version_dir, name), "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+
+    if os.path.isdir(output_dir) and not os.path.islink(output_dir):
+        # 이전 형식(링크가 아닌 실제 디렉터리) 색인은 가장 오래된 버전으로 옮김 (처음 한 번만)
+        os.replace(output_dir, f"{output_dir}.v0")
+    link_tmp = output_dir + ".link.tmp"
+    if os.path.lexists(link_tmp):
+        os.remove(link_tmp)
+    os.symlink(os.path.basename(version_dir), link_tmp)  # 상대 경로 링크 (디렉터리째 옮겨도 유지)
+    os.replace(link_tmp, output_dir)
+
+    # 현재 버전과 직전 버전(이미 색인을 열고 있는 프로세스용)만 남김
+    for old_dir in index_versions(output_dir)[:-2]:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def check_index_shapes(index_dir: str, n_docs: int, expected: Dict[str, int], actual: Dict[str, int]) -> None:
+    """메타데이터로 예상한 배열 길이와 실제 길이가 다르면 ValueError (서로 다른 버전의 파일이 섞인 경우)"""
+    mismatched = [f"{name} {actual[name]} != {length}" for name, length in expected.items() if actual[name] != length]
+    if mismatched:
+        raise ValueError(f"색인 파일이 서로 맞지 않습니다 ({index_dir}, 문서 {n_docs}개): {', '.join(mismatched)}")
+
+
+class BM25Index:
+    """
+    build_index로 만든 색인을 읽어 검색하는 클래스.
+
+    Args:
+        index_dir: 색인 디렉터리.
+        mmap: True면 포스팅 배열을 메모리 매핑 (기본값), False면 전부 메모리에 로딩.
+    """
+
+    def __init__(self, index_dir: str, mmap: bool = True) -> None:
+        mode = "r" if mmap else None
+        index_dir = os.path.realpath(index_dir)  # 링크를 한 번만 해석해 모든 파일을 같은 버전에서 읽음
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(index_dir, "vocab.json"), encoding="utf-8") as f:
+            self.vocab: Dict[str, List[int]] = json.load(f)
+        with open(os.path.join(index_dir, "doc_ids.json"), encoding="utf-8") as f:
+            self.doc_ids: List[str] = json.load(f)
+        self.postings_doc = np.load(os.path.join(index_dir, "postings_doc.npy"), mmap_mode=mode)
+        self.postings_tf = np.load(os.path.join(index_dir, "postings_tf.npy"), mmap_mode=mode)
+        # 문서 길이 정규화 항(k1 * (1 - b + b * dl / avgdl))은 로딩 시 한 번만 계산
+        doc_len = np.load(os.path.join(index_dir, "doc_len.npy"))
+        n_docs = self.meta["n_docs"]
+        check_index_shapes(index_dir, n_docs,
+                           {"doc_ids": n_docs, "doc_len": n_docs, "postings_doc": self.vocab_end(),
+                            "postings_tf": self.vocab_end()},
+                           {"doc_ids": len(self.doc_ids), "doc_len": len(doc_len),
+                            "postings_doc": len(self.postings_doc), "postings_tf": len(self.postings_tf)})
+        k1, b, avgdl = self.meta["k1"], self.meta["b"], self.meta["avgdl"] or 1.0
+        self.length_norm = (k1 * (1 - b + b * doc_len / avgdl)).astype(np.float32)
+        self.normalizer = TextNormalizer.from_config(self.meta["normalizer"])
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def vocab_end(self) -> int:
+        """vocab.json 기준 포스팅 배열 길이 (단어 구간의 최대 끝 위치)"""
+        return max((end for _, end in self.vocab.values()), default=0)
+
+    def idf(self, df: int) -> float:
+        n = len(self.doc_ids)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search_tokens(self, tokens: Sequence[str], k: int = 10) -> List[Tuple[str, float]]:
+        """토큰 목록으로 검색하여 점수 상위 k개 (restaurant_id, 점수) 반환"""
+        if not self.doc_ids:
+            return []
+        k1 = self.meta["k1"]
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for term, qtf in Counter(tokens).items():
+            span = self.vocab.get(term)
+            if span is None:
+                continue
+            start, end = span
+            docs = self.postings_doc[start:end]
+            tf = self.postings_tf[start:end].astype(np.float32)
+            scores[docs] += qtf * self.idf(end - start) * tf * (k1 + 1) / (tf + self.length_norm[docs])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(scores[matched], -k)[-k:]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self.doc_ids[i], float(scores[i])) for i in matched]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """질의 문자열을 색인과 같은 설정으로 토큰화하여 검색"""
+        return self.search_tokens(self.normalizer.tokenize(query), k)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Build the BM25 review index from the review store.")
+    parser.add_argument("--store", default="../../database/reviews.db", help="Review store (SQLite).")
+    parser.add_argument("--output", default="../../database/review_index", help="Index directory.")
+    parser.add_argument("--query", help="Run a test query against the built index.")
+    args = parser.parse_args()
+
+    print(f"BM25 색인 생성 완료: 식당 {build_index(args.store, args.output)}개 -> {args.output}")
+    if args.query:
+        for restaurant_id, score in BM25Index(args.output).search(args.query):
+            print(f"{score:8.3f}  {restaurant_id}")
@@ -0,0 +1,268 @@
+"""
+문장 임베딩 모델 평가 및 속도 비교 모듈입니다. (embedding_test.ipynb의 영어 예제 비교를 대체)
+
+리뷰 저장소의 실제 한국어 리뷰로 평가 데이터를 만들고, 후보 모델마다 CPU에서 아래 항목을 측정합니다.
+  - 검색 품질: recall@1/5/10, MRR (질의로 정답 식당을 찾는지)
+  - 속도: 콜드 로딩 시간(모델 로딩), 문서 인코딩 처리량(문장/초), 질의 1건 인코딩 지연(p50)
+  - 메모리: 모델 로딩 및 인코딩 후 프로세스 RSS 증가량, 프로세스 최대 RSS
+
+모델마다 새 프로세스(spawn)에서 평가하므로 앞 모델의 메모리나 캐시가 다음 모델 측정에 섞이지 않고,
+torch/sentence_transformers import는 시간 측정 전에 끝내므로 로딩 시간은 모델 로딩만 포함합니다.
+
+평가 데이터 (둘 중 하나):
+  - 기본: 식당마다 리뷰 한 개를 질의로 빼고, 나머지 최근 리뷰로 식당 벡터를 만들어 원래 식당을 찾는지 평가
+  - --pairs: {"query": "분위기 좋은 데이트", "relevant": ["r...", ...]} 형식의 JSONL (직접 만든 질의-정답 쌍)
+
+    python -m review_analysis.search.embedding_eval --store ../../database/reviews.db --restaurants 500 \\
+        --models sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2 jhgan/ko-sroberta-multitask \\
+        --min-recall 0.6 --output embedding_eval.json
+"""
+
+import gc
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from review_analysis.review_store import ReviewStore
+from review_analysis.search.vector_index import (
+    DEFAULT_MODEL, REVIEWS_PER_RESTAURANT, load_model, make_encoder, restaurant_vectors, top_k,
+)
+
+DEFAULT_MODELS: List[str] = [
+    DEFAULT_MODEL,
+    "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+    "jhgan/ko-sroberta-multitask",
+    "intfloat/multilingual-e5-small",
+]
+K_VALUES = (1, 5, 10)
+QUERY_LATENCY_SAMPLES = 50
+
+# (식당 id 목록, 식당별 리뷰 목록), [(질의, 정답 식당 id 집합)]
+Corpus = Tuple[List[str], List[List[str]]]
+Queries = List[Tuple[str, set]]
+
+
+def rss_mb() -> float:
+    """현재 프로세스 RSS(MB) (/proc가 없으면 최대 RSS로 대신함)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS(MB) (Linux ru_maxrss는 KB, macOS는 바이트 단위)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def preload_libraries(threads: Optional[int] = None) -> None:
+    """모델 로딩 시간에 한 번뿐인 라이브러리 import 시간이 섞이지 않도록 미리 import (스레드 수 설정 포함)"""
+    try:
+        import torch
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        return
+    if threads:
+        torch.set_num_threads(threads)
+
+
+def load_corpus(store_path: str, restaurant_ids: Optional[set] = None, limit: Optional[int] = None,
+                reviews_per_restaurant: int = REVIEWS_PER_RESTAURANT) -> Dict[str, List[str]]:
+    """리뷰 저장소에서 식당별 최근 리뷰 목록 {restaurant_id: [리뷰, ...]}"""
+    corpus = {}
+    with ReviewStore(store_path) as store:
+        for restaurant_id, reviews in groupby(store.iter_reviews(), key=lambda r: r["restaurant_id"]):
+            texts = [r["text"] for r in islice(reviews, reviews_per_restaurant)]
+            for _ in reviews:
+                pass
+            if restaurant_ids is None or restaurant_id in restaurant_ids:
+                corpus[restaurant_id] = texts
+            if limit is not None and len(corpus) >= limit:
+                break
+    return corpus
+
+
+def heldout_pairs(corpus: Dict[str, List[str]], restaurants: int, min_reviews: int = 5,
+                  seed: int = 42) -> Tuple[Corpus, Queries]:
+    """식당마다 리뷰 한 개를 질의로 빼서 (평가용 식당 문서, [(질의, {정답 식당})]) 생성"""
+    rng = random.Random(seed)
+    eligible = sorted(rid for rid, texts in corpus.items() if len(texts) >= min_reviews)
+    sample = rng.sample(eligible, min(restaurants, len(eligible)))
+
+    ids, documents, queries = [], [], []
+    for rid in sample:
+        texts = list(corpus[rid])
+        query = texts.pop(rng.randrange(len(texts)))
+        ids.append(rid)
+        documents.append(texts)
+        queries.append((query, {rid}))
+    return (ids, documents), queries
+
+
+def load_pairs(path: str) -> Queries:
+    """{"query": ..., "relevant": [...]} JSONL 평가 쌍 로딩"""
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                pair = json.loads(line)
+                queries.append((pair["query"], set(pair["relevant"])))
+    return queries
+
+
+def retrieval_metrics(scores: np.ndarray, ids: Sequence[str], queries: Queries) -> Dict[str, float]:
+    """(질의 수, 식당 수) 유사도 행렬로 recall@k와 MRR 계산"""
+    k_max = max(K_VALUES)
+    recalls = {k: 0.0 for k in K_VALUES}
+    reciprocal_ranks = 0.0
+    for row, (_, relevant) in zip(scores, queries):
+        ranked = [ids[i] for i in top_k(row, k_max)]
+        for k in K_VALUES:
+            recalls[k] += len(relevant.intersection(ranked[:k])) / len(relevant)
+        # MRR은 전체 순위 기준 (상위 k 밖이어도 계산)
+        relevant_scores = [row[i] for i, rid in enumerate(ids) if rid in relevant]
+        if relevant_scores:
+            rank = int((row > max(relevant_scores)).sum()) + 1
+            reciprocal_ranks += 1 / rank
+    n = max(len(queries), 1)
+    result = {f"recall@{k}": recalls[k] / n for k in K_VALUES}
+    result["mrr"] = reciprocal_ranks / n
+    return result
+
+
+def evaluate_model(model_name: str, corpus: Corpus, queries: Queries,
+                   load: Callable[[str], object] = load_model) -> Dict[str, float]:
+    """
+    모델 하나의 로딩 시간, 메모리, 처리량, 질의 지연, 검색 품질 측정 (현재 프로세스에서).
+    모델끼리 비교할 때는 evaluate_model_isolated로 모델마다 새 프로세스에서 실행해야 함
+    """
+    gc.collect()
+    rss_before = rss_mb()
+
+    start = time.perf_counter()
+    model = load(model_name)
+    load_s = time.perf_counter() - start
+    encode_passage = make_encoder(model, model_name, "passage")
+    encode_query = make_encoder(model, model_name, "query")
+
+    ids, documents = corpus
+    n_sentences = sum(len(texts) for texts in documents)
+    start = time.perf_counter()
+    doc_vectors = restaurant_vectors(encode_passage, documents)
+    encode_s = time.perf_counter() - start
+
+    query_vectors = encode_query([query for query, _ in queries])
+    latencies = []
+    for query, _ in queries[:QUERY_LATENCY_SAMPLES]:
+        start = time.perf_counter()
+        encode_query([query])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        "model": model_name,
+        "dim": int(doc_vectors.shape[1]),
+        "load_s": load_s,
+        "rss_mb": rss_mb() - rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "sentences_per_s": n_sentences / encode_s if encode_s else 0.0,
+        "query_p50_ms": float(np.median(latencies)) if latencies else 0.0,
+    }
+    result.update(retrieval_metrics(query_vectors @ doc_vectors.T, ids, queries))
+    del model, encode_passage, encode_query
+    gc.collect()
+    return result
+
+
+def _evaluate_in_child(model_name: str, corpus: Corpus, queries: Queries, threads: Optional[int],
+                       load: Callable[[str], object]) -> Dict[str, float]:
+    preload_libraries(threads)
+    return evaluate_model(model_name, corpus, queries, load)
+
+
+def evaluate_model_isolated(model_name: str, corpus: Corpus, queries: Queries, threads: Optional[int] = None,
+                            load: Callable[[str], object] = load_model) -> Dict[str, float]:
+    """
+    새 프로세스(spawn)에서 라이브러리를 미리 import한 뒤 evaluate_model 실행.
+    로딩 시간은 모델 로딩만, rss_mb는 import 이후 증가량, peak_rss_mb는 그 프로세스의 최대 RSS
+    """
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_evaluate_in_child, model_name, corpus, queries, threads, load).result()
+
+
+def print_table(results: List[Dict[str, float]]) -> None:
+    """모델별 결과 비교 표 출력"""
+    columns = [("model", "model", "<48", "{}"), ("dim", "dim", ">5", "{}"), ("load_s", "load_s", ">8", "{:.2f}"),
+               ("rss_mb", "rss_mb", ">8", "{:.0f}"), ("peak_rss_mb", "peak_mb", ">8", "{:.0f}"),
+               ("sentences_per_s", "sent/s", ">9", "{:.0f}"),
+               ("query_p50_ms", "q_p50ms", ">9", "{:.1f}")]
+    columns += [(f"recall@{k}", f"R@{k}", ">7", "{:.3f}") for k in K_VALUES] + [("mrr", "MRR", ">7", "{:.3f}")]
+    print("".join(f"{label:{align}}" for _, label, align, _ in columns))
+    for result in results:
+        print("".join(f"{fmt.format(result[key]):{align}}" for key, _, align, fmt in columns))
+
+
+def recommend(results: List[Dict[str, float]], min_recall: float, k: int = 10) -> Optional[dict]:
+    """recall@k가 기준 이상인 모델 중 처리량이 가장 높은 모델"""
+    passing = [r for r in results if r[f"recall@{k}"] >= min_recall]
+    return max(passing, key=lambda r: r["sentences_per_s"]) if passing else None
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Compare sentence-embedding models on Korean review retrieval (CPU).")
+    parser.add_argument("--store", default="../../database/reviews.db", help="Review store (SQLite).")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, help="sentence-transformers model names.")
+    parser.add_argument("--pairs", help="JSONL of {query, relevant} pairs (default: held-out reviews).")
+    parser.add_argument("--restaurants", type=int, default=300, help="Restaurants sampled for held-out evaluation.")
+    parser.add_argument("--threads", type=int, help="torch CPU threads (default: library default).")
+    parser.add_argument("--min-recall", type=float, default=0.5, help="recall@10 quality bar for the recommendation.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    args = parser.parse_args()
+
+    if args.pairs:
+        queries = load_pairs(args.pairs)
+        relevant = set().union(*(r for _, r in queries))
+        corpus_map = load_corpus(args.store, limit=None)
+        # 정답 식당 + 같은 수의 무작위 식당을 검색 대상으로 사용
+        others = sorted(set(corpus_map) - relevant)
+        extra = random.Random(args.seed).sample(others, min(len(others), max(len(relevant), args.restaurants)))
+        ids = [rid for rid in sorted(relevant) + extra if rid in corpus_map]
+        corpus = (ids, [corpus_map[rid] for rid in ids])
+    else:
+        corpus, queries = heldout_pairs(load_corpus(args.store), args.restaurants, seed=args.seed)
+    print(f"평가 데이터: 식당 {len(corpus[0])}개, 질의 {len(queries)}개")
+
+    results = []
+    for model_name in args.models:
+        print(f"[INFO] {model_name} 평가 중...")
+        results.append(evaluate_model_isolated(model_name, corpus, queries, args.threads))
+    print_table(results)
+
+    best = recommend(results, args.min_recall)
+    if best:
+        print(f"[추천] recall@10 >= {args.min_recall} 중 가장 빠른 모델: {best['model']}")
+    else:
+        print(f"[추천] recall@10 >= {args.min_recall}을 만족하는 모델이 없습니다.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] 결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+식당 벡터 색인 양자화 모듈입니다.
+
+float32 벡터 대신 작은 코드만 메모리에 올려 후보를 고르고, 상위 후보만 디스크의 float32 벡터
+(vectors.npy, 메모리 매핑)로 다시 점수를 계산(rescoring)합니다.
+  - int8 스칼라 양자화: 차원별 min/max로 0~255 구간에 매핑 (메모리 1/4)
+  - PQ(product quantization): 벡터를 m개 부분 공간으로 나누고 부분마다 256개 중심점 번호(uint8)로 저장
+    (기본 m = 차원 / 4로 메모리 1/16, 768차원에서 m=48이면 벡터당 48바이트로 1/64)
+
+상위 후보 재계산은 VectorIndex.search_vector에서 처리합니다 (rescore개 후보를 float32로 다시 계산).
+
+    # 기존 벡터 색인에 양자화 코드를 더한 새 버전을 만들고 정확도(recall@k, 양자화 전 검색 대비)를 측정
+    python -m review_analysis.search.quantization --index ../../database/vector_index --method pq
+"""
+
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from review_analysis.search.bm25 import write_index_dir  # noqa: E402
+
+PQ_CENTROIDS = 256
+PQ_TRAIN_SAMPLES = 20000
+PQ_ITERATIONS = 20
+SCORE_CHUNK = 65536  # 코드 -> float32 변환을 이 행 수 단위로 나누어 임시 메모리 제한
+
+
+def fit_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """차원별 (offset, scale): x ≈ offset + scale * code, code는 0~255"""
+    low = vectors.min(axis=0)
+    high = vectors.max(axis=0)
+    scale = np.maximum(high - low, 1e-12) / 255
+    return low.astype(np.float32), scale.astype(np.float32)
+
+
+def encode_int8(vectors: np.ndarray, offset: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    codes = np.rint((vectors - offset) / scale)
+    return np.clip(codes, 0, 255).astype(np.uint8)
+
+
+def int8_scores(query: np.ndarray, codes: np.ndarray, offset: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """q · (offset + scale * code) = (q * scale) · code + q · offset"""
+    weights = (query * scale).astype(np.float32)
+    bias = float(query @ offset)
+    scores = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), SCORE_CHUNK):
+        scores[start:start + SCORE_CHUNK] = codes[start:start + SCORE_CHUNK].astype(np.float32) @ weights
+    return scores + bias
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """numpy k-means (데이터가 k개보다 적으면 중복 선택으로 채움)"""
+    centroids = data[rng.choice(len(data), k, replace=len(data) < k)].copy()
+    for _ in range(iterations):
+        distances = (data ** 2).sum(1, keepdims=True) - 2 * data @ centroids.T + (centroids ** 2).sum(1)
+        assign = distances.argmin(1)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # 빈 군집은 무작위 점으로 다시 시작
+        centroids[~filled] = data[rng.integers(len(data), size=int((~filled).sum()))]
+    return centroids
+
+
+def fit_pq(vectors: np.ndarray, subspaces: int, seed: int = 42) -> np.ndarray:
+    """(subspaces, 256, 부분 차원) 중심점 학습 (최대 PQ_TRAIN_SAMPLES개 벡터 사용)"""
+    dim = vectors.shape[1]
+    if dim % subspaces:
+        raise ValueError(f"차원({dim})이 subspaces({subspaces})로 나누어 떨어지지 않습니다.")
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), PQ_TRAIN_SAMPLES), replace=False)]
+    sample = np.asarray(sample, dtype=np.float32)
+    sub = dim // subspaces
+    return np.stack([
+        kmeans(sample[:, j * sub:(j + 1) * sub], PQ_CENTROIDS, PQ_ITERATIONS, rng) for j in range(subspaces)
+    ]).astype(np.float32)
+
+
+def encode_pq(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    subspaces, _, sub = centroids.shape
+    codes = np.empty((len(vectors), subspaces), dtype=np.uint8)
+    for start in range(0, len(vectors), SCORE_CHUNK):
+        chunk = np.asarray(vectors[start:start + SCORE_CHUNK], dtype=np.float32)
+        for j in range(subspaces):
+            part = chunk[:, j * sub:(j + 1) * sub]
+            distances = (part ** 2).sum(1, keepdims=True) - 2 * part @ centroids[j].T + (centroids[j] ** 2).sum(1)
+            codes[start:start + len(chunk), j] = distances.argmin(1)
+    return codes
+
+
+def pq_scores(query: np.ndarray, codes: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """비대칭 거리 계산(ADC): 부분 공간별 질의-중심점 내적표를 만든 뒤 코드로 찾아 더함"""
+    subspaces, n_centroids, sub = centroids.shape
+    table = np.einsum("jcd,jd->jc", centroids, query.reshape(subspaces, sub)).astype(np.float32).ravel()
+    offsets = np.arange(subspaces, dtype=np.intp) * n_centroids  # 부분 공간 j의 코드 c -> table[j * 256 + c]
+    scores = np.empty(len(codes), dtype=np.float32)
+    chunk = max(SCORE_CHUNK // subspaces, 1)
+    for start in range(0, len(codes), chunk):
+        scores[start:start + chunk] = table[codes[start:start + chunk] + offsets].sum(1)
+    return scores
+
+
+def quantize_vectors(vectors: np.ndarray, method: str, subspaces: Optional[int] = None,
+                     seed: int = 42) -> Tuple[Dict[str, np.ndarray], dict]:
+    """벡터를 양자화하여 ({파일 이름: 배열}, meta.json의 quantization) 반환"""
+    if method == "int8":
+        offset, scale = fit_int8(np.asarray(vectors))
+        codes = encode_int8(np.asarray(vectors), offset, scale)
+        return {"int8_codes.npy": codes, "int8_offset.npy": offset, "int8_scale.npy": scale}, {"method": "int8"}
+    if method == "pq":
+        subspaces = subspaces or max(vectors.shape[1] // 4, 1)
+        centroids = fit_pq(vectors, subspaces, seed)
+        codes = encode_pq(vectors, centroids)
+        return {"pq_codes.npy": codes, "pq_centroids.npy": centroids}, {"method": "pq", "subspaces": subspaces}
+    raise ValueError(f"지원하지 않는 양자화 방식: {method}")
+
+
+def quantize_index(index_dir: str, method: str, subspaces: Optional[int] = None, seed: int = 42) -> Dict[str, float]:
+    """
+    현재 벡터 색인에 양자화 코드를 더한 새 버전을 만들고 색인 링크를 교체 (bm25.write_index_dir).
+    API 서버가 열어 둔 버전의 파일은 건드리지 않으므로 새 코드와 이전 offset/scale이 섞이지 않습니다.
+    subspaces: PQ 부분 공간 수 (기본값: 차원 / 4, 부분 공간당 4차원)
+    반환값: 코드 크기와 float32 대비 압축률
+    """
+    current_dir = os.path.realpath(index_dir)  # 링크를 한 번만 해석해 같은 버전에서 읽음
+    with open(os.path.join(current_dir, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(os.path.join(current_dir, "doc_ids.json"), encoding="utf-8") as f:
+        doc_ids = json.load(f)
+    vectors = np.load(os.path.join(current_dir, "vectors.npy"), mmap_mode="r")
+    if not len(vectors):
+        raise ValueError("빈 색인은 양자화할 수 없습니다.")
+    arrays, quantization = quantize_vectors(vectors, method, subspaces, seed)
+    # 이전 방식의 코드 파일은 새 버전에 복사하지 않음 (meta.json의 quantization과 코드 파일이 항상 짝을 이룸)
+    meta["quantization"] = quantization
+    write_index_dir(index_dir, {"vectors.npy": vectors, **arrays}, {"meta.json": meta, "doc_ids.json": doc_ids})
+
+    code_bytes = sum(values.nbytes for values in arrays.values())
+    return {"code_mb": code_bytes / 1024 / 1024, "compression": vectors.nbytes / max(code_bytes, 1)}
+
+
+class QuantizedScorer:
+    """
+    색인 디렉터리의 양자화 코드로 전체 식당 근사 점수를 계산.
+    코드는 메모리 매핑으로 열어 API 워커 프로세스가 여러 개여도 같은 페이지를 공유합니다.
+    """
+
+    def __init__(self, index_dir: str, quantization: dict) -> None:
+        self.method = quantization["method"]
+        load = lambda name: np.load(os.path.join(index_dir, name), mmap_mode="r")
+        if self.method == "int8":
+            self.codes, self.offset, self.scale = load("int8_codes.npy"), load("int8_offset.npy"), load("int8_scale.npy")
+        elif self.method == "pq":
+            self.codes, self.centroids = load("pq_codes.npy"), load("pq_centroids.npy")
+        else:
+            raise ValueError(f"지원하지 않는 양자화 방식: {self.method}")
+
+    @property
+    def nbytes(self) -> int:
+        extra = self.offset.nbytes + self.scale.nbytes if self.method == "int8" else self.centroids.nbytes
+        return self.codes.nbytes + extra
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        if self.method == "int8":
+            return int8_scores(query, self.codes, self.offset, self.scale)
+        return pq_scores(query, self.codes, self.centroids)
+
+
+def measure_recall(index_dir: str, queries: int = 200, k: int = 10, rescore: Optional[int] = None,
+                   seed: int = 42) -> Dict[str, float]:
+    """
+    색인 벡터 일부에 잡음을 섞어 질의로 사용하고, 양자화 검색 상위 k개가 float32 전체 검색 상위 k개와
+    얼마나 겹치는지(recall@k) 및 평균 검색 시간을 측정
+    """
+    from review_analysis.search.vector_index import VectorIndex, normalize_rows
+
+    quantized = VectorIndex(index_dir)
+    if quantized.scorer is None:
+        raise ValueError("양자화 코드가 없는 색인입니다. quantize_index를 먼저 실행하세요.")
+    if rescore is not None:
+        quantized.rescore = rescore
+    exact = VectorIndex(index_dir, quantized=False)
+
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(exact), min(queries, len(exact)), replace=False)
+    samples = np.asarray(exact.vectors[np.sort(rows)], dtype=np.float32)
+    samples = normalize_rows(samples + rng.normal(0, 0.05, samples.shape).astype(np.float32))
+
+    hits, elapsed = 0, {"exact": 0.0, "quantized": 0.0}
+    for query in samples:
+        start = time.perf_counter()
+        truth = {rid for rid, _ in exact.search_vector(query, k)}
+        elapsed["exact"] += time.perf_counter() - start
+        start = time.perf_counter()
+        found = {rid for rid, _ in quantized.search_vector(query, k)}
+        elapsed["quantized"] += time.perf_counter() - start
+        hits += len(truth & found)
+
+    n = max(len(samples), 1)
+    return {
+        f"recall@{k}": hits / (n * k),
+        "exact_ms": elapsed["exact"] / n * 1000,
+        "quantized_ms": elapsed["quantized"] / n * 1000,
+        "float32_mb": exact.vectors.nbytes / 1024 / 1024,
+        "resident_mb": quantized.scorer.nbytes / 1024 / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Add int8 or PQ codes to a vector index and measure recall.")
+    parser.add_argument("--index", default="../../database/vector_index", help="Vector index directory.")
+    parser.add_argument("--method", choices=["int8", "pq"], default="int8", help="Quantization method.")
+    parser.add_argument("--subspaces", type=int, help="PQ subspaces, must divide the dimension (default: dim / 4).")
+    parser.add_argument("--rescore", type=int, help="Candidates rescored with float32 vectors (default: index setting).")
+    parser.add_argument("--queries", type=int, default=200, help="Queries for the recall measurement.")
+    args = parser.parse_args()
+
+    size = quantize_index(args.index, args.method, args.subspaces)
+    print(f"양자화 완료({args.method}): 코드 {size['code_mb']:.1f}MB, float32 대비 {size['compression']:.1f}배 축소")
+    report = measure_recall(args.index, args.queries, rescore=args.rescore)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,277 @@
+"""
+리뷰 임베딩 기반 식당 벡터 색인 모듈입니다.
+
+식당마다 최근 리뷰(최대 REVIEWS_PER_RESTAURANT개)를 문장 임베딩 모델로 인코딩하고,
+리뷰 벡터의 평균을 L2 정규화한 값을 식당 벡터로 사용합니다.
+벡터는 float32 행렬(vectors.npy)로 저장하고 검색 시 np.load(mmap_mode="r")로 열어
+질의 벡터와의 내적(= 코사인 유사도)으로 상위 k개를 찾습니다.
+
+색인 디렉터리 구성:
+  - meta.json:    모델 이름, 차원, 식당 수
+  - doc_ids.json: 행 번호 -> restaurant_id
+  - vectors.npy:  (식당 수, 차원) float32, 행마다 L2 정규화됨
+  - int8_*.npy / pq_*.npy: 양자화 코드 (선택, quantization.py). 있으면 코드로 후보를 고르고
+    상위 후보만 float32 벡터로 다시 계산하므로 메모리에는 코드만 상주합니다.
+
+    python -m review_analysis.search.vector_index --store ../../database/reviews.db --output ../../database/vector_index \\
+        --quantize int8
+"""
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from itertools import groupby, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from review_analysis.review_store import ReviewStore
+from review_analysis.search.bm25 import check_index_shapes, write_index_dir
+from review_analysis.search.quantization import QuantizedScorer, quantize_index, quantize_vectors
+
+# 한국어 리뷰를 다루므로 다국어 모델을 기본값으로 사용 (embedding_test.ipynb의 영어 모델과 같은 계열)
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+REVIEWS_PER_RESTAURANT = 50
+ENCODE_BATCH_SIZE = 64
+RESTAURANTS_PER_CHUNK = 256  # 이 개수의 식당 리뷰를 모아 한 번에 인코딩
+RESCORE_CANDIDATES = 100  # 양자화 색인에서 float32로 다시 계산할 후보 수 (k보다 작으면 k)
+
+# 질의/문서 앞에 접두어를 붙여 학습된 모델 (E5 계열)
+MODEL_PREFIXES = {
+    "intfloat/multilingual-e5-small": {"query": "query: ", "passage": "passage: "},
+    "intfloat/multilingual-e5-base": {"query": "query: ", "passage": "passage: "},
+}
+
+
+def load_model(model_name: str = DEFAULT_MODEL):
+    """sentence-transformers 모델을 CPU로 로딩 (무거운 라이브러리이므로 필요할 때만 import)"""
+    from sentence_transformers import SentenceTransformer  # pip install sentence-transformers
+
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def make_encoder(model, model_name: str, kind: str = "passage") -> Callable[[Sequence[str]], np.ndarray]:
+    """
+    문장 목록 -> L2 정규화된 float32 임베딩 행렬 함수를 반환.
+    kind는 "passage"(리뷰, 색인 생성) 또는 "query"(검색어)로, 접두어가 필요한 모델에서만 차이가 있습니다.
+    """
+    prefix = MODEL_PREFIXES.get(model_name, {}).get(kind, "")
+
+    def encode(texts: Sequence[str]) -> np.ndarray:
+        vectors = model.encode([prefix + text for text in texts], batch_size=ENCODE_BATCH_SIZE,
+                               normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+    return encode
+
+
+def load_encoder(model_name: str = DEFAULT_MODEL, kind: str = "passage") -> Callable[[Sequence[str]], np.ndarray]:
+    """load_model + make_encoder"""
+    return make_encoder(load_model(model_name), model_name, kind)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def restaurant_vectors(encode: Callable[[Sequence[str]], np.ndarray], documents: Sequence[Sequence[str]]) -> np.ndarray:
+    """식당별 리뷰 목록을 한 번에 인코딩하여 (식당 수, 차원) 식당 벡터(리뷰 벡터 평균, L2 정규화) 반환"""
+    vectors = encode([text for reviews in documents for text in reviews])
+    offsets = np.cumsum([0] + [len(reviews) for reviews in documents[:-1]])
+    return normalize_rows(np.add.reduceat(vectors, offsets, axis=0))
+
+
+def iter_restaurant_reviews(store: ReviewStore, reviews_per_restaurant: int = REVIEWS_PER_RESTAURANT,
+                            restaurant_ids: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, List[str]]]:
+    """
+    (restaurant_id, 최근 리뷰 텍스트 최대 reviews_per_restaurant개)를 restaurant_id 순서로 반환 (리뷰가 없는 식당은 제외).
+    restaurant_ids를 넘기면 저장소 전체를 읽지 않고 해당 식당만 조회합니다.
+    """
+    if restaurant_ids is not None:
+        for restaurant_id in sorted(set(restaurant_ids)):
+            texts = [r["text"] for r in islice(store.iter_reviews(restaurant_id=restaurant_id), reviews_per_restaurant)]
+            if texts:
+                yield restaurant_id, texts
+        return
+    # iter_reviews는 식당별 최신순 정렬이므로 앞에서부터 reviews_per_restaurant개가 최근 리뷰
+    for restaurant_id, reviews in groupby(store.iter_reviews(), key=lambda r: r["restaurant_id"]):
+        texts = [r["text"] for r in islice(reviews, reviews_per_restaurant)]
+        for _ in reviews:  # 나머지 리뷰는 건너뜀
+            pass
+        yield restaurant_id, texts
+
+
+def encode_restaurants(encode: Callable[[Sequence[str]], np.ndarray],
+                       restaurants: Iterable[Tuple[str, List[str]]]) -> Tuple[List[str], np.ndarray]:
+    """(restaurant_id, 리뷰 목록)을 RESTAURANTS_PER_CHUNK개씩 모아 인코딩하여 (restaurant_id 목록, 식당 벡터) 반환"""
+    doc_ids: List[str] = []
+    chunks: List[np.ndarray] = []
+
+    def flush(pending: List[Tuple[str, List[str]]]) -> None:
+        chunks.append(restaurant_vectors(encode, [reviews for _, reviews in pending]))
+        doc_ids.extend(restaurant_id for restaurant_id, _ in pending)
+
+    pending = []
+    for restaurant in restaurants:
+        pending.append(restaurant)
+        if len(pending) >= RESTAURANTS_PER_CHUNK:
+            flush(pending)
+            pending = []
+    if pending:
+        flush(pending)
+    return doc_ids, np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+
+
+def write_vector_index(output_dir: str, model_name: str, doc_ids: List[str], vectors: np.ndarray,
+                       quantization: Optional[dict] = None) -> None:
+    """
+    벡터 색인 새 버전을 쓰고 색인 링크를 교체 (bm25.write_index_dir).
+    quantization({"method", "subspaces"})을 넘기면 양자화 코드도 같은 버전에 함께 씀
+    """
+    vectors = vectors.astype(np.float32)
+    meta = {"model": model_name, "dim": int(vectors.shape[1]) if len(vectors) else 0, "n_docs": len(doc_ids)}
+    arrays = {"vectors.npy": vectors}
+    if quantization and len(vectors):
+        codes, meta["quantization"] = quantize_vectors(vectors, quantization["method"], quantization.get("subspaces"))
+        arrays.update(codes)
+    write_index_dir(output_dir, arrays, {"meta.json": meta, "doc_ids.json": doc_ids})
+
+
+def build_vector_index(store_path: str, output_dir: str, model_name: str = DEFAULT_MODEL,
+                       encode: Optional[Callable[[Sequence[str]], np.ndarray]] = None,
+                       reviews_per_restaurant: int = REVIEWS_PER_RESTAURANT,
+                       restaurant_ids: Optional[Iterable[str]] = None, quantization: Optional[dict] = None) -> int:
+    """
+    리뷰 저장소에서 식당 벡터 색인을 만들어 output_dir에 저장하고 식당 수를 반환.
+    encode를 넘기면 모델을 불러오지 않고 그 함수로 인코딩합니다 (평가/테스트용).
+    restaurant_ids를 넘기면 그 식당들만 색인하고, quantization을 넘기면 양자화 코드도 함께 저장합니다.
+    """
+    encode = encode or load_encoder(model_name)
+    with ReviewStore(store_path) as store:
+        doc_ids, vectors = encode_restaurants(
+            encode, iter_restaurant_reviews(store, reviews_per_restaurant, restaurant_ids))
+    write_vector_index(output_dir, model_name, doc_ids, vectors, quantization)
+    return len(doc_ids)
+
+
+def update_vector_index(store_path: str, output_dir: str, restaurant_ids: Iterable[str],
+                        removed_ids: Iterable[str] = (), model_name: str = DEFAULT_MODEL,
+                        encode: Optional[Callable[[Sequence[str]], np.ndarray]] = None,
+                        reviews_per_restaurant: int = REVIEWS_PER_RESTAURANT) -> int:
+    """
+    기존 색인에서 restaurant_ids 식당의 벡터만 다시 인코딩하고 removed_ids 식당은 제거하여 저장한 뒤 식당 수를 반환.
+    식당 벡터는 다른 식당과 독립적이므로 나머지 행은 그대로 복사합니다.
+    색인이 없거나 다른 모델로 만든 색인이면 restaurant_ids 식당만으로 새로 만듭니다 (build_vector_index).
+    양자화 코드가 있던 색인은 같은 방식으로 다시 양자화해 벡터와 같은 버전에 씁니다.
+    """
+    current_dir = os.path.realpath(output_dir)  # 기존 색인은 한 버전에서만 읽음
+    meta_path = os.path.join(current_dir, "meta.json")
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    quantization = (meta or {}).get("quantization")
+    if meta is None or meta["model"] != model_name:
+        n_docs = build_vector_index(store_path, output_dir, model_name, encode, reviews_per_restaurant, restaurant_ids,
+                                    quantization)
+    else:
+        restaurant_ids = set(restaurant_ids)
+        if restaurant_ids:
+            encode = encode or load_encoder(model_name)
+            with ReviewStore(store_path) as store:
+                new_ids, new_vectors = encode_restaurants(
+                    encode, iter_restaurant_reviews(store, reviews_per_restaurant, restaurant_ids))
+        else:
+            new_ids, new_vectors = [], np.zeros((0, meta["dim"]), dtype=np.float32)
+
+        with open(os.path.join(current_dir, "doc_ids.json"), encoding="utf-8") as f:
+            old_ids: List[str] = json.load(f)
+        drop = restaurant_ids | set(removed_ids)  # 다시 인코딩했지만 리뷰가 없어진 식당도 제외
+        keep = [i for i, restaurant_id in enumerate(old_ids) if restaurant_id not in drop]
+        old_vectors = np.load(os.path.join(current_dir, "vectors.npy"))
+        parts = [v for v in (old_vectors[keep] if len(old_vectors) else None, new_vectors) if v is not None and len(v)]
+        vectors = np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+        write_vector_index(output_dir, model_name, [old_ids[i] for i in keep] + new_ids, vectors, quantization)
+        n_docs = len(keep) + len(new_ids)
+    return n_docs
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개의 행 번호 (점수 내림차순)"""
+    if len(scores) > k:
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class VectorIndex:
+    """
+    build_vector_index로 만든 색인을 읽어 검색하는 클래스.
+
+    Args:
+        index_dir: 색인 디렉터리.
+        mmap: True면 벡터 행렬을 메모리 매핑 (기본값), False면 전부 메모리에 로딩.
+        quantized: True면 양자화 코드가 있을 때 코드로 후보를 고른 뒤 float32로 다시 계산 (기본값).
+        rescore: 다시 계산할 후보 수.
+    """
+
+    def __init__(self, index_dir: str, mmap: bool = True, quantized: bool = True,
+                 rescore: int = RESCORE_CANDIDATES) -> None:
+        index_dir = os.path.realpath(index_dir)  # 링크를 한 번만 해석해 모든 파일을 같은 버전에서 읽음 (bm25.write_index_dir)
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(index_dir, "doc_ids.json"), encoding="utf-8") as f:
+            self.doc_ids: List[str] = json.load(f)
+        self.scorer = None
+        if quantized and self.meta.get("quantization"):
+            self.scorer = QuantizedScorer(index_dir, self.meta["quantization"])
+            mmap = True  # 양자화 색인의 float32 벡터는 재계산용으로만 디스크에서 읽음
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r" if mmap else None)
+        self.rescore = rescore
+        n_docs = self.meta.get("n_docs", len(self.doc_ids))
+        expected = {"doc_ids": n_docs, "vectors": n_docs}
+        actual = {"doc_ids": len(self.doc_ids), "vectors": len(self.vectors)}
+        if self.scorer is not None:
+            expected["codes"], actual["codes"] = n_docs, len(self.scorer.codes)
+        check_index_shapes(index_dir, n_docs, expected, actual)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def model_name(self) -> str:
+        return self.meta["model"]
+
+    def search_vector(self, query: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """L2 정규화된 질의 벡터로 코사인 유사도 상위 k개 (restaurant_id, 유사도) 반환"""
+        if not self.doc_ids:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        if self.scorer is None:
+            scores = self.vectors @ query
+            return [(self.doc_ids[i], float(scores[i])) for i in top_k(scores, k)]
+
+        # 근사 점수 상위 후보만 float32 벡터로 다시 계산 (행 번호 순으로 읽어 디스크 접근을 순차적으로)
+        candidates = np.sort(top_k(self.scorer.scores(query), max(k, self.rescore)))
+        scores = self.vectors[candidates] @ query
+        return [(self.doc_ids[candidates[i]], float(scores[i])) for i in top_k(scores, k)]
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Build the restaurant embedding index from the review store.")
+    parser.add_argument("--store", default="../../database/reviews.db", help="Review store (SQLite).")
+    parser.add_argument("--output", default="../../database/vector_index", help="Index directory.")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="sentence-transformers model name.")
+    parser.add_argument("--reviews", type=int, default=REVIEWS_PER_RESTAURANT, help="Recent reviews per restaurant.")
+    parser.add_argument("--quantize", choices=["int8", "pq"], help="Also store quantized codes for search.")
+    args = parser.parse_args()
+
+    n_docs = build_vector_index(args.store, args.output, args.model, reviews_per_restaurant=args.reviews)
+    print(f"벡터 색인 생성 완료: 식당 {n_docs}개 -> {args.output}")
+    if args.quantize and n_docs:
+        size = quantize_index(args.output, args.quantize)
+        print(f"양자화 완료({args.quantize}): 코드 {size['code_mb']:.1f}MB, float32 대비 {size['compression']:.1f}배 축소")